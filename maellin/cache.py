@@ -0,0 +1,284 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import os
+import pickle
+from functools import partial
+from inspect import iscoroutinefunction, isgeneratorfunction
+from threading import Lock
+from types import CodeType
+from typing import Any, Callable, Dict, Tuple
+
+import cloudpickle as cpickle
+
+from maellin.logger import LoggingMixin
+
+_MISSING = object()
+
+
+class UnhashableInputError(Exception):
+    pass
+
+
+def _hash_code(code: CodeType, digest: Any) -> None:
+    """Feeds the bytecode, constants and names of a code object to a digest"""
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode('utf-8'))
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            _hash_code(const, digest)
+        else:
+            digest.update(repr(const).encode('utf-8'))
+
+
+def _hash_value(obj: Any, digest: Any) -> None:
+    """Feeds a fingerprint of an argument or upstream result to a digest"""
+    digest.update(type(obj).__qualname__.encode('utf-8'))
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        digest.update(repr(obj).encode('utf-8'))
+        return
+
+    if type(obj).__module__.startswith('pandas'):
+        from pandas.util import hash_pandas_object
+        try:
+            digest.update(hash_pandas_object(obj, index=True).values.tobytes())
+            dtypes = obj.dtypes if hasattr(obj, 'dtypes') else obj.dtype
+            digest.update(repr(dtypes).encode('utf-8'))
+            return
+        except TypeError:
+            pass
+
+    try:
+        digest.update(cpickle.dumps(obj))
+    except Exception as error:
+        raise UnhashableInputError(f'Cannot fingerprint input of type {type(obj).__name__}') from error
+
+
+def fingerprint(func: Callable, args: Tuple = (), kwargs: Dict = None) -> str:
+    """Creates a content address for a call from the code of the callable, its
+    default arguments and captured variables, its bound arguments and the values
+    of its inputs
+
+    Args:
+        func (Callable): python callable, partials are unwrapped
+        args (Tuple, optional): positional arguments, usually upstream results. Defaults to ().
+        kwargs (Dict, optional): keyword arguments. Defaults to None.
+
+    Raises:
+        UnhashableInputError: an input could not be fingerprinted
+
+    Returns:
+        str: hex digest of the call
+    """
+    digest = hashlib.sha256()
+    kwargs = dict(kwargs or {})
+    while isinstance(func, partial):
+        args = func.args + tuple(args)
+        kwargs = {**func.keywords, **kwargs}
+        func = func.func
+
+    digest.update(getattr(func, '__qualname__', repr(func)).encode('utf-8'))
+    code = getattr(func, '__code__', None)
+    if code is not None:
+        _hash_code(code, digest)
+        # default arguments and captured variables change the result as much as the code
+        _hash_value(getattr(func, '__defaults__', None), digest)
+        _hash_value(getattr(func, '__kwdefaults__', None), digest)
+        for cell in getattr(func, '__closure__', None) or ():
+            try:
+                _hash_value(cell.cell_contents, digest)
+            except ValueError:
+                # the variable is not assigned yet
+                digest.update(b'<empty cell>')
+
+    for value in args:
+        _hash_value(value, digest)
+    for key in sorted(kwargs):
+        digest.update(key.encode('utf-8'))
+        _hash_value(kwargs[key], digest)
+    return digest.hexdigest()
+
+
+class TaskCache(LoggingMixin):
+    """Content addressed cache of Task outputs stored on local disk.
+
+    Outputs are keyed on the bytecode of the Task's callable, its bound kwargs
+    and fingerprints of the upstream results it receives, so a Task is only
+    executed again when one of them changes. DataFrames are stored as parquet
+    when pyarrow is installed, everything else is pickled. The least recently
+    used entries are evicted once the cache grows beyond `max_bytes`.
+
+    Usage:
+    >>> cache = TaskCache(path='.cache') # share one cache between runs
+    >>> pipe = Pipeline(steps=my_steps, cache=cache) # cache all tasks of the pipeline
+    >>> pipe.run()
+    >>> cache.hits, cache.misses
+    """
+
+    def __init__(self, path: str = '.maellin/cache', max_bytes: int = 1024 ** 3) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._lock = Lock()
+        self._log = self.logger
+        os.makedirs(self.path, exist_ok=True)
+
+        # Index of key -> (filename, size), ordered from least to most recently used
+        self._entries: Dict[str, Tuple[str, int]] = {}
+        files = [entry for entry in os.scandir(self.path) if entry.is_file()]
+        for entry in sorted(files, key=lambda e: e.stat().st_mtime):
+            key = os.path.splitext(entry.name)[0]
+            self._entries[key] = (entry.path, entry.stat().st_size)
+
+    def __reduce__(self):
+        # the index and lock are rebuilt from the directory when unpickled
+        return (self.__class__, (self.path, self.max_bytes))
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached outputs in bytes"""
+        return sum(size for _, size in self._entries.values())
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit and miss counters of the cache"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'skipped': self.skipped,
+            'entries': len(self._entries),
+            'bytes': self.size
+        }
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Reads a cached output, returns default if the key is not cached"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            # Move the entry to the most recently used position
+            self._entries[key] = entry
+        filename = entry[0]
+        try:
+            os.utime(filename)
+            if filename.endswith('.parquet'):
+                import pandas as pd
+                return pd.read_parquet(filename)
+            with open(filename, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            with self._lock:
+                self._entries.pop(key, None)
+            return default
+
+    def put(self, key: str, value: Any) -> None:
+        """Writes an output to the cache and evicts least recently used entries"""
+        filename = self._write(os.path.join(self.path, key), value)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (filename, os.path.getsize(filename))
+            self._evict()
+
+    def _write(self, filename: str, value: Any) -> str:
+        """Writes a value as parquet if possible, otherwise as a pickle"""
+        if type(value).__name__ == 'DataFrame' and type(value).__module__.startswith('pandas'):
+            try:
+                value.to_parquet(filename + '.parquet')
+                return filename + '.parquet'
+            except Exception:
+                # pyarrow is not installed or the frame cannot be stored as parquet
+                if os.path.exists(filename + '.parquet'):
+                    os.remove(filename + '.parquet')
+        try:
+            with open(filename + '.pkl', 'wb') as f:
+                cpickle.dump(value, f)
+        except Exception:
+            os.remove(filename + '.pkl')
+            raise
+        return filename + '.pkl'
+
+    def _evict(self) -> None:
+        """Removes least recently used entries until the cache fits max_bytes"""
+        total = self.size
+        while total > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            filename, size = self._entries.pop(key)
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        """Removes all cached outputs"""
+        with self._lock:
+            for filename, _ in self._entries.values():
+                try:
+                    os.remove(filename)
+                except OSError:
+                    pass
+            self._entries.clear()
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Returns the cached output of a call or executes it and caches the output.
+        Coroutine and generator functions and calls with inputs that cannot be
+        fingerprinted are always executed."""
+        key, value = self.lookup(func, args, kwargs, default=_MISSING)
+        if value is not _MISSING:
+            return value
+        value = func(*args, **kwargs)
+        if key is not None:
+            self.store(key, value, func)
+        return value
+
+    def lookup(self, func: Callable, args: Tuple = (), kwargs: Dict = None, default: Any = None) -> Tuple[str, Any]:
+        """Looks up the cached output of a call without executing it, counting a hit or a miss.
+        Used by executors that run the callable elsewhere, see call.
+
+        Returns:
+            Tuple[str, Any]: the key to store the output under, None when the call cannot be
+                cached, and the cached output or default
+        """
+        kwargs = kwargs or {}
+        if iscoroutinefunction(func) or isgeneratorfunction(func):
+            return None, default
+        try:
+            key = fingerprint(func, args, kwargs)
+        except UnhashableInputError as error:
+            with self._lock:
+                self.skipped += 1
+            self._log.debug('Skipping Cache for %s: %s', getattr(func, '__name__', func), error)
+            return None, default
+
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            with self._lock:
+                self.hits += 1
+            self._log.info('Cache Hit for %s', getattr(func, '__name__', func))
+            return key, value
+
+        with self._lock:
+            self.misses += 1
+        return key, default
+
+    def store(self, key: str, value: Any, func: Callable = None) -> None:
+        """Caches the output of a call under the key returned by lookup, outputs that
+        cannot be written are logged and not cached"""
+        try:
+            self.put(key, value)
+        except Exception as error:
+            self._log.warning('Cannot Cache Output of %s: %r', getattr(func, '__name__', func), error)
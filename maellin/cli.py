@@ -13,24 +13,30 @@
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+# Only the standard library is imported at startup, maellin.workflows and its
+# dependencies are imported by the commands that need them. Keep it that way,
+# short cron style runs otherwise spend more time importing than running.
+# Measure with: python -X importtime -m maellin plan my_dag.plan
+
 from __future__ import annotations
+import argparse
 import sys
-from typing import Sequence
-import platform
+import time
+from typing import Sequence, TypeVar
 
 from maellin import __version__
+from maellin.exceptions import PlanFormatError
 
+Pipeline = TypeVar('Pipeline')
 
-def main(argv: Sequence[str] | None = None) -> int:
-    """
-    Command-line implementation of maellin that executes the main bit of the application.
+EXECUTORS = ('default', 'multi-threading', 'multi-processing', 'asyncio', 'shared')
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
 
-    Args:
-    argv (Sequence[str]): The arguments to be passed to the application for parsing.
-        Defaults to None.
-    """
-    print(
-        r"""
+
+def banner() -> str:
+    import platform
+
+    return r"""
         Welcome to
          __  __                  _   _   _               _
         |  \/  |   __ _    ___  | | | | (_)  _ __       (_)   ___
@@ -42,13 +48,151 @@ def main(argv: Sequence[str] | None = None) -> int:
 
         Maellin.io verison %s
         Using Python version %s (%s, %s)""" % (
-            __version__,
-            platform.python_version(),
-            platform.python_build()[0],
-            platform.python_build()[1]))
+        __version__,
+        platform.python_version(),
+        platform.python_build()[0],
+        platform.python_build()[1])
+
+
+def is_plan(path: str) -> bool:
+    """Returns True if the file starts with the header written by Pipeline.dump_plan"""
+    from maellin.serialization import MAGIC
+
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_pipeline(path: str) -> Pipeline:
+    """Loads a plan saved with Pipeline.dump_plan or a DAG pickled with Pipeline.dump
+
+    Raises:
+        PlanFormatError: if the file is neither a valid plan nor a pickled DAG
+    """
+    import pickle
+    from maellin.workflows import Pipeline
+
+    if is_plan(path):
+        return Pipeline().load_plan(path)
+    try:
+        return Pipeline().load(path)
+    except (pickle.UnpicklingError, EOFError) as error:
+        raise PlanFormatError(f'Not a Maellin plan or pickled DAG: {error}') from error
+
+
+def configure_logging(level: str) -> None:
+    """Configures the root logger before maellin does so the level is respected"""
+    import logging
+    from maellin.logger import FORMAT
+
+    logging.basicConfig(stream=sys.stdout, level=level, format=FORMAT)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Runs a stored DAG and prints a summary of the run. Returns 1 when a Task
+    failed, whatever the executor, and 2 when the executor cannot run the DAG."""
+    from maellin.exceptions import CompatibilityException
 
+    configure_logging(args.log_level)
+    pipeline = load_pipeline(args.file)
+    if args.workers is not None:
+        pipeline.workers = args.workers
+    try:
+        pipeline.check_executor(args.executor)
+    except CompatibilityException as error:
+        print(f'maellin run: error: {error}', file=sys.stderr)
+        return 2
+
+    start_time = time.perf_counter()
+    try:
+        context = pipeline.run(executor=args.executor, trace=args.trace)
+    except Exception as error:
+        # the concurrent executors raise ActivityFailedError, the default one the error of the Task
+        print(f'maellin: {args.file} failed: {error!r}', file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start_time
+
+    completed = sum(1 for status in context.status.values() if status == 'Completed')
+    print(f'Run {context.run_id} of {args.file} completed {completed} Tasks in {elapsed:.3f} s')
+    return 0
+
+
+def plan(args: argparse.Namespace) -> int:
+    """Prints the Tasks of a stored DAG in the order they are queued. Plans are
+    read without building the DAG so networkx is not imported."""
+    if is_plan(args.file):
+        from maellin.serialization import read_plan
+
+        with open(args.file, 'rb') as f:
+            document = read_plan(f.read())
+        compiled = document.compile()
+        tasks = document.tasks
+        settings = document.settings
+    else:
+        pipeline = load_pipeline(args.file)
+        compiled = pipeline.compile()
+        tasks = pipeline._tasks_by_tid
+        settings = {'type': pipeline.type, 'workers': pipeline.workers}
+
+    def label(tid: str) -> str:
+        task = tasks.get(tid)
+        return tid if task is None or task.name is None else task.name
+
+    print(f'{args.file}: {len(compiled)} Tasks on {max(compiled.levels, default=-1) + 1} levels, '
+          f'type {settings.get("type")}, workers {settings.get("workers")}')
+    width = max((len(label(tid)) for tid in compiled.tids), default=4)
+    print(f'{"level":>5}  {"task":<{width}}  depends on')
+    for i in compiled.order:
+        depends_on = ', '.join(label(compiled.tids[p]) for p in compiled.predecessors(i))
+        print(f'{compiled.levels[i]:>5}  {label(compiled.tids[i]):<{width}}  {depends_on}'.rstrip())
+    return 0
+
+
+def parser() -> argparse.ArgumentParser:
+    """Builds the parser of the maellin command"""
+    maellin = argparse.ArgumentParser(prog='maellin', description='Runs and inspects stored Maellin DAGs.')
+    maellin.add_argument('--version', action='version', version=f'maellin {__version__}')
+    commands = maellin.add_subparsers(dest='command', metavar='command')
+
+    run_command = commands.add_parser('run', help='run a DAG saved with dump_plan or dump')
+    run_command.add_argument('file', help='plan or pickled DAG to run')
+    run_command.add_argument(
+        '--executor', choices=EXECUTORS, default=None,
+        help='executor used for the run, defaults to the type of the Pipeline')
+    run_command.add_argument('--workers', type=int, default=None, help='max number of concurrent workers')
+    run_command.add_argument('--trace', default=None, help='write a Chrome trace of the run to this file')
+    run_command.add_argument('--log-level', choices=LOG_LEVELS, default='INFO', help='defaults to INFO')
+    run_command.set_defaults(handler=run)
+
+    plan_command = commands.add_parser('plan', help='print the Tasks of a DAG in topological order')
+    plan_command.add_argument('file', help='plan or pickled DAG to print')
+    plan_command.set_defaults(handler=plan)
+    return maellin
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Command-line implementation of maellin that executes the main bit of the application.
+
+    Args:
+    argv (Sequence[str]): The arguments to be passed to the application for parsing.
+        Defaults to None.
+
+    Returns:
+        int: exit code, 1 when a Task failed and 2 when the file cannot be read
+
+    Usage:
+    $ maellin run my_dag.plan --executor multi-threading --workers 8
+    $ maellin plan my_dag.plan
+    """
     if argv is None:
         argv = sys.argv[1:]
 
-    # app.run(argv)
-    return  # app.exit_code()
+    args = parser().parse_args(argv)
+    if args.command is None:
+        print(banner())
+        return 0
+    try:
+        return args.handler(args)
+    except (OSError, PlanFormatError) as error:
+        print(f'maellin: {args.file}: {error}', file=sys.stderr)
+        return 2
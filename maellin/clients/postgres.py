@@ -13,15 +13,199 @@
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from psycopg import connect, Connection
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from threading import Lock
+from typing import (
+    Any, AsyncIterable, AsyncIterator, ContextManager, Dict, Iterable, Iterator, List, Sequence, Tuple, TypeVar, Union)
+from weakref import WeakKeyDictionary
+
+import numpy as np
+import pandas as pd
+from psycopg import connect, sql, AsyncConnection, AsyncCursor, Connection, Cursor
 from psycopg.conninfo import make_conninfo
+from psycopg.postgres import types as pg_types
 from configparser import ConfigParser
 from maellin.clients.base import AbstractBaseClient
+from maellin.logger import LoggingMixin
+from maellin.tasks import Task
+from maellin.utils import generate_uuid
 
+ConnectionPool = TypeVar('ConnectionPool')
+AsyncConnectionPool = TypeVar('AsyncConnectionPool')
 
-class PostgresClient(AbstractBaseClient):
-    """Postgres client for working with postgres databases in python_
+# NULL marker of csv COPY, empty fields are loaded as empty strings
+CSV_NULL = '\\N'
+
+# numpy and pandas dtypes for postgres types that can be converted without pandas inference.
+# Any postgres column can hold NULLs, so integer and boolean columns use the nullable pandas
+# dtypes and every chunk of a result gets the same dtypes whether it holds NULLs or not.
+_DTYPES: Dict[int, Tuple[str, str]] = {
+    pg_types.get(name).oid: dtypes for name, dtypes in (
+        ('int2', ('int64', 'Int64')),
+        ('int4', ('int64', 'Int64')),
+        ('int8', ('int64', 'Int64')),
+        ('oid', ('int64', 'Int64')),
+        ('float4', ('float64', 'float64')),
+        ('float8', ('float64', 'float64')),
+        ('bool', ('bool', 'boolean')),
+    )
+}
+
+
+def _to_array(values: Tuple, dtypes: Tuple[str, str] = None) -> Any:
+    """Converts the values of a column to an array of the dtypes of its postgres type"""
+    if dtypes is None:
+        return pd.Series(values, dtype=None if values else object)
+    np_dtype, pd_dtype = dtypes
+    # numpy stores NULLs as NaN in float arrays, but casts them to False in boolean arrays
+    if np_dtype == 'float64' or None not in values:
+        return pd.array(np.array(values, dtype=np_dtype), dtype=pd_dtype, copy=False)
+    return pd.array(values, dtype=pd_dtype)
+
+
+def rows_to_frame(rows: List[Tuple], description: Sequence) -> pd.DataFrame:
+    """Builds a DataFrame column by column from rows fetched by a cursor.
+    Columns of numeric and boolean postgres types get dtypes derived from their type,
+    all other types are left to pandas inference. Columns are built by position, so
+    result columns sharing a name are all kept.
+
+    Args:
+        rows (List[Tuple]): rows returned by fetchmany or fetchall
+        description (Sequence): the cursor description of the result columns
+
+    Returns:
+        pd.DataFrame: a frame with one column per result column
+    """
+    columns = zip(*rows) if rows else (() for _ in description)
+    data = {
+        i: _to_array(values, _DTYPES.get(column.type_code))
+        for i, (column, values) in enumerate(zip(description, columns))
+    }
+    frame = pd.DataFrame(data, copy=False)
+    frame.columns = [column.name for column in description]
+    return frame
+
+
+def _import_pool():
+    """Imports psycopg_pool, which is only needed for pooled connections"""
+    try:
+        import psycopg_pool
+    except ImportError as error:
+        raise ImportError('Pooled connections require psycopg_pool: pip install psycopg-pool') from error
+    return psycopg_pool
+
+
+def read_config(path: str, section: str) -> Dict[str, str]:
+    """Reads the connection parameters of a section in a configuration file
+
+    Args:
+        path (str): path to configuration file
+        section (str): name of section in the configuration file
+
+    Returns:
+        Dict[str, str]: connection parameters, empty if the section does not exist
     """
+    config_parser = ConfigParser()
+    config_parser.read(path)
+    if not config_parser.has_section(section):
+        return {}
+    return dict(config_parser.items(section))
+
+
+def _table_sql(table: Any) -> sql.Composable:
+    """Quotes a table name given as "schema.table" or as a pypika Table"""
+    if hasattr(table, 'get_sql'):
+        return sql.SQL(table.get_sql(quote_char='"'))
+    return sql.Identifier(*str(table).split('.'))
+
+
+def _columns_sql(columns: Sequence[str]) -> sql.Composable:
+    return sql.SQL(', ').join(sql.Identifier(str(col)) for col in columns)
+
+
+def _staging_sql(table: sql.Composable) -> Tuple[sql.Composable, sql.Composable]:
+    """Returns the name of a temporary staging table for a table and the statement creating it"""
+    stage = sql.Identifier('maellin_stage_' + generate_uuid().replace('-', ''))
+    create = sql.SQL('CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP').format(stage, table)
+    return stage, create
+
+
+def _insert_sql(table: sql.Composable, columns: Sequence[str], stage: sql.Composable) -> sql.Composable:
+    return sql.SQL('INSERT INTO {} ({}) SELECT {} FROM {}').format(
+        table, _columns_sql(columns), _columns_sql(columns), stage)
+
+
+def _copy_sql(table: sql.Composable, columns: Sequence[str], format: str) -> sql.Composable:
+    if format == 'csv':
+        return sql.SQL('COPY {} ({}) FROM STDIN (FORMAT CSV, NULL {})').format(
+            table, _columns_sql(columns), sql.Literal(CSV_NULL))
+    return sql.SQL('COPY {} ({}) FROM STDIN (FORMAT {})').format(
+        table, _columns_sql(columns), sql.SQL(format.upper()))
+
+
+def _types_sql(table: sql.Composable, columns: Sequence[str]) -> sql.Composable:
+    return sql.SQL('SELECT {} FROM {} LIMIT 0').format(_columns_sql(columns), table)
+
+
+def _integral_floats(frame: pd.DataFrame) -> pd.DataFrame:
+    """Converts float columns holding only whole numbers to Int64. Nullable integer
+    columns are often read as float64 and written as 1.0, which COPY rejects for
+    integer columns, while 1 is loaded by integer and float columns alike."""
+    converted = None
+    for i, dtype in enumerate(frame.dtypes):
+        if dtype.kind != 'f':
+            continue
+        values = frame.iloc[:, i].to_numpy(dtype='float64', na_value=np.nan)
+        values = values[~np.isnan(values)]
+        # whole numbers above 2 ** 53 are not exact in float64
+        if np.isfinite(values).all() and (values == np.trunc(values)).all() and (np.abs(values) < 2 ** 53).all():
+            if converted is None:
+                converted = frame.copy(deep=False)
+            converted.isetitem(i, frame.iloc[:, i].astype('Int64'))
+    return frame if converted is None else converted
+
+
+def _csv_chunks(frame: pd.DataFrame, chunksize: int) -> Iterator[str]:
+    """Serializes a DataFrame to csv chunksize rows at a time"""
+    frame = _integral_floats(frame)
+    for start in range(0, len(frame), chunksize):
+        # missing values are written as CSV_NULL so empty strings are not loaded as NULL
+        yield frame.iloc[start:start + chunksize].to_csv(header=False, index=False, na_rep=CSV_NULL)
+
+
+def _binary_rows(frame: pd.DataFrame, chunksize: int) -> Iterator[Tuple]:
+    """Yields the rows of a DataFrame with missing values replaced by None"""
+    for start in range(0, len(frame), chunksize):
+        chunk = frame.iloc[start:start + chunksize]
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+
+async def _aiter(frames: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    """Iterates over a sync or async iterable"""
+    if hasattr(frames, '__aiter__'):
+        async for frame in frames:
+            yield frame
+    else:
+        for frame in frames:
+            yield frame
+
+
+async def _close_on_shutdown(loop: asyncio.AbstractEventLoop) -> AsyncIterator[None]:
+    """Closes the async pools of an event loop when the generator is finalized"""
+    try:
+        yield
+    finally:
+        AsyncPostgresClient._closers.pop(loop, None)
+        pools = AsyncPostgresClient._pools.pop(loop, {})
+        for pool in pools.values():
+            await pool.close()
+
+
+class _PostgresClientBase(AbstractBaseClient, LoggingMixin):
+    """Connection parameters and pool keys shared by the sync and async clients"""
 
     def __init__(self, host: str = None, port: int = None, user: str = None, password: str = None, dbname: str = None):
         self.host = host
@@ -30,6 +214,29 @@ class PostgresClient(AbstractBaseClient):
         self.password = password
         self.dbname = dbname
 
+    def _pool_key(self, path: str = None, section: str = None) -> str:
+        """Returns the key a pool is registered under. Pools created from a configuration
+        file are keyed by path and section so the file is only read when the pool is created.
+        """
+        if path is not None:
+            return f'{path}[{section}]'
+        return f'{self.user}@{self.host}:{self.port}/{self.dbname}'
+
+    def _conninfo(self, path: str = None, section: str = None) -> str:
+        if path is not None:
+            return make_conninfo(**read_config(path, section))
+        return make_conninfo(
+            host=self.host, port=self.port, user=self.user, password=self.password, dbname=self.dbname)
+
+
+class PostgresClient(_PostgresClientBase):
+    """Postgres client for working with postgres databases in python_
+    """
+
+    # pools are owned by the class so every client instance shares them
+    _pools: Dict[str, ConnectionPool] = {}
+    _pools_lock = Lock()
+
     def connect_from_config(self, path: str, section: str, **kwargs) -> Connection:
         """Creates a psycopg3 Connection object from a configuration file
 
@@ -41,18 +248,8 @@ class PostgresClient(AbstractBaseClient):
             Connection: a new connection instance
         """
 
-        conn_dict = {}
-        config_parser = ConfigParser()
-
-        # Read the configuration file
-        config_parser.read(path)
-        if config_parser.has_section(section):
-            config_params = config_parser.items(section)
-            for k, v in config_params:
-                conn_dict[k] = v
-
         conn = connect(
-            conninfo=make_conninfo(**conn_dict),
+            conninfo=make_conninfo(**read_config(path, section)),
             **kwargs
         )
 
@@ -82,3 +279,557 @@ class PostgresClient(AbstractBaseClient):
         conn._check_connection_ok()
 
         return conn
+
+    def pool(
+            self,
+            path: str = None,
+            section: str = None,
+            min_size: int = 1,
+            max_size: int = 10,
+            max_idle: float = 600.0,
+            timeout: float = 30.0,
+            check: bool = True,
+            **kwargs) -> ConnectionPool:
+        """Returns the connection pool of a configuration section, or of the connection
+        parameters of the client when no path is given. Pools are created on first use
+        and shared by every PostgresClient in the process, so Tasks running on different
+        executor workers draw from the same bounded set of connections.
+
+        Args:
+            path (str, optional): path to configuration file. Defaults to None.
+            section (str, optional): name of section in the configuration file. Defaults to None.
+            min_size (int, optional): connections kept open by the pool. Defaults to 1.
+            max_size (int, optional): max connections opened by the pool, callers wait
+                for a connection to be returned once reached. Defaults to 10.
+            max_idle (float, optional): seconds an unused connection above min_size is
+                kept open. Defaults to 600.0.
+            timeout (float, optional): seconds to wait for a connection before raising
+                a PoolTimeout. Defaults to 30.0.
+            check (bool, optional): test connections before handing them out and replace
+                broken ones. Defaults to True.
+            **kwargs: keyword arguments passed to every new connection, e.g. autocommit
+
+        Returns:
+            ConnectionPool: the shared pool, options only apply when it is created
+        """
+        key = self._pool_key(path, section)
+        with PostgresClient._pools_lock:
+            pool = PostgresClient._pools.get(key)
+            if pool is None:
+                psycopg_pool = _import_pool()
+                pool = psycopg_pool.ConnectionPool(
+                    self._conninfo(path, section),
+                    kwargs=kwargs,
+                    min_size=min_size,
+                    max_size=max_size,
+                    max_idle=max_idle,
+                    timeout=timeout,
+                    check=psycopg_pool.ConnectionPool.check_connection if check else None,
+                    name=key,
+                    open=True)
+                PostgresClient._pools[key] = pool
+                self.logger.info('Opened connection pool %s (min_size=%s, max_size=%s)', key, min_size, max_size)
+        return pool
+
+    def connection(self, path: str = None, section: str = None, **kwargs) -> ContextManager[Connection]:
+        """Checks out a connection from a shared pool, the connection is returned
+        to the pool when the block exits.
+
+        Args:
+            path (str, optional): path to configuration file. Defaults to None.
+            section (str, optional): name of section in the configuration file. Defaults to None.
+            **kwargs: pool options used when the pool is created, see PostgresClient.pool
+
+        Returns:
+            ContextManager[Connection]: context manager yielding a pooled connection
+
+        Usage:
+        >>> client = PostgresClient()
+        >>> with client.connection(path, section) as conn:
+        ...     df = client.read_frame('SELECT * FROM rental', conn=conn)
+        """
+        return self.pool(path, section, **kwargs).connection()
+
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Dict[str, int]]:
+        """Returns the counters of every sync pool such as the number of checkouts
+        (requests_num), the total time spent waiting for a connection (requests_wait_ms),
+        the connections open (pool_size) and idle (pool_available).
+
+        Returns:
+            Dict[str, Dict[str, int]]: pool counters by pool key
+        """
+        with cls._pools_lock:
+            return {key: pool.get_stats() for key, pool in cls._pools.items()}
+
+    @classmethod
+    def close_pools(cls) -> None:
+        """Closes every sync pool, pools are recreated on their next use"""
+        with cls._pools_lock:
+            pools, cls._pools = cls._pools, {}
+        for pool in pools.values():
+            pool.close()
+
+    def read_frame(
+            self,
+            query: str,
+            conn: Connection = None,
+            params: Union[Sequence, Dict] = None,
+            chunksize: int = None,
+            binary: bool = False) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """Reads the result of a query into DataFrames using a named server-side cursor,
+        so rows are transferred from the server in chunks rather than all at once.
+
+        Args:
+            query (str): SQL query to execute
+            conn (Connection, optional): connection to use, a new connection is
+                opened and closed when the read completes if omitted. Defaults to None.
+            params (Sequence | Dict, optional): query parameters. Defaults to None.
+            chunksize (int, optional): when set, returns an iterator yielding frames of at
+                most chunksize rows, otherwise a single frame is returned. Defaults to None.
+            binary (bool, optional): transfer rows in binary format. Defaults to False.
+
+        Returns:
+            DataFrame | Iterator[DataFrame]: the query results
+
+        Usage:
+        >>> client = PostgresClient()
+        >>> conn = client.connect_from_config(path, section)
+        >>> df = client.read_frame('SELECT * FROM rental', conn=conn)
+        >>> for chunk in client.read_frame('SELECT * FROM payment', conn=conn, chunksize=50000):
+        ...     process(chunk)
+        """
+        frames = self._iter_frames(query, conn, params, chunksize or 10000, binary)
+        if chunksize is not None:
+            return frames
+        chunks = list(frames)
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks, ignore_index=True, copy=False)
+
+    def _iter_frames(
+            self,
+            query: str,
+            conn: Connection,
+            params: Any,
+            chunksize: int,
+            binary: bool) -> Iterator[pd.DataFrame]:
+        """Yields DataFrames of at most chunksize rows from a named server-side cursor"""
+        owns_conn = conn is None
+        if owns_conn:
+            conn = self.connect()
+        try:
+            # server-side cursors need to be held open when not inside a transaction
+            name = 'maellin_' + generate_uuid().replace('-', '')
+            with conn.cursor(name=name, binary=binary, withhold=conn.autocommit) as cursor:
+                cursor.itersize = chunksize
+                cursor.execute(query, params)
+                rows = cursor.fetchmany(chunksize)
+                # an empty result still yields a frame with the result columns
+                yield rows_to_frame(rows, cursor.description)
+                while len(rows) == chunksize:
+                    rows = cursor.fetchmany(chunksize)
+                    if rows:
+                        yield rows_to_frame(rows, cursor.description)
+        finally:
+            if owns_conn:
+                conn.close()
+
+    def copy_frame(
+            self,
+            df: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+            table: Any,
+            conn: Connection = None,
+            format: str = 'csv',
+            chunksize: int = 10000,
+            staging: bool = False,
+            replace: bool = False) -> Dict[str, float]:
+        """Bulk loads DataFrames into a table with COPY FROM STDIN. Frames are written in
+        chunks of at most chunksize rows so only one chunk is serialized at a time. The
+        load runs in a single transaction, readers see either none or all of the rows.
+
+        Args:
+            df (DataFrame | Iterable[DataFrame]): a frame or an iterator of frames such as
+                the chunks returned by read_frame or a streaming Task
+            table (str | Table): target table as "schema.table" or a pypika Table
+            conn (Connection, optional): connection to use, a new connection is
+                opened and closed when the load completes if omitted. Defaults to None.
+            format (str, optional): "csv" or "binary". Defaults to 'csv'.
+            chunksize (int, optional): max rows written per chunk. Defaults to 10000.
+            staging (bool, optional): COPY into a temporary staging table first and move the
+                rows into the target at the end, the target is only locked once every frame
+                was copied. Defaults to False.
+            replace (bool, optional): delete the existing rows of the target, when staging
+                the rows are deleted right before they are replaced by the staged rows.
+                Defaults to False.
+
+        Returns:
+            Dict[str, float]: rows loaded, elapsed seconds and throughput in rows per second
+
+        Usage:
+        >>> client = PostgresClient()
+        >>> conn = client.connect_from_config(path, section)
+        >>> client.copy_frame(dim_customer, 'dw.customer', conn=conn, staging=True, replace=True)
+        {'rows': 599, 'seconds': 0.01, 'rows_per_sec': 59900.0}
+        """
+        if format not in ('csv', 'binary'):
+            raise ValueError(format)
+
+        owns_conn = conn is None
+        if owns_conn:
+            conn = self.connect()
+
+        frames = [df] if isinstance(df, pd.DataFrame) else df
+        target = _table_sql(table)
+        rows = 0
+        start_time = time.perf_counter()
+        try:
+            with conn.transaction(), conn.cursor() as cursor:
+                load_into = target
+                if staging:
+                    load_into, create = _staging_sql(target)
+                    cursor.execute(create)
+                if replace and not staging:
+                    cursor.execute(sql.SQL('DELETE FROM {}').format(target))
+
+                columns = None
+                for frame in frames:
+                    columns = list(frame.columns)
+                    rows += self._copy_chunks(cursor, frame, load_into, columns, format, chunksize)
+
+                if staging:
+                    # the target is only locked from here to the end of the transaction
+                    if replace:
+                        cursor.execute(sql.SQL('DELETE FROM {}').format(target))
+                    if columns is not None:
+                        cursor.execute(_insert_sql(target, columns, load_into))
+        finally:
+            if owns_conn:
+                conn.close()
+
+        elapsed = time.perf_counter() - start_time
+        stats = {'rows': rows, 'seconds': elapsed, 'rows_per_sec': rows / elapsed if elapsed > 0 else 0.0}
+        self.logger.info('Copied %s rows into %s in %.2f seconds (%.0f rows/sec)',
+                         rows, table, elapsed, stats['rows_per_sec'])
+        return stats
+
+    def _copy_chunks(
+            self,
+            cursor: Cursor,
+            frame: pd.DataFrame,
+            table: sql.Composable,
+            columns: List[str],
+            format: str,
+            chunksize: int) -> int:
+        """Writes a DataFrame to a COPY FROM STDIN operation in chunks"""
+        if format == 'binary':
+            # binary COPY needs the exact types of the target columns
+            cursor.execute(_types_sql(table, columns))
+            types = [col.type_code for col in cursor.description]
+            with cursor.copy(_copy_sql(table, columns, format)) as copy:
+                copy.set_types(types)
+                for row in _binary_rows(frame, chunksize):
+                    copy.write_row(row)
+        else:
+            with cursor.copy(_copy_sql(table, columns, format)) as copy:
+                for data in _csv_chunks(frame, chunksize):
+                    copy.write(data)
+        return len(frame)
+
+
+class AsyncPostgresClient(_PostgresClientBase):
+    """Postgres client built on psycopg's AsyncConnection for Tasks that are coroutines.
+    Database I/O is awaited instead of blocking the event loop, so many concurrent
+    extraction Tasks can share one event loop when run with Pipeline.arun.
+
+    Usage:
+    >>> async def extract_rental(path: str, section: str) -> pd.DataFrame:
+    ...     client = AsyncPostgresClient()
+    ...     async with client.connection(path, section) as conn:
+    ...         return await client.read_frame('SELECT * FROM rental', conn=conn)
+    """
+
+    # async pools are bound to the event loop they were opened on and closed when it shuts down
+    _pools: 'WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncConnectionPool]]' = WeakKeyDictionary()
+    _closers: 'WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncIterator[None]]' = WeakKeyDictionary()
+
+    async def connect_from_config(self, path: str, section: str, **kwargs) -> AsyncConnection:
+        """Creates a psycopg3 AsyncConnection object from a configuration file
+
+        Args:
+            path (str): path to configuration file
+            section (str): name of section in the configuration file
+
+        Returns:
+            AsyncConnection: a new connection instance
+        """
+        conn = await AsyncConnection.connect(conninfo=make_conninfo(**read_config(path, section)), **kwargs)
+        conn._check_connection_ok()
+        return conn
+
+    async def connect(self, **kwargs) -> AsyncConnection:
+        """Creates a psycopg3 AsyncConnection object from the connection parameters
+        of the client and **kwargs. Alias for psycopg3.AsyncConnection.connect()
+
+        Returns:
+            AsyncConnection: a new connection instance
+        """
+        conn = await AsyncConnection.connect(
+            conninfo=make_conninfo(
+                host=self.host,
+                port=self.port,
+                user=self.user,
+                password=self.password,
+                dbname=self.dbname,
+                **kwargs)
+        )
+        conn._check_connection_ok()
+        return conn
+
+    async def pool(
+            self,
+            path: str = None,
+            section: str = None,
+            min_size: int = 1,
+            max_size: int = 10,
+            max_idle: float = 600.0,
+            timeout: float = 30.0,
+            check: bool = True,
+            **kwargs) -> AsyncConnectionPool:
+        """Returns the async connection pool of a configuration section. Async pools are
+        bound to the running event loop and shared by the coroutines running on it,
+        see PostgresClient.pool for the options.
+
+        Returns:
+            AsyncConnectionPool: the shared pool of the running event loop
+        """
+        key = self._pool_key(path, section)
+        loop = asyncio.get_running_loop()
+        pools = AsyncPostgresClient._pools.get(loop)
+        if pools is None:
+            pools = AsyncPostgresClient._pools[loop] = {}
+            # the loop finalizes running async generators when it shuts down, e.g. at the
+            # end of asyncio.run, which closes the pools before the loop is closed
+            closer = AsyncPostgresClient._closers[loop] = _close_on_shutdown(loop)
+            await closer.__anext__()
+        pool = pools.get(key)
+        if pool is None:
+            psycopg_pool = _import_pool()
+            pool = psycopg_pool.AsyncConnectionPool(
+                self._conninfo(path, section),
+                kwargs=kwargs,
+                min_size=min_size,
+                max_size=max_size,
+                max_idle=max_idle,
+                timeout=timeout,
+                check=psycopg_pool.AsyncConnectionPool.check_connection if check else None,
+                name=key,
+                open=False)
+            pools[key] = pool
+            await pool.open()
+            self.logger.info('Opened async connection pool %s (min_size=%s, max_size=%s)', key, min_size, max_size)
+        return pool
+
+    @asynccontextmanager
+    async def connection(self, path: str = None, section: str = None, **kwargs) -> AsyncIterator[AsyncConnection]:
+        """Checks out a connection from a shared async pool, the connection is returned
+        to the pool when the block exits.
+
+        Usage:
+        >>> async with AsyncPostgresClient().connection(path, section) as conn:
+        ...     await conn.execute('SELECT 1')
+        """
+        pool = await self.pool(path, section, **kwargs)
+        async with pool.connection() as conn:
+            yield conn
+
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Dict[str, int]]:
+        """Returns the counters of the async pools of the running event loop,
+        see PostgresClient.pool_stats
+
+        Returns:
+            Dict[str, Dict[str, int]]: pool counters by pool key
+        """
+        pools = cls._pools.get(asyncio.get_running_loop(), {})
+        return {key: pool.get_stats() for key, pool in pools.items()}
+
+    @classmethod
+    async def close_pools(cls) -> None:
+        """Closes the async pools of the running event loop, pools that are not closed
+        explicitly are closed when the event loop shuts down"""
+        closer = cls._closers.pop(asyncio.get_running_loop(), None)
+        if closer is not None:
+            await closer.aclose()
+
+    async def read_frame(
+            self,
+            query: str,
+            conn: AsyncConnection = None,
+            params: Union[Sequence, Dict] = None,
+            binary: bool = False) -> pd.DataFrame:
+        """Reads the result of a query into a DataFrame using a named server-side cursor,
+        see PostgresClient.read_frame
+
+        Args:
+            query (str): SQL query to execute
+            conn (AsyncConnection, optional): connection to use, a new connection is
+                opened and closed when the read completes if omitted. Defaults to None.
+            params (Sequence | Dict, optional): query parameters. Defaults to None.
+            binary (bool, optional): transfer rows in binary format. Defaults to False.
+
+        Returns:
+            DataFrame: the query results
+        """
+        chunks = [chunk async for chunk in self.stream_frames(query, conn, params, binary=binary)]
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks, ignore_index=True, copy=False)
+
+    async def stream_frames(
+            self,
+            query: str,
+            conn: AsyncConnection = None,
+            params: Union[Sequence, Dict] = None,
+            chunksize: int = 10000,
+            binary: bool = False) -> AsyncIterator[pd.DataFrame]:
+        """Yields DataFrames of at most chunksize rows from a named server-side cursor
+
+        Usage:
+        >>> async for chunk in client.stream_frames('SELECT * FROM payment', conn=conn, chunksize=50000):
+        ...     process(chunk)
+        """
+        owns_conn = conn is None
+        if owns_conn:
+            conn = await self.connect()
+        try:
+            # server-side cursors need to be held open when not inside a transaction
+            name = 'maellin_' + generate_uuid().replace('-', '')
+            async with conn.cursor(name=name, binary=binary, withhold=conn.autocommit) as cursor:
+                cursor.itersize = chunksize
+                await cursor.execute(query, params)
+                rows = await cursor.fetchmany(chunksize)
+                # an empty result still yields a frame with the result columns
+                yield rows_to_frame(rows, cursor.description)
+                while len(rows) == chunksize:
+                    rows = await cursor.fetchmany(chunksize)
+                    if rows:
+                        yield rows_to_frame(rows, cursor.description)
+        finally:
+            if owns_conn:
+                await conn.close()
+
+    async def copy_frame(
+            self,
+            df: Union[pd.DataFrame, Iterable[pd.DataFrame], AsyncIterable[pd.DataFrame]],
+            table: Any,
+            conn: AsyncConnection = None,
+            format: str = 'csv',
+            chunksize: int = 10000,
+            staging: bool = False,
+            replace: bool = False) -> Dict[str, float]:
+        """Bulk loads DataFrames into a table with COPY FROM STDIN in a single transaction,
+        see PostgresClient.copy_frame for the arguments. The frames may also be produced
+        by an async iterator such as AsyncPostgresClient.stream_frames.
+
+        Returns:
+            Dict[str, float]: rows loaded, elapsed seconds and throughput in rows per second
+        """
+        if format not in ('csv', 'binary'):
+            raise ValueError(format)
+
+        owns_conn = conn is None
+        if owns_conn:
+            conn = await self.connect()
+
+        frames = [df] if isinstance(df, pd.DataFrame) else df
+        target = _table_sql(table)
+        rows = 0
+        start_time = time.perf_counter()
+        try:
+            async with conn.transaction(), conn.cursor() as cursor:
+                load_into = target
+                if staging:
+                    load_into, create = _staging_sql(target)
+                    await cursor.execute(create)
+                if replace and not staging:
+                    await cursor.execute(sql.SQL('DELETE FROM {}').format(target))
+
+                columns = None
+                async for frame in _aiter(frames):
+                    columns = list(frame.columns)
+                    rows += await self._copy_chunks(cursor, frame, load_into, columns, format, chunksize)
+
+                if staging:
+                    # the target is only locked from here to the end of the transaction
+                    if replace:
+                        await cursor.execute(sql.SQL('DELETE FROM {}').format(target))
+                    if columns is not None:
+                        await cursor.execute(_insert_sql(target, columns, load_into))
+        finally:
+            if owns_conn:
+                await conn.close()
+
+        elapsed = time.perf_counter() - start_time
+        stats = {'rows': rows, 'seconds': elapsed, 'rows_per_sec': rows / elapsed if elapsed > 0 else 0.0}
+        self.logger.info('Copied %s rows into %s in %.2f seconds (%.0f rows/sec)',
+                         rows, table, elapsed, stats['rows_per_sec'])
+        return stats
+
+    async def _copy_chunks(
+            self,
+            cursor: AsyncCursor,
+            frame: pd.DataFrame,
+            table: sql.Composable,
+            columns: List[str],
+            format: str,
+            chunksize: int) -> int:
+        """Writes a DataFrame to a COPY FROM STDIN operation in chunks"""
+        if format == 'binary':
+            await cursor.execute(_types_sql(table, columns))
+            types = [col.type_code for col in cursor.description]
+            async with cursor.copy(_copy_sql(table, columns, format)) as copy:
+                copy.set_types(types)
+                for row in _binary_rows(frame, chunksize):
+                    await copy.write_row(row)
+        else:
+            async with cursor.copy(_copy_sql(table, columns, format)) as copy:
+                for data in _csv_chunks(frame, chunksize):
+                    await copy.write(data)
+        return len(frame)
+
+
+def copy_sink(
+        df: Union[pd.DataFrame, Iterator[pd.DataFrame]],
+        table: Any,
+        path: str = None,
+        section: str = None,
+        conn: Connection = None,
+        **kwargs) -> Dict[str, float]:
+    """Loads the output of an upstream Task into a table with PostgresClient.copy_frame.
+    A connection is checked out from the pool of the configuration section when conn
+    is not provided.
+    """
+    client = PostgresClient()
+    if conn is None:
+        with client.connection(path, section) as conn:
+            return client.copy_frame(df, table, conn=conn, **kwargs)
+    return client.copy_frame(df, table, conn=conn, **kwargs)
+
+
+class CopyTask(Task):
+    """Built-in sink Task that bulk loads the DataFrame, or stream of DataFrames,
+    produced by its dependency into a table using COPY.
+
+    Usage:
+    >>> CopyTask(
+    ...     table='dw.customer',
+    ...     depends_on=['transf_cust'],
+    ...     name='load_customer',
+    ...     path=DATABASE_CONFIG,
+    ...     section=SECTION,
+    ...     staging=True)
+    """
+
+    def __init__(self, table: Any, depends_on: List = None, name: str = None, **kwargs) -> None:
+        super().__init__(copy_sink, depends_on=depends_on, name=name, table=table, **kwargs)
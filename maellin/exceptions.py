@@ -43,3 +43,15 @@ class ActivityFailedError(Exception):
 
 class NotFoundError(Exception):
     pass
+
+
+class StreamConsumedError(Exception):
+    pass
+
+
+class DuplicateNameError(Exception):
+    pass
+
+
+class PlanFormatError(Exception):
+    pass
@@ -0,0 +1,71 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from asyncio import FIRST_COMPLETED, create_task, run, wait
+from typing import Any, TypeVar
+
+from maellin.executors.base import ConcurrentExecutor
+from maellin.metrics import sample
+
+Task = TypeVar('Task')
+
+
+class AsyncioExecutor(ConcurrentExecutor):
+    """Executes Tasks concurrently on a single event loop.
+
+    Coroutine functions are awaited on the loop and synchronous functions are
+    offloaded to a thread. A Task is scheduled as soon as all of its predecessors
+    in the DAG have completed, with at most `workers` Tasks in flight when set.
+    Tasks interleave on the loop so their cpu time is not recorded.
+    """
+
+    async def _execute(self, task: Task) -> Any:
+        """Runs a single Task on the event loop and returns its result"""
+        self.context.update_status(task, 'Running')
+        self._log.info('Running Task %s on Event Loop', task.name)
+        inputs = self.results.get_inputs(task)
+        before = sample(cpu=False)
+        try:
+            return await self.context.aexecute(task, *inputs)
+        finally:
+            self.stats.record(task, before, sample(cpu=False), worker='event-loop')
+
+    async def astart(self):
+        """Runs all Tasks from the task queue on the running event loop"""
+        self._log.info('Starting Job %s, Run %s', self.job_id, self.context.run_id)
+
+        def submit(task: Task):
+            return create_task(self._execute(task))
+
+        running = {}
+        self._enqueue(self._collect())
+        self._dispatch(submit, running)
+
+        while running:
+            done, _ = await wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                _task = running.pop(future)
+                if future.exception() is not None:
+                    self._finish(_task, error=future.exception())
+                    continue
+
+                self._enqueue(self._finish(_task, future.result()))
+            self._dispatch(submit, running)
+
+        self._raise_failures()
+
+    def start(self):
+        """Runs all Tasks from the task queue on a new event loop"""
+        return run(self.astart())
@@ -13,12 +13,19 @@
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from abc import abstractclassmethod, ABCMeta
+from abc import abstractclassmethod, abstractmethod, ABCMeta
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from itertools import count
+from maellin.exceptions import ActivityFailedError
+from maellin.queues import QueueFactory
+from maellin.runs import RunContext
 from maellin.utils import generate_uuid
 from maellin.logger import LoggingMixin
-from typing import TypeVar
+from typing import Any, Callable, Dict, List, TypeVar
 
 Queue = TypeVar('Queue')
+DAG = TypeVar('DAG')
+Task = TypeVar('Task')
 
 
 class AbstractBaseExecutor(metaclass=ABCMeta):
@@ -39,10 +46,19 @@ class BaseExecutor(AbstractBaseExecutor, LoggingMixin):
 
     job_id = generate_uuid()
 
-    def __init__(self, task_queue: Queue, result_queue: Queue):
+    def __init__(
+            self,
+            task_queue: Queue,
+            result_queue: Queue,
+            release_results: bool = False,
+            context: RunContext = None):
         super().__init__()
         self.task_queue = task_queue
         self.result_queue = result_queue
+        # statuses, results and metrics are written to the context of the run
+        self.context = context if context is not None else RunContext(release_results=release_results)
+        self.results = self.context.results
+        self.stats = self.context.stats
         self._log = self.logger
 
     def start(self):
@@ -52,3 +68,166 @@ class BaseExecutor(AbstractBaseExecutor, LoggingMixin):
     def shutdown(self):
         """Stops Execution of Tasks"""
         return
+
+
+class ConcurrentExecutor(BaseExecutor):
+    """Base Class for Executors that run independent Tasks at the same time.
+
+    A Task becomes ready once all of its predecessors in the DAG have completed.
+    Ready Tasks wait in a priority queue and at most `workers` of them are in
+    flight, the Task with the highest priority is dispatched first and ties are
+    dispatched in the order they became ready. When a Task fails its descendants
+    are not run, independent branches keep running and the failures are reported
+    once every running Task finished. Subclasses decide where Tasks run, see
+    PoolExecutor and AsyncioExecutor.
+    """
+
+    def __init__(
+            self,
+            task_queue: Queue,
+            result_queue: Queue,
+            dag: DAG,
+            workers: int = None,
+            release_results: bool = False,
+            priorities: Dict[str, float] = None,
+            context: RunContext = None):
+        super().__init__(task_queue, result_queue, release_results, context)
+        self.dag = dag
+        self.workers = workers if workers is not None else self._default_workers()
+        self.priorities = priorities or {}
+        self.failures = {}
+        self.ready = QueueFactory.factory(type='priority')
+        self._order = count()
+
+    def _default_workers(self) -> int:
+        """Number of workers used when none are requested, None is unbounded"""
+        return None
+
+    def _collect(self) -> List[Task]:
+        """Drains the task queue and counts the unfinished predecessors of every task.
+        Tasks are dispatched by readiness rather than queue order.
+
+        Returns:
+            List[Task]: tasks without predecessors that are ready to run
+        """
+        self._tasks: Dict[str, Task] = {}
+        while not self.task_queue.empty():
+            _task = self.task_queue.get()
+            self._tasks[_task.tid] = _task
+            self.task_queue.task_done()
+
+        # count predecessors on the compiled plan, Tasks outside of this run are done
+        self._plan = self.dag.compile()
+        index = self._plan.index
+        ids = {index[tid] for tid in self._tasks}
+        self._waiting_on = {
+            i: sum(1 for p in self._plan.predecessors(i) if p in ids)
+            for i in ids
+        }
+        self.results.track(self._tasks.values())
+        return [self._tasks[tid] for tid in self._tasks if self._waiting_on[index[tid]] == 0]
+
+    def _finish(self, task: Task, result: Any = None, error: Exception = None) -> List[Task]:
+        """Records the outcome of a Task in the context of the run
+
+        Args:
+            task (Task): the task that finished running
+            result (Any, optional): the result of the task. Defaults to None.
+            error (Exception, optional): the error raised by the task. Defaults to None.
+
+        Returns:
+            List[Task]: successors that became ready to run
+        """
+        self.results.consumed(task)
+        if error is not None:
+            self.context.update_status(task, 'Failed')
+            self.stats.finished(task, 'Failed')
+            self.failures[task.name or task.tid] = error
+            self._log.error('Task %s Failed: %r', task.name, error)
+            return []
+
+        self.context.update_status(task, 'Completed')
+        self.results.put(task, result)
+        self.result_queue.put(task)
+        self.stats.finished(task, 'Completed', self.results.size(task.tid))
+
+        ready = []
+        for successor in self._plan.successors(self._plan.index[task.tid]):
+            if successor not in self._waiting_on:
+                continue
+            self._waiting_on[successor] -= 1
+            if self._waiting_on[successor] == 0:
+                ready.append(self._tasks[self._plan.tids[successor]])
+        return ready
+
+    def _enqueue(self, tasks: List[Task]) -> None:
+        """Adds ready Tasks to the ready queue ordered by priority"""
+        for task in tasks:
+            self.stats.queued(task)
+            self.ready.put((-self.priorities.get(task.tid, 0.0), next(self._order), task.tid))
+
+    def _dispatch(self, submit: Callable[[Task], Any], running: Dict[Any, Task]) -> None:
+        """Submits ready Tasks until all workers are busy
+
+        Args:
+            submit (Callable[[Task], Any]): submits a Task and returns its future
+            running (Dict[Any, Task]): Tasks in flight by future, updated in place
+        """
+        while not self.ready.empty() and (self.workers is None or len(running) < self.workers):
+            _, _, tid = self.ready.get()
+            task = self._tasks[tid]
+            running[submit(task)] = task
+
+    def _raise_failures(self) -> None:
+        """Raises an ActivityFailedError if any of the Tasks failed"""
+        if self.failures:
+            names = ', '.join(str(name) for name in self.failures)
+            raise ActivityFailedError(f'Tasks Failed: {names}') from next(iter(self.failures.values()))
+
+
+class PoolExecutor(ConcurrentExecutor):
+    """Base Class for Executors that dispatch Tasks to a concurrent.futures pool of workers"""
+
+    @abstractmethod
+    def _create_pool(self) -> Executor:
+        """Creates the concurrent.futures pool used to run Tasks"""
+        raise NotImplementedError('Abstract Method that needs to be implemented by the subclass')
+
+    @abstractmethod
+    def _submit(self, pool: Executor, task: Task) -> Future:
+        """Submits a Task to the pool"""
+        raise NotImplementedError('Abstract Method that needs to be implemented by the subclass')
+
+    def _on_complete(self, task: Task, future: Future) -> Any:
+        """Returns the result of a Task from its finished future"""
+        return future.result()
+
+    def start(self):
+        self._log.info('Starting Job %s, Run %s', self.job_id, self.context.run_id)
+
+        with self._create_pool() as pool:
+            def submit(task: Task) -> Future:
+                return self._submit(pool, task)
+
+            running = {}
+            self._enqueue(self._collect())
+            self._dispatch(submit, running)
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _task = running.pop(future)
+                    try:
+                        result = self._on_complete(_task, future)
+                    except Exception as error:
+                        self._finish(_task, error=error)
+                        continue
+
+                    self._enqueue(self._finish(_task, result))
+                self._dispatch(submit, running)
+
+        self._raise_failures()
+
+    def shutdown(self):
+        """Results stay in the context of the run until it is released"""
+        return
@@ -13,7 +13,8 @@
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 from maellin.executors.base import BaseExecutor
-from maellin.utils import get_task_result
+from maellin.metrics import sample
+from maellin.runs import RunContext
 from maellin.logger import LoggingMixin
 from typing import TypeVar
 
@@ -28,10 +29,13 @@ class DefaultWorker(LoggingMixin):
     """
     worker_id = 0
 
-    def __init__(self, task_queue: Queue, result_queue: Queue):
+    def __init__(self, task_queue: Queue, result_queue: Queue, context: RunContext = None):
         DefaultWorker.worker_id += 1
         self.task_queue = task_queue
         self.result_queue = result_queue
+        self.context = context if context is not None else RunContext()
+        self.results = self.context.results
+        self.stats = self.context.stats
         self._log = self.logger
 
     def run(self):
@@ -39,26 +43,30 @@ class DefaultWorker(LoggingMixin):
         while not self.task_queue.empty():
             # Get the activity from the queue to process
             _task = self.task_queue.get()
-            _task.update_status('Running')
-            self._log.info('Running Task %s on Worker %s ' % (_task.name, self.worker_id))
+            self.context.update_status(_task, 'Running')
+            self._log.info('Running Task %s on Worker %s', _task.name, self.worker_id)
 
             # Get inputs to use from dependencies
-            if _task.depends_on:
-                inputs = ()
-                for dep_task in list(dict.fromkeys(_task.depends_on).keys()):
-                    for completed_task in list(self.result_queue.queue):
-                        if dep_task.tid == completed_task.tid:
-                            input_data = get_task_result(completed_task)
-                            inputs = inputs + input_data
-            else:
-                inputs = tuple()
+            inputs = self.results.get_inputs(_task)
 
             # Run the task with instructions
-            _task.run(*inputs)
-            _task.update_status('Completed')
-
-            # Put the results of the complete task in the result queue
+            before = sample()
+            try:
+                result = self.context.execute(_task, *inputs)
+            except Exception:
+                self.context.update_status(_task, 'Failed')
+                self.stats.finished(_task, 'Failed')
+                raise
+            finally:
+                self.stats.record(_task, before, sample(), worker=self.worker_id)
+            self.context.update_status(_task, 'Completed')
+
+            # Put the results of the complete task in the result store & queue
+            # and release the results of dependencies no other task needs
+            self.results.consumed(_task)
+            self.results.put(_task, result)
             self.result_queue.put(_task)
+            self.stats.finished(_task, 'Completed', self.results.size(_task.tid))
 
             # Activity is finished running
             self.task_queue.task_done()
@@ -67,14 +75,18 @@ class DefaultWorker(LoggingMixin):
 class DefaultExecutor(BaseExecutor):
     """Executes Tasks Sequentially using a single worker"""
 
-    def __init__(self, task_queue, result_queue):
-        super().__init__(task_queue, result_queue)
+    def __init__(self, task_queue, result_queue, release_results: bool = False, context: RunContext = None):
+        super().__init__(task_queue, result_queue, release_results, context)
 
     def start(self):
-        self._log.info('Starting Job %s' % self.job_id)
-        self.worker = DefaultWorker(self.task_queue, self.result_queue)
+        self._log.info('Starting Job %s, Run %s', self.job_id, self.context.run_id)
+        tasks = list(self.task_queue.queue)
+        self.results.track(tasks)
+        for task in tasks:
+            self.stats.queued(task)
+        self.worker = DefaultWorker(self.task_queue, self.result_queue, self.context)
         return self.worker.run()
 
     def shutdown(self):
-        """Removes the worker and results"""
-        del self.worker
+        """Removes the worker, results stay in the context of the run"""
+        self.__dict__.pop('worker', None)
@@ -0,0 +1,85 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Dict, TypeVar
+
+from maellin.executors.default import DefaultExecutor
+from maellin.runs import RunContext
+
+Queue = TypeVar('Queue')
+DAG = TypeVar('DAG')
+# the concurrent executors are imported when requested, asyncio and
+# multiprocessing are slow to import and not needed by every run
+Executor = TypeVar('Executor')
+
+
+class ExecutorFactory:
+    """Factory class that returns a supported executor type"""
+    @staticmethod
+    def factory(
+            type: str = 'default',
+            task_queue: Queue = None,
+            result_queue: Queue = None,
+            dag: DAG = None,
+            workers: int = None,
+            release_results: bool = False,
+            priorities: Dict[str, float] = None,
+            context: RunContext = None) -> Executor:
+        """Factory that returns an executor based on type
+
+        Args:
+            type (str): type of executor to use. Defaults to a single
+            sequential worker. Other accepted types are "multi-threading", "multi-processing",
+            "asyncio" or "shared", which runs Tasks on the process-wide ExecutionService
+            task_queue (Queue): queue of Tasks in topological sort order
+            result_queue (Queue): queue receiving completed Tasks
+            dag (DAG): the DAG the Tasks were collected from
+            workers (int, optional): max number of concurrent workers. Defaults to None.
+            release_results (bool, optional): drop intermediate results once all of their
+                consumers have run. Defaults to False.
+            priorities (Dict[str, float], optional): priority of each Task by id, ready Tasks
+                with a higher priority are dispatched first by the concurrent executors.
+                Defaults to None.
+            context (RunContext, optional): state of the run the executor writes the status
+                and result of every Task to. Defaults to a new RunContext.
+
+        Returns:
+            DefaultExecutor | MultiThreadingExecutor | MultiProcessingExecutor | AsyncioExecutor | SharedExecutor :
+                Maellin Executor
+        """
+        if type == 'default':
+            return DefaultExecutor(task_queue, result_queue, release_results, context=context)
+        elif type == 'multi-threading':
+            from maellin.executors.threaded import MultiThreadingExecutor
+            return MultiThreadingExecutor(
+                task_queue, result_queue, dag=dag, workers=workers, release_results=release_results,
+                priorities=priorities, context=context)
+        elif type == 'multi-processing':
+            from maellin.executors.processes import MultiProcessingExecutor
+            return MultiProcessingExecutor(
+                task_queue, result_queue, dag=dag, workers=workers, release_results=release_results,
+                priorities=priorities, context=context)
+        elif type == 'asyncio':
+            from maellin.executors.asynchronous import AsyncioExecutor
+            return AsyncioExecutor(
+                task_queue, result_queue, dag=dag, workers=workers, release_results=release_results,
+                priorities=priorities, context=context)
+        elif type == 'shared':
+            from maellin.executors.service import SharedExecutor
+            return SharedExecutor(
+                task_queue, result_queue, dag=dag, workers=workers, release_results=release_results,
+                priorities=priorities, context=context)
+        else:
+            raise ValueError(type)
@@ -0,0 +1,156 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import traceback
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, Tuple, TypeVar
+
+import cloudpickle as cpickle
+
+from maellin.executors.base import PoolExecutor
+from maellin.metrics import sample
+from maellin.runs import RunContext
+
+Task = TypeVar('Task')
+TaskCache = TypeVar('TaskCache')
+
+_MISSING = object()
+
+
+class _RemoteTraceback(Exception):
+    """Carries the traceback of an error raised in a worker process"""
+
+    def __init__(self, tb: str) -> None:
+        self.tb = tb
+
+    def __str__(self) -> str:
+        return self.tb
+
+
+def _picklable_error(error: Exception) -> Exception:
+    """Returns the error if it can be sent back to the parent process, a RuntimeError otherwise"""
+    try:
+        cpickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(repr(error))
+
+
+def _run_payload(payload: bytes) -> bytes:
+    """Unpickles a callable with its inputs, runs it and pickles the result
+    together with the time it took, the samples of the worker's clocks and the
+    raw cProfile stats when profiling is enabled. Errors raised by the callable
+    are returned with the samples instead of the result, so failed Tasks are
+    measured as well. Executed inside of a worker process.
+    """
+    func, inputs, profile = cpickle.loads(payload)
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    result = error = tb = None
+    before = sample()
+    start_time = perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        result = func(*inputs)
+    except Exception as exc:
+        error, tb = _picklable_error(exc), traceback.format_exc()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+    elapsed = perf_counter() - start_time
+    after = sample()
+
+    stats = None
+    if profiler is not None:
+        profiler.create_stats()
+        stats = profiler.stats
+    return cpickle.dumps((elapsed, result, error, tb, before, after, os.getpid(), stats))
+
+
+class MultiProcessingExecutor(PoolExecutor):
+    """Executes Tasks concurrently on a pool of worker processes.
+
+    Task callables and their inputs are shipped to the workers with cloudpickle,
+    so lambdas and functions defined in __main__ are supported. Results are sent
+    back to the parent process and stored in the context of the run for its dependents.
+    Cached outputs are looked up and stored by the parent, hits are not dispatched.
+    Best suited for CPU bound Tasks that would otherwise be limited by the GIL.
+    """
+
+    def __init__(
+            self,
+            task_queue,
+            result_queue,
+            dag,
+            workers: int = None,
+            release_results: bool = False,
+            priorities: Dict[str, float] = None,
+            mp_context: Any = None,
+            context: RunContext = None):
+        super().__init__(task_queue, result_queue, dag, workers, release_results, priorities, context)
+        self.mp_context = mp_context
+        self._cache_keys: Dict[str, Tuple[TaskCache, str]] = {}
+
+    def _default_workers(self) -> int:
+        # the same default as ProcessPoolExecutor
+        return os.cpu_count() or 1
+
+    def _create_pool(self) -> Executor:
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context)
+
+    def _submit(self, pool: Executor, task: Task) -> Future:
+        self.context.update_status(task, 'Running')
+        inputs = self.results.get_inputs(task)
+
+        # the cache is read and written in the parent, only misses are sent to the workers
+        cache = self.context.cache_of(task)
+        if cache is not None:
+            before, start_time = sample(), perf_counter()
+            key, result = cache.lookup(task.func, inputs, default=_MISSING)
+            if result is not _MISSING:
+                self._log.info('Read Task %s from the Cache', task.name)
+                future = Future()
+                future.set_result(
+                    (perf_counter() - start_time, result, None, None, before, sample(), os.getpid(), None))
+                return future
+            if key is not None:
+                self._cache_keys[task.tid] = (cache, key)
+
+        self._log.info('Running Task %s on Process Pool', task.name)
+        payload = cpickle.dumps((task.func, inputs, self.context.profiles(task)))
+        return pool.submit(_run_payload, payload)
+
+    def _on_complete(self, task: Task, future: Future) -> Any:
+        outcome = future.result()
+        # outcomes read from the cache are not pickled
+        if isinstance(outcome, bytes):
+            outcome = cpickle.loads(outcome)
+        duration, result, error, tb, before, after, pid, profile = outcome
+        self.stats.record(task, before, after, worker=pid)
+        if profile is not None:
+            task.add_profile(profile)
+        cached = self._cache_keys.pop(task.tid, None)
+        if error is not None:
+            raise error from _RemoteTraceback(tb)
+        if cached is not None:
+            cache, key = cached
+            cache.store(key, result, task.func)
+        self.context.durations[task.tid] = duration
+        return result
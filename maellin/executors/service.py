@@ -0,0 +1,206 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from itertools import count
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, Hashable, Tuple
+
+from maellin.executors.threaded import MultiThreadingExecutor
+from maellin.logger import LoggingMixin
+
+_Item = Tuple[Future, Callable, tuple, dict]
+
+
+class _Share:
+    """Queue and counters of one pipeline in the ExecutionService"""
+
+    __slots__ = ('queue', 'running', 'limit', 'weight', 'served')
+
+    def __init__(self) -> None:
+        self.queue: Deque[_Item] = deque()
+        self.running = 0
+        self.limit = None
+        self.weight = 1.0
+        self.served = 0
+
+
+class ExecutionService(LoggingMixin):
+    """Process-wide pool of worker threads shared by all pipelines.
+
+    At most `max_workers` calls run at a time across every pipeline and each
+    pipeline can be capped with its own limit. When a worker frees up the next
+    call is taken from the pipeline with the fewest running calls relative to its
+    weight, ties go to the pipeline that was served least recently, so a burst of
+    pipelines shares the workers fairly instead of the first one taking all of them.
+    Calls of one pipeline run in the order they were submitted.
+
+    Usage:
+    >>> ExecutionService.instance().configure(max_workers=16) # bound the whole process
+    >>> pipe = Pipeline(steps=my_steps, type='shared', workers=4) # at most 4 of the 16 workers
+    >>> pipe.run()
+    """
+    _instance = None
+    _instance_lock = Lock()
+
+    def __init__(self, max_workers: int = None) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.active = 0
+        self._shares: Dict[Hashable, _Share] = {}
+        self._lock = Lock()
+        self._order = count(1)
+        self._pool = None
+        self._log = self.logger
+
+    @classmethod
+    def instance(cls) -> 'ExecutionService':
+        """Returns the service shared by the whole process"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def configure(self, max_workers: int) -> None:
+        """Changes the global limit, calls that are already running are not interrupted"""
+        with self._lock:
+            if max_workers != self.max_workers and self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            self.max_workers = max_workers
+            self._dispatch()
+
+    def client(self, key: Hashable, limit: int = None, weight: float = 1.0) -> 'ServiceClient':
+        """Returns an Executor that submits to the service on behalf of a pipeline
+
+        Args:
+            key (Hashable): identifies the pipeline, runs with the same key share its limit
+            limit (int, optional): max number of running calls of the pipeline. Defaults to None.
+            weight (float, optional): relative share of the workers when pipelines compete.
+                Defaults to 1.0.
+        """
+        with self._lock:
+            share = self._shares.setdefault(key, _Share())
+            share.limit = limit
+            share.weight = weight
+        return ServiceClient(self, key)
+
+    def submit(self, key: Hashable, fn: Callable, *args, **kwargs) -> Future:
+        """Queues a call of a pipeline and returns its future"""
+        future = Future()
+        with self._lock:
+            self._shares.setdefault(key, _Share()).queue.append((future, fn, args, kwargs))
+            self._dispatch()
+        return future
+
+    def _next(self) -> Hashable:
+        """Picks the pipeline to serve next, the caller holds the lock"""
+        best, best_rank = None, None
+        for key, share in self._shares.items():
+            if not share.queue or (share.limit is not None and share.running >= share.limit):
+                continue
+            rank = (share.running / share.weight, share.served)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = key, rank
+        return best
+
+    def _dispatch(self) -> None:
+        """Starts queued calls until all workers are busy, the caller holds the lock"""
+        while self.active < self.max_workers:
+            key = self._next()
+            if key is None:
+                return
+            share = self._shares[key]
+            future, fn, args, kwargs = share.queue.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            share.running += 1
+            share.served = next(self._order)
+            self.active += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='maellin-service')
+            self._pool.submit(self._call, key, future, fn, args, kwargs)
+
+    def _call(self, key: Hashable, future: Future, fn: Callable, args: tuple, kwargs: dict) -> None:
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as error:
+            self._release(key)
+            future.set_exception(error)
+        else:
+            self._release(key)
+            future.set_result(result)
+
+    def _release(self, key: Hashable) -> None:
+        """Frees the worker of a finished call and starts the next one"""
+        with self._lock:
+            share = self._shares[key]
+            share.running -= 1
+            self.active -= 1
+            self._dispatch()
+
+    def close(self, key: Hashable) -> None:
+        """Forgets a pipeline once it has nothing running or queued"""
+        with self._lock:
+            share = self._shares.get(key)
+            if share is not None and not share.queue and share.running == 0:
+                del self._shares[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the running and queued calls in total and by pipeline"""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'active': self.active,
+                'queued': sum(len(share.queue) for share in self._shares.values()),
+                'pipelines': {
+                    key: {'running': share.running, 'queued': len(share.queue), 'limit': share.limit}
+                    for key, share in self._shares.items()},
+            }
+
+
+class ServiceClient(Executor):
+    """Executor of a single pipeline backed by the ExecutionService. Shutting
+    it down leaves the shared workers running."""
+
+    def __init__(self, service: ExecutionService, key: Hashable) -> None:
+        self.service = service
+        self.key = key
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        return self.service.submit(self.key, fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self.service.close(self.key)
+
+
+class SharedExecutor(MultiThreadingExecutor):
+    """Executes Tasks on the process-wide ExecutionService.
+
+    Every scheduled Pipeline submits its ready Tasks to the same pool of
+    workers, `workers` caps how many Tasks of this Pipeline run at once and
+    the service bounds the whole process. Runs of the same Pipeline share
+    its limit.
+    """
+
+    def _default_workers(self) -> int:
+        # bounded by the service
+        return None
+
+    def _create_pool(self) -> Executor:
+        key = getattr(self.dag, 'pid', id(self.dag))
+        return ExecutionService.instance().client(key, limit=self.workers)
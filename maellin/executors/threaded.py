@@ -0,0 +1,55 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from threading import current_thread
+from typing import Any, TypeVar
+
+from maellin.executors.base import PoolExecutor
+from maellin.metrics import sample
+
+Task = TypeVar('Task')
+
+
+class MultiThreadingExecutor(PoolExecutor):
+    """Executes Tasks concurrently on a pool of worker threads.
+
+    A Task is dispatched as soon as all of its predecessors in the DAG have
+    completed, so independent branches of a Pipeline run side by side.
+    Best suited for I/O bound Tasks such as database reads and writes.
+    """
+
+    def _default_workers(self) -> int:
+        # the same default as ThreadPoolExecutor
+        return min(32, (os.cpu_count() or 1) + 4)
+
+    def _create_pool(self) -> Executor:
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='maellin-worker')
+
+    def _execute(self, task: Task) -> Any:
+        """Runs a single Task on the current worker thread and returns its result"""
+        self.context.update_status(task, 'Running')
+        worker = current_thread().name
+        self._log.info('Running Task %s on Worker %s', task.name, worker)
+        inputs = self.results.get_inputs(task)
+        before = sample()
+        try:
+            return self.context.execute(task, *inputs)
+        finally:
+            self.stats.record(task, before, sample(), worker=worker)
+
+    def _submit(self, pool: Executor, task: Task) -> Future:
+        return pool.submit(self._execute, task)
@@ -0,0 +1,157 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import os
+from typing import Any, Dict, List, TypeVar
+
+from maellin.metrics import RunStats, TaskMetrics
+
+ExecutionPlan = TypeVar('ExecutionPlan')
+
+_RUN, _QUEUE, _CRITICAL_PATH = 0, 1, 2
+
+
+def critical_path(stats: RunStats, plan: ExecutionPlan) -> List[str]:
+    """Follows the chain of Tasks that determined how long the run took, using the
+    measured durations as costs
+
+    Args:
+        stats (RunStats): metrics of the run
+        plan (ExecutionPlan): the compiled DAG the Tasks were run from
+
+    Returns:
+        List[str]: tids of the Tasks on the critical path in execution order
+    """
+    ran = [tid for tid in stats.tasks if tid in plan.index]
+    if not ran:
+        return []
+    paths = plan.critical_paths({tid: metrics.duration or 0.0 for tid, metrics in stats.tasks.items()})
+    tid = max(ran, key=paths.get)
+    chain = [tid]
+    while True:
+        successors = [plan.tids[s] for s in plan.successors(plan.index[tid]) if plan.tids[s] in stats.tasks]
+        if not successors:
+            return chain
+        tid = max(successors, key=paths.get)
+        chain.append(tid)
+
+
+class TraceRecorder:
+    """Writes a run as Chrome Trace Event JSON that can be opened in Perfetto
+    (ui.perfetto.dev) or chrome://tracing.
+
+    The trace is built from the samples the executors record for every Task,
+    so tracing a run adds no cost while the Tasks execute. Every worker thread
+    or process gets its own track with a span per Task. Queue waits are drawn
+    as overlapping async spans, and the chain of Tasks that bounded the run is
+    repeated on a Critical Path track. Timestamps are microseconds since the
+    start of the run.
+
+    Usage:
+    >>> pipe.run(trace='nightly.trace.json')
+    >>> TraceRecorder('nightly').dump(pipe.last_run_stats, 'nightly.trace.json', plan=pipe.compile())
+    """
+
+    def __init__(self, name: str = 'maellin') -> None:
+        self.name = name
+        self.pid = os.getpid()
+
+    def _us(self, stats: RunStats, timestamp: float) -> float:
+        return round((timestamp - stats.start) * 1e6, 3)
+
+    def _metadata(self, tid: int, name: str, sort_index: int) -> List[Dict[str, Any]]:
+        return [
+            {'ph': 'M', 'name': 'thread_name', 'pid': self.pid, 'tid': tid, 'args': {'name': name}},
+            {'ph': 'M', 'name': 'thread_sort_index', 'pid': self.pid, 'tid': tid, 'args': {'sort_index': sort_index}},
+        ]
+
+    def _span(self, stats: RunStats, metrics: TaskMetrics, tid: int, cat: str) -> Dict[str, Any]:
+        return {
+            'ph': 'X',
+            'name': metrics.name or metrics.tid,
+            'cat': cat,
+            'pid': self.pid,
+            'tid': tid,
+            'ts': self._us(stats, metrics.start),
+            'dur': round(metrics.duration * 1e6, 3),
+            'args': {
+                'tid': metrics.tid,
+                'status': metrics.status,
+                'worker': str(metrics.worker),
+                'queue_wait': metrics.queue_wait,
+                'cpu_time': metrics.cpu_time,
+                'rss_delta': metrics.rss_delta,
+                'result_bytes': metrics.result_bytes,
+            },
+        }
+
+    def events(self, stats: RunStats, plan: ExecutionPlan = None) -> List[Dict[str, Any]]:
+        """Converts the metrics of a run into trace events
+
+        Args:
+            stats (RunStats): metrics of the run
+            plan (ExecutionPlan, optional): the compiled DAG, adds the Critical Path
+                track when given. Defaults to None.
+
+        Returns:
+            List[Dict[str, Any]]: Chrome trace events
+        """
+        events = [{'ph': 'M', 'name': 'process_name', 'pid': self.pid, 'args': {'name': self.name}}]
+        events += self._metadata(_RUN, 'Run', _RUN)
+        events += self._metadata(_QUEUE, 'Queue', _QUEUE)
+        end = stats.end if stats.end is not None else max(
+            (metrics.end for metrics in stats.tasks.values() if metrics.end is not None), default=stats.start)
+        events.append({
+            'ph': 'X', 'name': self.name, 'cat': 'run', 'pid': self.pid, 'tid': _RUN,
+            'ts': 0, 'dur': self._us(stats, end), 'args': {'tasks': len(stats)}})
+
+        workers: Dict[str, int] = {}
+        for i, metrics in enumerate(stats.tasks.values()):
+            if metrics.queued is not None and metrics.start is not None:
+                wait = {'name': metrics.name or metrics.tid, 'cat': 'queue', 'id': i, 'pid': self.pid, 'tid': _QUEUE}
+                events.append({**wait, 'ph': 'b', 'ts': self._us(stats, metrics.queued)})
+                events.append({**wait, 'ph': 'e', 'ts': self._us(stats, max(metrics.queued, metrics.start))})
+            if metrics.start is None or metrics.end is None:
+                continue
+            worker = str(metrics.worker)
+            if worker not in workers:
+                workers[worker] = len(workers) + _CRITICAL_PATH + 1
+                events += self._metadata(workers[worker], f'Worker {worker}', workers[worker])
+            events.append(self._span(stats, metrics, workers[worker], 'task'))
+
+        if plan is not None:
+            events += self._metadata(_CRITICAL_PATH, 'Critical Path', _CRITICAL_PATH)
+            for tid in critical_path(stats, plan):
+                metrics = stats.tasks[tid]
+                if metrics.start is not None and metrics.end is not None:
+                    events.append(self._span(stats, metrics, _CRITICAL_PATH, 'critical_path'))
+        return events
+
+    def to_json(self, stats: RunStats, plan: ExecutionPlan = None) -> str:
+        """Serializes a run as a Chrome trace JSON document"""
+        return json.dumps({'traceEvents': self.events(stats, plan), 'displayTimeUnit': 'ms'}, default=str)
+
+    def dump(self, stats: RunStats, path: str, plan: ExecutionPlan = None) -> None:
+        """Writes the trace of a run to a file
+
+        Args:
+            stats (RunStats): metrics of the run
+            path (str): file to write, load it in Perfetto or chrome://tracing
+            plan (ExecutionPlan, optional): the compiled DAG to draw the critical path.
+                Defaults to None.
+        """
+        with open(path, 'w') as f:
+            f.write(self.to_json(stats, plan))
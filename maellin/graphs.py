@@ -13,14 +13,15 @@
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Dict, List, Type
+from typing import Dict, List, Set, Tuple, Type
 from uuid import uuid4
 
-from networkx import (MultiDiGraph, compose, is_directed_acyclic_graph,
-                      is_empty, is_weakly_connected, number_of_nodes,
-                      topological_sort)
+from networkx import (MultiDiGraph, compose, descendants,
+                      is_empty, is_weakly_connected,
+                      number_of_nodes)
 
 from maellin.exceptions import CircularDependencyError, MissingDependencyError
+from maellin.plan import ExecutionPlan
 from maellin.tasks import Task
 
 
@@ -32,6 +33,36 @@ class DAG:
         self.dag = MultiDiGraph()
         self.attrs = attrs
 
+    @property
+    def dag(self) -> MultiDiGraph:
+        return self._dag
+
+    @dag.setter
+    def dag(self, G: MultiDiGraph) -> None:
+        self._dag = G
+        self._plan = None
+
+    def _shape(self) -> Tuple[int, int]:
+        """Number of nodes and of connected node pairs of the graph"""
+        succ = self._dag.succ
+        return len(succ), sum(len(nbrs) for nbrs in succ.values())
+
+    def compile(self) -> ExecutionPlan:
+        """Compiles the DAG into an immutable ExecutionPlan. The plan is cached until
+        nodes or edges are added with add_node_to_dag or add_edge_to_dag, the DAG is
+        replaced or the number of nodes or edges of the networkx graph changes. Edges
+        rewired in place on the graph keep the same counts, assign the graph to .dag
+        again after such changes.
+
+        Returns:
+            ExecutionPlan: integer indexed adjacency, in-degrees and topological levels
+        """
+        shape = self._shape()
+        if self._plan is None or self._plan_shape != shape:
+            self._plan = ExecutionPlan(self._dag.succ)
+            self._plan_shape = shape
+        return self._plan
+
     def _validate_dag(self) -> None:
         """Validates Pipeline is constructed properly
 
@@ -72,9 +103,10 @@ class DAG:
             task (Type[Task], optional): Task Instance. Defaults to None.
             properties (Dict, optional): User Properties. Defaults to None.
         """
+        self._plan = None
         # if the node already exists
-        if task.tid in list(self.dag.nodes):
-            existing = dict(self.dag.nodes(data='tasks')).get(task.tid, None)
+        if task.tid in self.dag:
+            existing = self.dag.nodes[task.tid].get('tasks', None)
             if existing is not None:
                 updates = existing.update({task.tid: task})
                 return
@@ -107,6 +139,7 @@ class DAG:
             activity_id (uuid): Task Id used to define the edge
         """
         # Add the edge to the DAG
+        self._plan = None
         self.dag.add_edges_from([
             (
                 tid_from, tid_to, activity_id, {
@@ -119,8 +152,12 @@ class DAG:
 
     def is_dag(self) -> bool:
         """Validates all edges are directed and no cycles exist within the DAG"""
-        # Checks that graph is a DAG
-        return is_directed_acyclic_graph(G=self.dag)
+        # Compiling the plan fails if the graph contains a cycle
+        try:
+            self.compile()
+        except CircularDependencyError:
+            return False
+        return True
 
     def is_weakly_connected(self) -> bool:
         """Validates all edges and nodes are"""
@@ -139,8 +176,8 @@ class DAG:
         Returns:
             List: nodes containing Tasks in topological sort order
         """
-        # Topical sort of Tasks into a list
-        return list(topological_sort(G=self.dag))
+        # Topical sort of Tasks into a list, level by level
+        return self.compile().topological_sort()
 
     def get_all_nodes(self) -> dict:
         """Get all Nodes from the DAG
@@ -198,6 +235,31 @@ class DAG:
         """
         return list(self.dag.successors(n))
 
+    def get_descendants(self, n) -> Set:
+        """Returns all nodes reachable from a node, \
+        such that there exists a directed path from n to each of them
+
+        Args:
+            n (node): A node in the DAG
+
+        Returns:
+            Set: set of descendants
+        """
+        return descendants(self.dag, n)
+
+    def get_critical_paths(self, costs: Dict[str, float]) -> Dict[str, float]:
+        """Computes the longest remaining path of every node, the cost of the node plus
+        the most expensive chain of descendants that can only start after it finishes.
+        Nodes with long remaining paths should be started first to shorten the makespan.
+
+        Args:
+            costs (Dict[str, float]): estimated cost of each node, missing nodes cost 0
+
+        Returns:
+            Dict[str, float]: the longest remaining path by node
+        """
+        return self.compile().critical_paths(costs)
+
     def repair_attributes(self, G: MultiDiGraph, H: MultiDiGraph, attr: str) -> None:
         """Preserved node attributes that may be overwritten when using merge.
         Note: this method only works if the attribute being preserved is a dictionary
@@ -13,19 +13,90 @@
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import sys
 import logging
+import sys
+from queue import SimpleQueue
+from typing import Any, TypeVar
+
+QueueListener = TypeVar('QueueListener')
 
 
 FORMAT = '%(asctime)s :: %(name)s :: %(levelname)s :: %(message)s'
 
+_CONFIGURED = False
+_LISTENERS = []
+
+
+def _configure() -> None:
+    """Configures the root logger once, basicConfig does nothing if it already has handlers"""
+    global _CONFIGURED
+    if not _CONFIGURED:
+        logging.basicConfig(stream=sys.stdout, level='INFO', format=FORMAT)
+        _CONFIGURED = True
+
+
+def enable_queue_logging(queue: Any = None) -> QueueListener:
+    """Moves the handlers of the root logger behind a queue. Records are put on the queue
+    by the logging thread and written by a background listener thread, so workers never
+    block on stdout or file I/O.
+
+    Args:
+        queue (Any, optional): queue to pass records through, a multiprocessing Queue can
+            be used when worker processes log as well. Defaults to a SimpleQueue.
+
+    Returns:
+        QueueListener: the running listener
+
+    Usage:
+    >>> enable_queue_logging()
+    >>> pipeline.run()
+    >>> disable_queue_logging() # flushes the queue and restores the handlers
+    """
+    from logging.handlers import QueueHandler, QueueListener
+
+    _configure()
+    if _LISTENERS:
+        return _LISTENERS[0]
+    root = logging.getLogger()
+    queue = queue if queue is not None else SimpleQueue()
+    handlers = list(root.handlers)
+    listener = QueueListener(queue, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(queue))
+    listener.start()
+    _LISTENERS.append(listener)
+    return listener
+
+
+def disable_queue_logging() -> None:
+    """Stops the queue listener after writing the queued records and puts the
+    original handlers back on the root logger"""
+    if not _LISTENERS:
+        return
+    from logging.handlers import QueueHandler
+
+    listener = _LISTENERS.pop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
+    listener.stop()
+    for handler in listener.handlers:
+        root.addHandler(handler)
+
 
 class LoggingMixin(object):
     """
-    Convenient Mixin to have a logger configured with the class name
+    Convenient Mixin to have a logger configured with the class name.
+    The logger is created once per class and stored on the class.
     """
     @property
-    def logger(self, level: str = 'INFO', **kwargs):
-        logging.basicConfig(stream=sys.stdout, level=level, format=FORMAT, **kwargs)
-        name = '.'.join([self.__class__.__module__, self.__class__.__name__])
-        return logging.getLogger(name)
+    def logger(self) -> logging.Logger:
+        cls = self.__class__
+        logger = cls.__dict__.get('_class_logger')
+        if logger is None:
+            _configure()
+            logger = logging.getLogger('.'.join([cls.__module__, cls.__name__]))
+            cls._class_logger = logger
+        return logger
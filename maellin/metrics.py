@@ -0,0 +1,211 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import sys
+from time import thread_time, time
+from typing import Any, Dict, List, Optional, Tuple, TypeVar
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+Task = TypeVar('Task')
+DataFrame = TypeVar('DataFrame')
+
+# wall clock time, cpu time of the calling thread and peak resident set size
+Sample = Tuple[float, Optional[float], Optional[int]]
+
+
+def peak_rss() -> Optional[int]:
+    """Returns the peak resident set size of the current process in bytes,
+    None when the platform does not report it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in bytes on macOS and in kilobytes everywhere else
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def sample(cpu: bool = True) -> Sample:
+    """Samples the clocks on the thread running a Task
+
+    Args:
+        cpu (bool, optional): sample the cpu time of the calling thread, disable when
+            the thread interleaves several Tasks such as an event loop. Defaults to True.
+
+    Returns:
+        Sample: wall clock time, thread cpu time and peak resident set size
+    """
+    return time(), thread_time() if cpu else None, peak_rss()
+
+
+class TaskMetrics:
+    """Timings and resource usage of a single Task in a run.
+
+    Timestamps are seconds since the epoch so Tasks run in worker processes
+    can be compared with the parent. cpu_time is the time spent on the thread
+    or process running the Task. rss_delta is how much the peak resident set
+    size of the process grew while the Task ran, Tasks running concurrently in
+    the same process share it so it is only exact for sequential runs and
+    process pools.
+    """
+
+    __slots__ = (
+        'tid', 'name', 'status', 'worker', 'queued', 'start', 'end', 'cpu_time', 'rss_delta', 'result_bytes')
+
+    def __init__(self, tid: str, name: str = None) -> None:
+        self.tid = tid
+        self.name = name
+        self.status = None
+        self.worker = None
+        self.queued = None
+        self.start = None
+        self.end = None
+        self.cpu_time = None
+        self.rss_delta = None
+        self.result_bytes = None
+
+    def __repr__(self) -> str:
+        return f'TaskMetrics(name={self.name!r}, status={self.status!r}, duration={self.duration!r})'
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds between the start and the end of the Task"""
+        if self.start is None or self.end is None:
+            return None
+        return self.end - self.start
+
+    @property
+    def queue_wait(self) -> Optional[float]:
+        """Seconds the Task waited between becoming ready and starting"""
+        if self.queued is None or self.start is None:
+            return None
+        return max(0.0, self.start - self.queued)
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {key: getattr(self, key) for key in self.__slots__}
+        record['duration'] = self.duration
+        record['queue_wait'] = self.queue_wait
+        return record
+
+
+class RunStats:
+    """Structured record of a Pipeline run, one TaskMetrics per Task by tid.
+
+    Executors record when a Task became ready, sample the clocks before and
+    after running it on the worker and record the outcome once it finished.
+    The stats of the last run are exposed as Pipeline.last_run_stats.
+
+    Usage:
+    >>> pipe.run()
+    >>> pipe.last_run_stats.slowest(5)
+    >>> pipe.last_run_stats.to_frame().sort_values('duration')
+    >>> pipe.last_run_stats.to_json('nightly.json')
+    """
+
+    def __init__(self) -> None:
+        self.start = time()
+        self.end = None
+        self.tasks: Dict[str, TaskMetrics] = {}
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def __iter__(self):
+        return iter(list(self.tasks.values()))
+
+    def __getitem__(self, tid: str) -> TaskMetrics:
+        return self.tasks[tid]
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds between the start and the end of the run"""
+        if self.end is None:
+            return None
+        return self.end - self.start
+
+    def _metrics(self, task: Task) -> TaskMetrics:
+        metrics = self.tasks.get(task.tid)
+        if metrics is None:
+            metrics = self.tasks[task.tid] = TaskMetrics(task.tid, task.name)
+        return metrics
+
+    def queued(self, task: Task, at: float = None) -> None:
+        """Records when a Task became ready to run"""
+        self._metrics(task).queued = time() if at is None else at
+
+    def record(self, task: Task, before: Sample, after: Sample, worker: Any = None) -> None:
+        """Records the samples taken before and after a Task ran
+
+        Args:
+            task (Task): the Task that ran
+            before (Sample): sample taken right before the Task started
+            after (Sample): sample taken right after the Task returned or raised
+            worker (Any, optional): thread, process or worker the Task ran on. Defaults to None.
+        """
+        metrics = self._metrics(task)
+        metrics.worker = worker
+        metrics.start, metrics.end = before[0], after[0]
+        if before[1] is not None and after[1] is not None:
+            metrics.cpu_time = after[1] - before[1]
+        if before[2] is not None and after[2] is not None:
+            metrics.rss_delta = after[2] - before[2]
+
+    def finished(self, task: Task, status: str, result_bytes: int = None) -> None:
+        """Records the outcome of a Task and the size of its result"""
+        metrics = self._metrics(task)
+        metrics.status = status
+        metrics.result_bytes = result_bytes
+
+    def close(self) -> None:
+        """Marks the end of the run"""
+        self.end = time()
+
+    def slowest(self, n: int = 10) -> List[TaskMetrics]:
+        """Returns the n Tasks that took the longest to run"""
+        timed = [metrics for metrics in self.tasks.values() if metrics.duration is not None]
+        return sorted(timed, key=lambda metrics: metrics.duration, reverse=True)[:n]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Returns the metrics of every Task as a list of dictionaries"""
+        return [metrics.to_dict() for metrics in self.tasks.values()]
+
+    def to_frame(self) -> DataFrame:
+        """Returns the metrics of every Task as a pandas DataFrame indexed by tid"""
+        import pandas as pd
+        columns = list(TaskMetrics.__slots__) + ['duration', 'queue_wait']
+        return pd.DataFrame.from_records(self.to_records(), columns=columns, index='tid')
+
+    def to_json(self, path: str = None, indent: int = None) -> str:
+        """Serializes the run to JSON
+
+        Args:
+            path (str, optional): also writes the JSON to this file. Defaults to None.
+            indent (int, optional): indentation passed to json.dumps. Defaults to None.
+
+        Returns:
+            str: the run with the metrics of every Task
+        """
+        document = json.dumps({
+            'start': self.start,
+            'end': self.end,
+            'duration': self.duration,
+            'tasks': self.to_records()}, indent=indent, default=str)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(document)
+        return document
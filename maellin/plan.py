@@ -0,0 +1,133 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from array import array
+from typing import Dict, Hashable, Iterable, Mapping, Sequence, Tuple
+
+from maellin.exceptions import CircularDependencyError
+
+
+class ExecutionPlan:
+    """Immutable, compiled form of a DAG used to schedule Tasks.
+
+    Nodes are numbered 0..n-1 in insertion order and edges are stored in
+    compressed sparse row (CSR) arrays: the successors of node i are
+    succ_targets[succ_offsets[i]:succ_offsets[i + 1]], predecessors are
+    stored the same way. Parallel edges between two nodes are stored once.
+    In-degrees, topological levels and a topological order sorted by level
+    are computed when the plan is built.
+
+    Usage:
+    >>> plan = pipeline.compile()
+    >>> for i in plan.order:
+    ...     print(plan.tids[i], plan.levels[i], [plan.tids[s] for s in plan.successors(i)])
+    """
+
+    __slots__ = (
+        'tids', 'index', 'succ_offsets', 'succ_targets', 'pred_offsets', 'pred_targets',
+        'in_degree', 'levels', 'order')
+
+    def __init__(self, successors: Mapping[Hashable, Iterable[Hashable]]) -> None:
+        """Compiles a plan from an adjacency mapping such as MultiDiGraph.succ
+
+        Args:
+            successors (Mapping[Hashable, Iterable[Hashable]]): successors by node id,
+                every node, usually a Task id, has to be a key
+
+        Raises:
+            CircularDependencyError: if the edges contain a cycle
+        """
+        tids = tuple(successors)
+        index = {tid: i for i, tid in enumerate(tids)}
+        n = len(tids)
+
+        succ = [sorted({index[v] for v in successors[u]}) for u in tids]
+        pred = [[] for _ in range(n)]
+        for u, row in enumerate(succ):
+            for v in row:
+                pred[v].append(u)
+
+        succ_offsets, succ_targets = _csr(succ)
+        pred_offsets, pred_targets = _csr(pred)
+        in_degree = array('q', (len(p) for p in pred))
+
+        # Kahn's algorithm, a node's level is one more than its deepest predecessor
+        levels = array('q', [0]) * n
+        remaining = array('q', in_degree)
+        frontier = [i for i in range(n) if remaining[i] == 0]
+        visited = 0
+        while frontier:
+            visited += len(frontier)
+            following = []
+            for u in frontier:
+                for k in range(succ_offsets[u], succ_offsets[u + 1]):
+                    v = succ_targets[k]
+                    remaining[v] -= 1
+                    if remaining[v] == 0:
+                        levels[v] = levels[u] + 1
+                        following.append(v)
+            frontier = following
+        if visited != n:
+            raise CircularDependencyError("DAG Contains Cycles, Check Steps for Circular Dependencies")
+
+        _set = super().__setattr__
+        _set('tids', tids)
+        _set('index', index)
+        _set('succ_offsets', succ_offsets)
+        _set('succ_targets', succ_targets)
+        _set('pred_offsets', pred_offsets)
+        _set('pred_targets', pred_targets)
+        _set('in_degree', in_degree)
+        _set('levels', levels)
+        # sorting is stable, nodes of a level keep their insertion order
+        _set('order', tuple(sorted(range(n), key=levels.__getitem__)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __len__(self) -> int:
+        return len(self.tids)
+
+    def __contains__(self, tid: Hashable) -> bool:
+        return tid in self.index
+
+    def successors(self, i: int) -> memoryview:
+        """Returns the integer ids of the successors of node i"""
+        return memoryview(self.succ_targets)[self.succ_offsets[i]:self.succ_offsets[i + 1]]
+
+    def predecessors(self, i: int) -> memoryview:
+        """Returns the integer ids of the predecessors of node i"""
+        return memoryview(self.pred_targets)[self.pred_offsets[i]:self.pred_offsets[i + 1]]
+
+    def topological_sort(self) -> list:
+        """Returns the node ids in topological order, level by level"""
+        return [self.tids[i] for i in self.order]
+
+    def critical_paths(self, costs: Dict[Hashable, float]) -> Dict[Hashable, float]:
+        """Computes the longest remaining path of every node, see DAG.get_critical_paths"""
+        paths = [0.0] * len(self.tids)
+        for u in reversed(self.order):
+            paths[u] = costs.get(self.tids[u], 0.0) + max((paths[v] for v in self.successors(u)), default=0.0)
+        return dict(zip(self.tids, paths))
+
+
+def _csr(rows: Iterable[Sequence[int]]) -> Tuple[array, array]:
+    """Packs rows of integers into offset and target arrays"""
+    offsets = array('q', [0])
+    targets = array('q')
+    for row in rows:
+        targets.extend(row)
+        offsets.append(len(targets))
+    return offsets, targets
@@ -13,33 +13,123 @@
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from asyncio import Queue as AsyncQueue
-from multiprocessing import JoinableQueue
-from queue import Queue as ThreadSafeQueue
-from typing import Union
+from queue import Full, PriorityQueue, Queue as ThreadSafeQueue
+from threading import Event, Thread
+from typing import Any, Iterable, Iterator, TypeVar, Union
+
+from maellin.exceptions import StreamConsumedError
+
+# asyncio and multiprocessing are imported when their queues are requested
+AsyncQueue = TypeVar('AsyncQueue')
+JoinableQueue = TypeVar('JoinableQueue')
 
 
 class QueueFactory:
     """Factory class that returns a supported queue type """
     @staticmethod
-    def factory(type: str = 'default') -> Union[ThreadSafeQueue, AsyncQueue, JoinableQueue]:
+    def factory(
+            type: str = 'default',
+            maxsize: int = 0) -> Union[ThreadSafeQueue, PriorityQueue, AsyncQueue, JoinableQueue]:
         """Factory that returns a queue based on type
 
         Args:
             type (str): type of queue to use. Defaults to
             FIFO thread-safe queue. Other accepted types are "multi-processing"
-            "asyncio" or "multi-threading"
+            "asyncio", "multi-threading" or "priority", a thread-safe queue returning
+            the lowest valued entry first
+            maxsize (int, optional): upper bound on the number of items in the queue,
+            puts block once it is reached. Defaults to 0 which means unbounded.
 
         Returns:
-            Queue | JoinableQueue | AsyncQueue : Python Queue
+            Queue | PriorityQueue | JoinableQueue | AsyncQueue : Python Queue
         """
         if type == 'default':
-            return ThreadSafeQueue()
+            return ThreadSafeQueue(maxsize=maxsize)
         elif type == 'multi-threading':
-            return ThreadSafeQueue()
+            return ThreadSafeQueue(maxsize=maxsize)
+        elif type == 'priority':
+            return PriorityQueue(maxsize=maxsize)
         elif type == 'multi-processing':
-            return JoinableQueue()
+            from multiprocessing import JoinableQueue
+            return JoinableQueue(maxsize=maxsize)
         elif type == 'asyncio':
-            return AsyncQueue()
+            from asyncio import Queue
+            return Queue(maxsize=maxsize)
         else:
             raise ValueError(type)
+
+
+_ITEM, _DONE, _ERROR = range(3)
+
+
+def _produce(source: Iterator, queue: ThreadSafeQueue, closed: Event) -> None:
+    """Moves items from a source iterator into a bounded queue until the
+    source is exhausted or the stream is closed by its consumer"""
+
+    def put(kind: int, item: Any) -> bool:
+        while not closed.is_set():
+            try:
+                queue.put((kind, item), timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    try:
+        for item in source:
+            if not put(_ITEM, item):
+                return
+    except BaseException as error:
+        put(_ERROR, error)
+        return
+    put(_DONE, None)
+
+
+class Stream:
+    """Iterator over the batches yielded by a generator Task.
+
+    Batches are produced on a background thread into a bounded queue, so the
+    producer runs ahead of its consumer by at most `maxsize` batches and blocks
+    until the consumer catches up. Chaining generator Tasks pipelines each step
+    while only a few batches are held in memory. Errors raised by the producer
+    are raised again in the consumer. A Stream can only be consumed once.
+    """
+
+    def __init__(self, source: Iterable, maxsize: int = 16, name: str = None) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self._queue = QueueFactory.factory('default', maxsize=maxsize)
+        self._closed = Event()
+        self._consumed = False
+        self._thread = Thread(
+            target=_produce,
+            args=(iter(source), self._queue, self._closed),
+            name=f'maellin-stream-{name}',
+            daemon=True)
+        self._thread.start()
+
+    def __iter__(self) -> Iterator:
+        if self._consumed:
+            raise StreamConsumedError(f'Stream {self.name} was already consumed, streams support a single consumer')
+        self._consumed = True
+        return self._iterate()
+
+    def _iterate(self) -> Iterator:
+        try:
+            while True:
+                kind, item = self._queue.get()
+                if kind == _ITEM:
+                    yield item
+                elif kind == _ERROR:
+                    raise item
+                else:
+                    return
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stops the producer, remaining batches are discarded"""
+        self._closed.set()
+
+    def __del__(self) -> None:
+        self.close()
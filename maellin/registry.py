@@ -0,0 +1,263 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import os
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Dict, List, NamedTuple, Set, Tuple, TypeVar
+
+from maellin.exceptions import NotFoundError
+from maellin.logger import LoggingMixin
+from maellin.serialization import read_header
+from maellin.workflows import Pipeline
+
+Scheduler = TypeVar('Scheduler')
+
+PLAN_EXTENSIONS = ('.plan',)
+PICKLE_EXTENSIONS = ('.pkl', '.pickle')
+
+
+class Fingerprint(NamedTuple):
+    """Identity of a stored DAG, mtime and size are compared first and the digest
+    only when they changed"""
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+def file_digest(path: str) -> str:
+    """Returns the sha256 digest of a stored DAG. Plans carry the digest of their
+    payload in the header so only the header is read, other files are hashed.
+
+    Args:
+        path (str): path of the stored DAG
+
+    Returns:
+        str: hex digest identifying the content of the file
+    """
+    with open(path, 'rb') as f:
+        if path.endswith(PLAN_EXTENSIONS):
+            return read_header(f.read(64)).digest
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+class DagRegistry(LoggingMixin):
+    """Keeps the DAGs stored in a directory in sync with the jobs of a scheduler.
+
+    Every call to sync scans the directory and fingerprints each file by mtime
+    and size. Unchanged files are skipped without being opened, files whose
+    mtime or size changed are hashed and only count as changed when the digest
+    differs. Jobs are added for new DAGs, replaced for changed ones and removed
+    for deleted ones. DAGs are loaded when their job runs and at most
+    `max_loaded` of them are kept in memory, the least recently used ones are
+    loaded again from disk when needed. Plans written by Pipeline.dump_plan
+    and pickles written by Pipeline.dump are supported.
+
+    Usage:
+    >>> registry = DagRegistry('.dags', minutes=30) # run every stored DAG every 30 minutes
+    >>> registry.start(interval=5) # poll the directory every 5 seconds
+    """
+
+    def __init__(
+            self,
+            path: str = '.dags',
+            scheduler: Scheduler = None,
+            max_loaded: int = 32,
+            trigger: str = 'interval',
+            max_instances: int = 1,
+            executor: str = None,
+            **trigger_args) -> None:
+        """
+        Args:
+            path (str, optional): directory of stored DAGs. Defaults to '.dags'.
+            scheduler (Scheduler, optional): APScheduler scheduler to add the jobs to.
+                Defaults to the DefaultScheduler.
+            max_loaded (int, optional): max number of DAGs kept in memory. Defaults to 32.
+            trigger (str, optional): trigger of the jobs. Defaults to 'interval'.
+            max_instances (int, optional): max concurrent runs of each DAG. Defaults to 1.
+            executor (str, optional): executor type of the runs, use 'shared' so the Tasks of
+                all DAGs share the workers of the ExecutionService. Defaults to None, the
+                type of each DAG.
+            trigger_args: arguments of the trigger, defaults to minutes=1 for 'interval'.
+        """
+        if scheduler is None:
+            from maellin.scheduler import DefaultScheduler
+            scheduler = DefaultScheduler()
+        if trigger == 'interval' and not trigger_args:
+            trigger_args = {'minutes': 1}
+        self.path = path
+        self.scheduler = scheduler
+        self.max_loaded = max_loaded
+        self.trigger = trigger
+        self.max_instances = max_instances
+        self.executor = executor
+        self.trigger_args = trigger_args
+        self.loads = 0
+        self._fingerprints: Dict[str, Fingerprint] = {}
+        self._files: Dict[str, str] = {}
+        self._loaded: 'OrderedDict[str, Pipeline]' = OrderedDict()
+        self._ignored: Set[str] = set()
+        self._lock = RLock()
+        self._log = self.logger
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def names(self) -> List[str]:
+        """Names of the registered DAGs"""
+        return list(self._files)
+
+    def job_id(self, name: str) -> str:
+        """Id of the scheduler job running a DAG"""
+        return f'maellin:{name}'
+
+    def _scan(self) -> Dict[str, Tuple[str, os.stat_result]]:
+        """Lists the stored DAGs by name with their path and stat. When a plan and a
+        pickle share a name the plan is registered and the pickle is ignored."""
+        found = {}
+        with os.scandir(self.path) as entries:
+            for entry in sorted(entries, key=lambda entry: entry.name):
+                if not entry.is_file() or not entry.name.endswith(PLAN_EXTENSIONS + PICKLE_EXTENSIONS):
+                    continue
+                name = os.path.splitext(entry.name)[0]
+                if name in found:
+                    kept, ignored = found[name][0], entry.path
+                    if ignored.endswith(PLAN_EXTENSIONS):
+                        kept, ignored = ignored, kept
+                        found[name] = (entry.path, entry.stat())
+                    if ignored not in self._ignored:
+                        self._ignored.add(ignored)
+                        self._log.warning('Ignoring DAG %s, %s is registered under the name %s', ignored, kept, name)
+                    continue
+                found[name] = (entry.path, entry.stat())
+        return found
+
+    def sync(self) -> Dict[str, List[str]]:
+        """Scans the directory and updates the scheduler jobs of new, changed and removed DAGs
+
+        Returns:
+            Dict[str, List[str]]: names of the DAGs that were added, changed or removed
+        """
+        changes = {'added': [], 'changed': [], 'removed': []}
+        with self._lock:
+            found = self._scan()
+            for name, (path, stat) in found.items():
+                previous = self._fingerprints.get(name)
+                if previous is not None and self._files[name] == path \
+                        and (previous.mtime_ns, previous.size) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                try:
+                    digest = file_digest(path)
+                except Exception as error:
+                    self._log.warning('Skipping DAG %s, it cannot be read: %r', path, error)
+                    continue
+                self._fingerprints[name] = Fingerprint(stat.st_mtime_ns, stat.st_size, digest)
+                if previous is not None and self._files[name] == path and previous.digest == digest:
+                    # touched but the content is the same
+                    continue
+                changes['changed' if name in self._files else 'added'].append(name)
+                self._files[name] = path
+                self._loaded.pop(name, None)
+                self._schedule(name)
+
+            for name in [name for name in self._files if name not in found]:
+                changes['removed'].append(name)
+                del self._files[name]
+                self._fingerprints.pop(name, None)
+                self._loaded.pop(name, None)
+                self._unschedule(name)
+
+        if any(changes.values()):
+            self._log.info(
+                'Synced DAGs in %s: %s added, %s changed, %s removed',
+                self.path, len(changes['added']), len(changes['changed']), len(changes['removed']))
+        return changes
+
+    def _schedule(self, name: str) -> None:
+        self.scheduler.add_job(
+            func=self.run,
+            args=[name],
+            id=self.job_id(name),
+            name=name,
+            trigger=self.trigger,
+            replace_existing=True,
+            max_instances=self.max_instances,
+            **self.trigger_args)
+
+    def _unschedule(self, name: str) -> None:
+        if self.scheduler.get_job(self.job_id(name)) is not None:
+            self.scheduler.remove_job(self.job_id(name))
+
+    def _load(self, path: str) -> Pipeline:
+        self.loads += 1
+        if path.endswith(PLAN_EXTENSIONS):
+            return Pipeline().load_plan(path)
+        return Pipeline().load(path)
+
+    def get(self, name: str) -> Pipeline:
+        """Returns a registered DAG, loading it from disk when it is not in memory
+
+        Raises:
+            NotFoundError: if no DAG with this name is registered
+        """
+        with self._lock:
+            pipeline = self._loaded.get(name)
+            if pipeline is not None:
+                self._loaded.move_to_end(name)
+                return pipeline
+            path = self._files.get(name)
+            if path is None:
+                raise NotFoundError(f'{name} is not registered in {self.path}')
+            pipeline = self._loaded[name] = self._load(path)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+            return pipeline
+
+    def run(self, name: str) -> Any:
+        """Runs a registered DAG, called by the scheduler jobs"""
+        return self.get(name).run(executor=self.executor)
+
+    def start(self, interval: float = 5.0) -> None:
+        """Syncs the directory now and then every `interval` seconds on the scheduler,
+        the scheduler is started when it is not running"""
+        from apscheduler.schedulers.base import STATE_STOPPED
+
+        self.sync()
+        self.scheduler.add_job(
+            func=self.sync,
+            id=f'maellin.registry:{os.path.abspath(self.path)}',
+            name=f'Sync {self.path}',
+            trigger='interval',
+            seconds=interval,
+            replace_existing=True,
+            max_instances=1)
+        if self.scheduler.state == STATE_STOPPED:
+            self.scheduler.start()
+
+    def stop(self) -> None:
+        """Stops polling the directory and removes the jobs of all registered DAGs"""
+        with self._lock:
+            sync_id = f'maellin.registry:{os.path.abspath(self.path)}'
+            if self.scheduler.get_job(sync_id) is not None:
+                self.scheduler.remove_job(sync_id)
+            for name in list(self._files):
+                self._unschedule(name)
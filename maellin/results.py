@@ -0,0 +1,138 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Any, Dict, Iterable, Iterator, Tuple, TypeVar
+
+from maellin.utils import get_size
+
+Task = TypeVar('Task')
+
+
+class ResultStore:
+    """Index of completed Tasks and their results keyed by their unique id "tid".
+
+    Executors put every completed Task in the store together with its result,
+    dependents look up their inputs in constant time rather than scanning the
+    result queue. Results are held by the store rather than read from the Tasks
+    so every run of a Pipeline keeps its own.
+
+    The store also counts how many downstream Tasks still need each result.
+    When `release` is True a result is dropped from its Task as soon as the
+    last consumer has run, unless the Task was created with keep_result=True.
+    Tasks without consumers are never released. The bytes held by results
+    are tracked in `retained_bytes` with the high water mark in `peak_bytes`.
+    """
+
+    def __init__(self, release: bool = False) -> None:
+        self.release = release
+        self.released = set()
+        self.retained_bytes = 0
+        self.peak_bytes = 0
+        self._tasks: Dict[str, Task] = {}
+        self._results: Dict[str, Any] = {}
+        self._sizes: Dict[str, int] = {}
+        self._consumers: Dict[str, int] = {}
+
+    def __contains__(self, tid: str) -> bool:
+        return tid in self._tasks
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[Task]:
+        return iter(list(self._tasks.values()))
+
+    def track(self, tasks: Iterable[Task]) -> None:
+        """Counts the consumers of every Task that is about to run
+
+        Args:
+            tasks (Iterable[Task]): all Tasks of the run
+        """
+        self._consumers = {}
+        for task in tasks:
+            for dep_task in dict.fromkeys(task.depends_on or []):
+                self._consumers[dep_task.tid] = self._consumers.get(dep_task.tid, 0) + 1
+
+    def put(self, task: Task, result: Any) -> None:
+        """Adds a completed Task and its result to the store"""
+        self._tasks[task.tid] = task
+        self._results[task.tid] = result
+        size = get_size(result)
+        self.retained_bytes += size - self._sizes.get(task.tid, 0)
+        self._sizes[task.tid] = size
+        self.peak_bytes = max(self.peak_bytes, self.retained_bytes)
+
+    def consumed(self, task: Task) -> None:
+        """Marks the dependencies of a Task as consumed once it has run and
+        releases the results that are no longer needed
+
+        Args:
+            task (Task): a Task that finished running
+        """
+        for dep_task in dict.fromkeys(task.depends_on or []):
+            remaining = self._consumers.get(dep_task.tid)
+            if remaining is None:
+                continue
+            self._consumers[dep_task.tid] = remaining - 1
+            if remaining == 1:
+                self._release(dep_task.tid)
+
+    def _release(self, tid: str) -> None:
+        """Drops the result of a Task that has no consumers left"""
+        task = self._tasks.get(tid)
+        if not self.release or task is None or getattr(task, 'keep_result', False):
+            return
+        self.released.add(tid)
+        del self._tasks[tid]
+        del self._results[tid]
+        self.retained_bytes -= self._sizes.pop(tid, 0)
+
+    def size(self, tid: str) -> int:
+        """Returns the estimated size in bytes of the result of a Task put in the store"""
+        return self._sizes.get(tid, 0)
+
+    def get(self, tid: str, default: Any = None) -> Task:
+        """Returns the completed Task with a matching tid"""
+        return self._tasks.get(tid, default)
+
+    def result(self, tid: str, default: Any = None) -> Any:
+        """Returns the result of the completed Task with a matching tid"""
+        return self._results.get(tid, default)
+
+    def get_inputs(self, task: Task) -> Tuple[Any]:
+        """Collects the results of a task's dependencies in the order of depends_on.
+        Duplicate dependencies are only passed once.
+
+        Args:
+            task (Task): The Task to collect inputs for
+
+        Returns:
+            Tuple[Any]: positional arguments for the Task
+        """
+        inputs = []
+        if task.depends_on:
+            for dep_task in dict.fromkeys(task.depends_on):
+                data = self._results.get(dep_task.tid)
+                if data is not None:
+                    inputs.append(data)
+        return tuple(inputs)
+
+    def clear(self) -> None:
+        """Removes all Tasks from the store"""
+        self._tasks.clear()
+        self._results.clear()
+        self._sizes.clear()
+        self._consumers.clear()
+        self.retained_bytes = 0
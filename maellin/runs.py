@@ -0,0 +1,160 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from threading import Lock
+from typing import Any, Dict, TypeVar, Union
+
+from maellin.exceptions import NotFoundError
+from maellin.metrics import RunStats
+from maellin.queues import QueueFactory, Stream
+from maellin.results import ResultStore
+from maellin.utils import generate_uuid
+
+Task = TypeVar('Task')
+TaskCache = TypeVar('TaskCache')
+
+# runs that finish together publish one after the other
+_PUBLISHING = Lock()
+
+
+class RunContext:
+    """State of a single run of a Pipeline.
+
+    Every run gets its own task queue, result store, status table and
+    metrics. Executors write the status, result and duration of each Task
+    into the context rather than onto the Task, so overlapping runs of the
+    same Pipeline do not overwrite each other. When a run ends its outcome
+    is published to the Tasks, which show the run that finished last.
+
+    Usage:
+    >>> run = pipe.run()
+    >>> run.run_id # identifies the run in the logs
+    >>> run.status_of('load') # 'Completed'
+    >>> run.result('load') # the result of the Task named load in this run
+    """
+
+    def __init__(
+            self,
+            queue_type: str = 'default',
+            release_results: bool = False,
+            run_id: str = None,
+            cache: TaskCache = None,
+            profile: bool = None) -> None:
+        """
+        Args:
+            queue_type (str, optional): type of the task and result queues. Defaults to 'default'.
+            release_results (bool, optional): drop results once their consumers have run.
+                Defaults to False.
+            run_id (str, optional): id of the run. Defaults to a new uuid.
+            cache (TaskCache, optional): cache of the Tasks that do not set a cache themselves.
+                Defaults to None.
+            profile (bool, optional): profile the Tasks that do not set profile themselves.
+                Defaults to None.
+        """
+        self.run_id = run_id or generate_uuid()
+        self.cache = cache
+        self.profile = profile
+        self.task_queue = QueueFactory.factory(type=queue_type)
+        self.result_queue = QueueFactory.factory(type=queue_type)
+        self.results = ResultStore(release=release_results)
+        self.stats = RunStats()
+        self.tasks: Dict[str, Task] = {}
+        self.status: Dict[str, str] = {}
+        self.durations: Dict[str, float] = {}
+
+    def __contains__(self, tid: str) -> bool:
+        return tid in self.tasks
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def add(self, task: Task, status: str = 'Queued') -> None:
+        """Adds a Task to the run, Tasks reused from a previous run are added as 'Completed'"""
+        self.update_status(task, status)
+
+    def enqueue(self, task: Task) -> None:
+        """Adds a Task to the run and puts it in the task queue"""
+        self.add(task)
+        self.task_queue.put(task)
+
+    def update_status(self, task: Task, status: str) -> None:
+        """Updates the status of a Task in this run"""
+        self.tasks[task.tid] = task
+        self.status[task.tid] = status
+
+    def get_task(self, task: Union[str, Task]) -> Task:
+        """Looks up a Task of the run by name or id
+
+        Raises:
+            NotFoundError: if the Task is not part of the run
+        """
+        if not isinstance(task, str):
+            return task
+        if task in self.tasks:
+            return self.tasks[task]
+        for tsk in self.tasks.values():
+            if tsk.name == task:
+                return tsk
+        raise NotFoundError(f'{task} is not part of run {self.run_id}')
+
+    def status_of(self, task: Union[str, Task]) -> str:
+        """Returns the status of a Task, or the Task with this name, in this run"""
+        return self.status[self.get_task(task).tid]
+
+    def result(self, task: Union[str, Task], default: Any = None) -> Any:
+        """Returns the result of a Task, or the Task with this name, in this run"""
+        return self.results.result(self.get_task(task).tid, default)
+
+    def cache_of(self, task: Task) -> TaskCache:
+        """Returns the cache a Task uses in this run, the cache of the Task wins over the run's"""
+        return task.cache if task.cache is not None else self.cache
+
+    def profiles(self, task: Task) -> bool:
+        """Returns True if a Task is profiled in this run, the setting of the Task wins over the run's"""
+        return task.profile if task.profile is not None else bool(self.profile)
+
+    def execute(self, task: Task, *inputs) -> Any:
+        """Runs a Task with its inputs and records how long it took, the result is not stored on the Task
+
+        Returns:
+            Any: the result of the Task
+        """
+        result, self.durations[task.tid] = task._execute(inputs, {}, self.cache_of(task), self.profiles(task))
+        return result
+
+    async def aexecute(self, task: Task, *inputs) -> Any:
+        """Awaits a Task with its inputs and records how long it took, the result is not stored on the Task
+
+        Returns:
+            Any: the result of the Task
+        """
+        result, self.durations[task.tid] = await task._aexecute(inputs, {}, self.cache_of(task), self.profiles(task))
+        return result
+
+    def publish(self) -> None:
+        """Copies the status, result and duration of every Task of the run to the Task.
+        Released results and Streams are cleared, results of Tasks that did not complete are left as they were."""
+        released = self.results.released
+        with _PUBLISHING:
+            for tid, status in self.status.items():
+                task = self.tasks[tid]
+                task.update_status(status)
+                if tid in self.durations:
+                    task.duration = self.durations[tid]
+                if tid in released:
+                    task.result = None
+                elif tid in self.results:
+                    result = self.results.result(tid)
+                    task.result = None if isinstance(result, Stream) else result
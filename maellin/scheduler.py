@@ -28,3 +28,11 @@ class DefaultScheduler(BackgroundScheduler):
             cls._instance = super(DefaultScheduler, cls).__new__(cls)
             # Put any initialization here.
         return cls._instance
+
+    def __init__(self):
+        # every Pipeline asks for the scheduler, only the first call may initialize
+        # it or the jobs and state of a running scheduler would be reset
+        if self.__dict__.get('_initialized'):
+            return
+        super().__init__()
+        self._initialized = True
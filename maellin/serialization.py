@@ -0,0 +1,250 @@
+#   Copyright (C) 2022  Carl Chatterton. All Rights Reserved.
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import struct
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple, TypeVar
+
+import cloudpickle as cpickle
+
+from maellin.exceptions import PlanFormatError
+from maellin.plan import ExecutionPlan
+
+Pipeline = TypeVar('Pipeline')
+Task = TypeVar('Task')
+
+# file layout: header followed by the (compressed) cloudpickled plan document
+MAGIC = b'MAELPLAN'
+VERSION = 1
+_HEADER = struct.Struct('<8sHB5xQ32s')
+_CODECS = {'none': 0, 'zlib': 1, 'zstd': 2, 'lz4': 3}
+_CODEC_NAMES = {v: k for k, v in _CODECS.items()}
+
+# run state of a Task that is not stored in a plan, restored to these values on load
+_RUNTIME = {'result': None, 'status': 'Not Started', 'duration': None, 'profile_stats': None}
+_SETTINGS = ('type', 'workers', 'release_results', 'cache', 'schedule', 'profile')
+
+
+class PlanHeader(NamedTuple):
+    """Header of a serialized plan"""
+    version: int
+    compression: str
+    size: int
+    digest: str
+
+
+class PlanDocument(NamedTuple):
+    """Contents of a serialized plan"""
+    settings: Dict[str, Any]
+    tasks: Dict[str, Task]
+    nodes: Dict[str, Any]
+    edges: List[Tuple[str, str, str, str]]
+
+    def compile(self) -> ExecutionPlan:
+        """Compiles the edges of the plan, see DAG.compile"""
+        successors = {tid: [] for tid in self.nodes}
+        for u, v, _, _ in self.edges:
+            successors[u].append(v)
+        return ExecutionPlan(successors)
+
+
+def _codec(compression: str) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    """Returns the compress and decompress functions of a codec, optional codecs are imported lazily"""
+    if compression == 'none':
+        return bytes, bytes
+    if compression == 'zlib':
+        import zlib
+        return zlib.compress, zlib.decompress
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('zstd compression requires the zstandard package, pip install zstandard') from None
+        return zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress
+    if compression == 'lz4':
+        try:
+            import lz4.frame
+        except ImportError:
+            raise ImportError('lz4 compression requires the lz4 package, pip install lz4') from None
+        return lz4.frame.compress, lz4.frame.decompress
+    raise ValueError(f'Unsupported compression {compression}, use one of {", ".join(_CODECS)}')
+
+
+def pack(payload: bytes, compression: str = None) -> bytes:
+    """Compresses a payload and prepends the header
+
+    Args:
+        payload (bytes): serialized plan document
+        compression (str, optional): "zlib", "zstd" or "lz4". Defaults to None.
+
+    Returns:
+        bytes: header followed by the compressed payload
+    """
+    compression = compression or 'none'
+    compress, _ = _codec(compression)
+    body = compress(payload)
+    return _HEADER.pack(MAGIC, VERSION, _CODECS[compression], len(body), hashlib.sha256(body).digest()) + body
+
+
+def read_header(data: bytes) -> PlanHeader:
+    """Parses and validates the header of a serialized plan without touching the payload
+
+    Args:
+        data (bytes): the serialized plan or at least its first bytes
+
+    Raises:
+        PlanFormatError: if the data is not a plan or was written by a newer version
+
+    Returns:
+        PlanHeader: version, compression, payload size and sha256 digest
+    """
+    if len(data) < _HEADER.size:
+        raise PlanFormatError('Not a Maellin plan, the header is truncated')
+    magic, version, codec, size, digest = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise PlanFormatError('Not a Maellin plan, use Pipeline.load for pickled DAGs')
+    if version > VERSION:
+        raise PlanFormatError(f'Plan version {version} is newer than the supported version {VERSION}')
+    if codec not in _CODEC_NAMES:
+        raise PlanFormatError(f'Unknown compression {codec}')
+    return PlanHeader(version, _CODEC_NAMES[codec], size, digest.hex())
+
+
+def unpack(data: bytes) -> bytes:
+    """Validates the header and checksum of a serialized plan and decompresses the payload
+
+    Raises:
+        PlanFormatError: if the header is invalid or the payload is truncated or corrupt
+
+    Returns:
+        bytes: serialized plan document
+    """
+    header = read_header(data)
+    body = memoryview(data)[_HEADER.size:]
+    if len(body) != header.size:
+        raise PlanFormatError(f'Plan is truncated, expected {header.size} bytes and found {len(body)}')
+    if hashlib.sha256(body).hexdigest() != header.digest:
+        raise PlanFormatError('Plan checksum does not match, the file is corrupt')
+    _, decompress = _codec(header.compression)
+    return decompress(body)
+
+
+@contextmanager
+def _pickle_by_reference(module: Any):
+    """Pickles a module by reference while the context is active, Pipeline.dump
+    registers maellin to be pickled by value which would embed it in every plan"""
+    registered = module.__name__ in cpickle.list_registry_pickle_by_value()
+    if registered:
+        cpickle.unregister_pickle_by_value(module)
+    try:
+        yield
+    finally:
+        if registered:
+            cpickle.register_pickle_by_value(module)
+
+
+def dumps_plan(pipeline: Pipeline, compression: str = None) -> bytes:
+    """Serializes the structure of a composed Pipeline: its settings, the edges of
+    the DAG and every Task with its callable and kwargs. Results and other run
+    state are left out.
+
+    Args:
+        pipeline (Pipeline): a composed Pipeline
+        compression (str, optional): "zlib", "zstd" or "lz4". Defaults to None.
+
+    Returns:
+        bytes: the serialized plan
+    """
+    dag = pipeline.dag
+    tasks = []
+    for tid in pipeline.topological_sort():
+        for task in (dag.nodes[tid].get('tasks') or {}).values():
+            spec = {k: v for k, v in task.__dict__.items() if k not in _RUNTIME and k != '_log'}
+            if task.depends_on is not None:
+                spec['depends_on'] = [dep.tid for dep in task.depends_on]
+            tasks.append((type(task), spec))
+
+    document = {
+        'settings': {name: getattr(pipeline, name, None) for name in _SETTINGS},
+        'tasks': tasks,
+        'nodes': {tid: attrs.get('properties') for tid, attrs in dag.nodes(data=True)},
+        'edges': [(u, v, key, attrs.get('pid')) for u, v, key, attrs in dag.edges(keys=True, data=True)],
+    }
+
+    import maellin
+    with _pickle_by_reference(maellin):
+        payload = cpickle.dumps(document)
+    return pack(payload, compression)
+
+
+def read_plan(data: bytes) -> PlanDocument:
+    """Restores the settings, Tasks and edges of a serialized plan without building
+    the DAG, so networkx is not imported. Tasks are linked to their dependencies.
+
+    Args:
+        data (bytes): a plan serialized with dumps_plan
+
+    Raises:
+        PlanFormatError: if the data is not a valid plan
+
+    Returns:
+        PlanDocument: settings, Tasks by tid in topological order, nodes and edges
+    """
+    document: Dict[str, Any] = cpickle.loads(unpack(data))
+
+    tasks = {}
+    for cls, spec in document['tasks']:
+        task = cls.__new__(cls)
+        task.__dict__.update(spec)
+        task.__dict__.update(_RUNTIME)
+        task._log = task.logger
+        tasks[task.tid] = task
+    for task in tasks.values():
+        if task.depends_on is not None:
+            task.depends_on = [tasks[tid] for tid in task.depends_on]
+    return PlanDocument(document['settings'], tasks, document['nodes'], document['edges'])
+
+
+def loads_plan(pipeline: Pipeline, data: bytes) -> Pipeline:
+    """Restores a serialized plan into a Pipeline, replacing its DAG and settings
+
+    Args:
+        pipeline (Pipeline): the Pipeline to load the plan into
+        data (bytes): a plan serialized with dumps_plan
+
+    Raises:
+        PlanFormatError: if the data is not a valid plan
+
+    Returns:
+        Pipeline: the Pipeline with the plan loaded
+    """
+    from networkx import MultiDiGraph
+
+    settings, tasks, nodes, edges = read_plan(data)
+
+    G = MultiDiGraph()
+    G.add_nodes_from(
+        (tid, {'id': tid, 'tasks': {tid: tasks[tid]} if tid in tasks else None, 'properties': properties})
+        for tid, properties in nodes.items())
+    G.add_edges_from(
+        (u, v, key, {'pid': pid, 'tid_from': u, 'tid_to': v})
+        for u, v, key, pid in edges)
+
+    for name, value in settings.items():
+        setattr(pipeline, name, value)
+    pipeline.dag = G
+    pipeline._reindex()
+    return pipeline
@@ -14,16 +14,95 @@
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from abc import ABCMeta, abstractclassmethod
+from collections.abc import Generator, Iterable, Iterator
 from functools import partial
-from inspect import signature
-from typing import Any, Callable, List, Literal, Tuple, TypeVar
+from inspect import iscoroutinefunction, isgeneratorfunction, signature
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Literal, Tuple, TypeVar, Union, get_args, get_origin
+from weakref import WeakKeyDictionary
 
+from maellin.cache import TaskCache
 from maellin.exceptions import CompatibilityException, MissingTypeHintException
 from maellin.logger import LoggingMixin
+from maellin.queues import Stream
 from maellin.utils import generate_uuid, wrapped_partial
 
 Task = TypeVar('Task')
 Pipeline = TypeVar('Pipeline')
+Profile = TypeVar('Profile')
+
+
+_STREAM_TYPES = (Generator, Iterable, Iterator)
+
+
+def is_compatible(output: Any, annotation: Any) -> bool:
+    """Checks if a return type annotation can be passed to an argument annotation.
+    Generators and Iterators of the same item type are interchangeable so that
+    streaming Tasks can feed each other, a Union argument accepts any of its members.
+
+    Args:
+        output (Any): return type annotation of the upstream callable
+        annotation (Any): argument type annotation of the downstream callable
+
+    Returns:
+        bool: True if the types are compatible
+    """
+    if output is annotation or output == annotation:
+        return True
+    if get_origin(annotation) is Union:
+        return any(is_compatible(output, arg) for arg in get_args(annotation))
+    if get_origin(output) in _STREAM_TYPES and get_origin(annotation) in _STREAM_TYPES:
+        return get_args(output)[:1] == get_args(annotation)[:1]
+    return False
+
+
+_MISSING = object()
+
+
+class _SignatureCache(WeakKeyDictionary):
+    """Weakly keyed cache that is pickled empty, the module is pickled by value with Pipelines"""
+
+    def __reduce__(self):
+        return (self.__class__, ())
+
+
+# argument and return annotations by underlying function and the way it is bound by a partial
+_SIGNATURES: 'WeakKeyDictionary[Callable, Dict[Tuple, Tuple[Tuple[Any, ...], Any]]]' = _SignatureCache()
+
+
+def _introspect(func: Callable) -> Tuple[Tuple[Any, ...], Any]:
+    inputs = tuple(x.annotation for x in signature(func).parameters.values())
+    output = getattr(func, '__annotations__', {}).get('return', _MISSING)
+    return inputs, output
+
+
+def signature_types(func: Callable) -> Tuple[Tuple[Any, ...], Any]:
+    """Returns the argument annotations and the return annotation of a callable. Results are
+    computed once per underlying function and cached weakly, so the Tasks of a generated
+    Pipeline wrapping the same function share them and the cache does not keep it alive.
+
+    Args:
+        func (Callable): a function or a partial object wrapping one
+
+    Returns:
+        Tuple[Tuple[Any, ...], Any]: the argument annotations and the return annotation,
+            _MISSING when the return is not annotated
+    """
+    target, binding = func, ()
+    if isinstance(func, partial):
+        # arguments bound by position are removed from the signature, keywords are kept
+        target, binding = func.func, (len(func.args), tuple(func.keywords))
+    try:
+        bindings = _SIGNATURES.get(target)
+    except TypeError:
+        # builtins and unhashable callables cannot be weakly referenced
+        return _introspect(func)
+    if bindings is None:
+        bindings = _SIGNATURES[target] = {}
+    types = bindings.get(binding)
+    if types is None:
+        types = bindings[binding] = _introspect(func)
+    return types
 
 
 def create_task(inputs: Task | Tuple):
@@ -48,13 +127,27 @@ class AbstractBaseTask(metaclass=ABCMeta):
         raise NotImplementedError('Abstract Method that needs to be implemented by the subclass')
 
 
+class _RawProfile:
+    """Raw cProfile stats created in a worker process, accepted by pstats.Stats"""
+
+    def __init__(self, stats: Dict) -> None:
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
 class BaseTask(AbstractBaseTask, LoggingMixin):
     """Base Task provides implementation to validate method for callables before running them"""
 
-    def __init__(self, func: Callable) -> None:
+    profile = None
+    profile_stats = None
+
+    def __init__(self, func: Callable, cache: TaskCache = None) -> None:
         super().__init__()
         self.tid = generate_uuid()
         self.func = func
+        self.cache = cache
         self._log = self.logger
 
     def __input__(self) -> List:
@@ -63,8 +156,7 @@ class BaseTask(AbstractBaseTask, LoggingMixin):
         Returns:
             annotation_list: returns annotated list of acceptable compatible input types
         """
-        annotation_list = [x.annotation for x in signature(self.func).parameters.values()]
-        return annotation_list
+        return list(signature_types(self.func)[0])
 
     def __output__(self) -> Any:
         """Gets the return type annotation for a python callable
@@ -72,11 +164,10 @@ class BaseTask(AbstractBaseTask, LoggingMixin):
         Returns:
             return_annotation : type annotation for the return statement of Callable
         """
-        try:
-            return_annotation = self.func.__annotations__['return']
-            return return_annotation
-        except BaseException:
+        return_annotation = signature_types(self.func)[1]
+        if return_annotation is _MISSING:
             raise MissingTypeHintException(f"No type hint was provided for {self.func.__name__}'s return")
+        return return_annotation
 
     def __str__(self) -> str:
         from pprint import pprint
@@ -109,14 +200,16 @@ class BaseTask(AbstractBaseTask, LoggingMixin):
             Boolean: Returns True if tasks are compatible
         """
 
-        # If output is None we assume it should be an ignored as an input argument
-        _val = any(other.__output__() is arg for arg in self.__input__() + [None])
-        
+        output = other.__output__()
+
         # if the output is Any, validation is not expected to work properly
-        if other.__output__() is Any:
+        if output is Any:
             error = f"Cannot check compatibility with previous task {other.func.__name__} when return is type 'Any'"
             raise CompatibilityException(error)
 
+        # If output is None we assume it should be an ignored as an input argument
+        _val = any(is_compatible(output, arg) for arg in signature_types(self.func)[0] + (None,))
+
         if _val is not True:
             error = f"Validation Failed. Output of {other.func.__name__} " \
                 + f"is incompatible with inputs from {self.func.__name__}"
@@ -126,11 +219,57 @@ class BaseTask(AbstractBaseTask, LoggingMixin):
             return True
 
     def _run(self, *args, **kwargs) -> Any:
-        """Executes the python Callable"""
+        """Executes the python Callable, outputs are read from the cache when one is set"""
+        return self._call(args, kwargs, self.cache, self.profile)
+
+    def _call(self, args: Tuple, kwargs: Dict, cache: TaskCache = None, profile: bool = None) -> Any:
+        """Executes the python Callable with the cache and profile settings of a run,
+        which default to the settings of the Task in _run"""
+        if profile:
+            return self._run_profiled(args, kwargs, cache)
+        if cache is not None:
+            return cache.call(self.func, *args, **kwargs)
+        return self.func(*args, **kwargs)
+
+    def _run_profiled(self, args: Tuple, kwargs: Dict, cache: TaskCache = None) -> Any:
+        """Executes the python Callable under cProfile and merges the profile into profile_stats.
+        Coroutine and generator functions are only profiled until they return the coroutine or generator"""
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # only one profiler can be active at a time on newer interpreters
+            self._log.warning('Task %s was not profiled, another profiler is active', self.name)
+            profiler = None
         try:
+            if cache is not None:
+                return cache.call(self.func, *args, **kwargs)
             return self.func(*args, **kwargs)
-        except Exception as error:
-            raise error
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self.add_profile(profiler)
+
+    def add_profile(self, profile: Union[Profile, Dict]) -> None:
+        """Merges a profile of the callable into profile_stats, profiles of every run are
+        aggregated until profile_stats is reset to None
+
+        Args:
+            profile (cProfile.Profile | Dict): a profiler that ran the callable, or the raw
+                stats it created when the callable ran in a worker process
+        """
+        import pstats
+        if isinstance(profile, dict):
+            profile = _RawProfile(profile)
+        try:
+            if self.profile_stats is None:
+                self.profile_stats = pstats.Stats(profile)
+            else:
+                self.profile_stats.add(profile)
+        except TypeError:
+            # nothing was recorded
+            pass
 
 
 class Task(BaseTask):
@@ -142,11 +281,22 @@ class Task(BaseTask):
             name: str = None,
             desc: str = None,
             skip_validation: bool = False,
+            keep_result: bool = False,
+            cache: TaskCache = None,
+            buffer_size: int = 16,
+            cost: float = None,
+            profile: bool = None,
             **kwargs) -> None:
 
-        super().__init__(func=wrapped_partial(func, **kwargs))
+        super().__init__(func=wrapped_partial(func, **kwargs), cache=cache)
         self.depends_on = depends_on
         self.skip_validation = skip_validation
+        self.keep_result = keep_result
+        self.buffer_size = buffer_size
+        self.cost = cost
+        self.profile = profile
+        self.profile_stats = None
+        self.duration = None
         self.name = name
         self.desc = desc
         self.status = "Not Started"
@@ -171,4 +321,72 @@ class Task(BaseTask):
         self.status = status
 
     def run(self, *args, **kwargs):
-        self.result = self._run(*args, **kwargs)
+        self.result, self.duration = self.execute(*args, **kwargs)
+
+    def execute(self, *args, **kwargs) -> Tuple[Any, float]:
+        """Runs the Task without storing the result on it, used by executors so
+        concurrent runs of a Pipeline do not share the result
+
+        Returns:
+            Tuple[Any, float]: the result and how long the Task took in seconds
+        """
+        return self._execute(args, kwargs, self.cache, self.profile)
+
+    def _execute(self, args: Tuple, kwargs: Dict, cache: TaskCache = None, profile: bool = None) -> Tuple[Any, float]:
+        """Runs the Task with the cache and profile settings of a run, see execute"""
+        start_time = perf_counter()
+        result = self._stream(self._call(args, kwargs, cache, profile))
+        return result, perf_counter() - start_time
+
+    def estimate_cost(self) -> float:
+        """Estimates how long the Task takes to run, used to schedule the longest chains
+        of Tasks first. The duration of the last run is used when the Task has run before,
+        otherwise the cost hint, otherwise every Task is assumed to take as long.
+
+        Returns:
+            float: estimated cost of the Task
+        """
+        if self.duration is not None:
+            return self.duration
+        if self.cost is not None:
+            return self.cost
+        return 1.0
+
+    def is_coroutine(self) -> bool:
+        """Returns True if the Task wraps a coroutine function"""
+        return iscoroutinefunction(self.func)
+
+    def is_generator(self) -> bool:
+        """Returns True if the Task wraps a generator function that streams batches"""
+        return isgeneratorfunction(self.func)
+
+    def _stream(self, result: Any) -> Any:
+        """Wraps the output of a generator function in a bounded Stream that is
+        produced on a background thread while downstream Tasks consume it"""
+        if self.is_generator():
+            return Stream(result, maxsize=self.buffer_size, name=self.name)
+        return result
+
+    async def arun(self, *args, **kwargs):
+        """Awaits a coroutine function, synchronous functions are offloaded to a thread
+        so they do not block the event loop"""
+        self.result, self.duration = await self.aexecute(*args, **kwargs)
+
+    async def aexecute(self, *args, **kwargs) -> Tuple[Any, float]:
+        """Awaits the Task without storing the result on it, see execute
+
+        Returns:
+            Tuple[Any, float]: the result and how long the Task took in seconds
+        """
+        return await self._aexecute(args, kwargs, self.cache, self.profile)
+
+    async def _aexecute(
+            self, args: Tuple, kwargs: Dict, cache: TaskCache = None, profile: bool = None) -> Tuple[Any, float]:
+        """Awaits the Task with the cache and profile settings of a run, see aexecute"""
+        start_time = perf_counter()
+        if self.is_coroutine():
+            result = await self._call(args, kwargs, cache, profile)
+        else:
+            from asyncio import to_thread
+            result = self._stream(await to_thread(self._call, args, kwargs, cache, profile))
+        return result, perf_counter() - start_time
@@ -0,0 +1,35 @@
+import time
+
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+
+def start() -> int:
+    return 1
+
+
+def slow_increment(x: int) -> int:
+    time.sleep(0.2)
+    return x + 1
+
+
+def add(x: int, y: int) -> int:
+    return x + y
+
+
+def fail(x: int) -> int:
+    raise RuntimeError('boom')
+
+
+def diamond(type: str = 'default', **kwargs) -> Pipeline:
+    """Two slow branches joined by a single Task, the branches overlap when run concurrently"""
+    return Pipeline(
+        steps=[
+            Task(start, name='start'),
+            Task(slow_increment, depends_on=['start'], name='left'),
+            Task(slow_increment, depends_on=['start'], name='right'),
+            Task(add, depends_on=['left', 'right'], name='join'),
+        ],
+        type=type,
+        **kwargs
+    )
@@ -0,0 +1,115 @@
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from maellin.cache import TaskCache, fingerprint
+from maellin.workflows import Pipeline
+from maellin.tasks import Task
+
+CALLS = []
+
+
+def read_table(rows: int) -> pd.DataFrame:
+    CALLS.append('read_table')
+    return pd.DataFrame({'id': range(rows), 'name': [f'name_{i}' for i in range(rows)]})
+
+
+def head(df: pd.DataFrame, num: int) -> pd.DataFrame:
+    CALLS.append('head')
+    return df.head(num)
+
+
+def scenario(cache: TaskCache, num: int = 5, type: str = 'default') -> Pipeline:
+    pipeline = Pipeline(
+        type=type,
+        steps=[
+            Task(read_table, name='read', rows=100),
+            Task(head, depends_on=['read'], name='head', num=num),
+        ],
+        cache=cache
+    )
+    pipeline.run()
+    return pipeline
+
+
+class TestTaskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        CALLS.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_hits_skip_execution(self):
+        cache = TaskCache(path=self.path)
+        first = scenario(cache)
+        second = scenario(cache)
+        self.assertEqual(CALLS, ['read_table', 'head'])
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        assert_frame_equal(first.steps[-1].result, second.steps[-1].result)
+
+    def test_changed_kwargs_only_rerun_changed_task(self):
+        cache = TaskCache(path=self.path)
+        scenario(cache, num=5)
+        scenario(cache, num=10)
+        self.assertEqual(CALLS, ['read_table', 'head', 'head'])
+
+    def test_cache_persists_on_disk(self):
+        scenario(TaskCache(path=self.path))
+        cache = TaskCache(path=self.path)
+        scenario(cache)
+        self.assertEqual(cache.hits, 2)
+
+    def test_multi_processing_runs_use_the_cache(self):
+        cache = TaskCache(path=self.path)
+        first = scenario(cache, type='multi-processing')
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        second = scenario(cache, type='multi-processing')
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        assert_frame_equal(first.steps[-1].result, second.steps[-1].result)
+
+    def test_cache_setting_is_resolved_per_run(self):
+        cache = TaskCache(path=self.path)
+        task = Task(read_table, name='read', rows=10)
+        Pipeline(steps=[task], cache=cache).run()
+        self.assertIsNone(task.cache)
+        Pipeline(steps=[task]).run()
+        self.assertEqual(CALLS, ['read_table', 'read_table'])
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_lru_eviction(self):
+        cache = TaskCache(path=self.path, max_bytes=1)
+        scenario(cache)
+        self.assertEqual(cache.stats()['entries'], 1)
+
+    def test_fingerprint_tracks_code_and_inputs(self):
+        f = lambda x: x + 1  # noqa: E731
+        g = lambda x: x + 2  # noqa: E731
+        self.assertEqual(fingerprint(f, (1,)), fingerprint(f, (1,)))
+        self.assertNotEqual(fingerprint(f, (1,)), fingerprint(f, (2,)))
+        self.assertNotEqual(fingerprint(f, (1,)), fingerprint(g, (1,)))
+
+    def test_fingerprint_tracks_defaults_and_closures(self):
+        def scale(x, factor=2, *, offset=0):
+            return x * factor + offset
+
+        key = fingerprint(scale, (1,))
+        scale.__defaults__ = (3,)
+        self.assertNotEqual(fingerprint(scale, (1,)), key)
+        key = fingerprint(scale, (1,))
+        scale.__kwdefaults__ = {'offset': 1}
+        self.assertNotEqual(fingerprint(scale, (1,)), key)
+
+        factor = 2
+        captured = lambda x: x * factor  # noqa: E731
+        key = fingerprint(captured, (1,))
+        factor = 3
+        self.assertNotEqual(fingerprint(captured, (1,)), key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from maellin.cli import main
+from maellin.serialization import MAGIC
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from helpers import fail
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def extract() -> int:
+    return 1
+
+
+def increment(x: int) -> int:
+    return x + 1
+
+
+def workflow(last=increment) -> Pipeline:
+    return Pipeline(steps=[
+        Task(extract, name='extract'),
+        Task(increment, depends_on=['extract'], name='left'),
+        Task(increment, depends_on=['extract'], name='right'),
+        Task(last, depends_on=['left'], name='load'),
+    ])
+
+
+def imported_modules(statement: str) -> set:
+    """Imports in a fresh interpreter and returns the modules that were loaded"""
+    process = subprocess.run(
+        [sys.executable, '-c', f'import sys; {statement}; print(" ".join(sys.modules))'],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(process.stdout.split())
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def call(self, *argv) -> tuple:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            code = main(list(argv))
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_plan(self):
+        workflow().dump_plan(self.path('etl.plan'))
+        code, out, _ = self.call('plan', self.path('etl.plan'))
+        self.assertEqual(code, 0)
+        lines = out.splitlines()
+        self.assertIn('4 Tasks on 3 levels', lines[0])
+        self.assertEqual([line.split()[:2] for line in lines[2:]],
+                         [['0', 'extract'], ['1', 'left'], ['1', 'right'], ['2', 'load']])
+        self.assertTrue(lines[-1].endswith('left'))
+
+    def test_plan_of_pickled_dag(self):
+        pipeline = workflow()
+        pipeline.compose()
+        pipeline.dump(self.path('etl.pkl'))
+        # loading a pickled DAG in this process would rebind the maellin classes it embeds,
+        # the functions of this module are pickled by reference under the name it was imported as
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.dirname(os.path.abspath(__file__))]))
+        process = subprocess.run(
+            [sys.executable, '-m', 'maellin', 'plan', self.path('etl.pkl')],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+        self.assertIn('4 Tasks on 3 levels', process.stdout)
+
+    def test_run(self):
+        workflow().dump_plan(self.path('etl.plan'))
+        for executor in ('default', 'multi-threading', 'shared'):
+            code, out, _ = self.call(
+                'run', self.path('etl.plan'), '--executor', executor, '--workers', '2', '--log-level', 'WARNING')
+            self.assertEqual(code, 0)
+            self.assertIn('completed 4 Tasks', out)
+
+    def test_failed_run(self):
+        workflow(last=fail).dump_plan(self.path('etl.plan'))
+        for executor in ('default', 'multi-threading'):
+            code, _, err = self.call('run', self.path('etl.plan'), '--executor', executor)
+            self.assertEqual(code, 1)
+            self.assertIn('failed', err)
+            self.assertNotIn('Traceback', err)
+
+    def test_incompatible_executor(self):
+        pipeline = workflow()
+        pipeline.type = 'asyncio'
+        pipeline.dump_plan(self.path('etl.plan'))
+        code, _, err = self.call('run', self.path('etl.plan'), '--executor', 'default')
+        self.assertEqual(code, 2)
+        self.assertIn('cannot run on default', err)
+
+    def test_unreadable_files(self):
+        with open(self.path('corrupt.plan'), 'wb') as f:
+            f.write(MAGIC + bytes(16))
+        with open(self.path('corrupt.pkl'), 'wb') as f:
+            f.write(b'not a pickle')
+        for name in ('missing.plan', 'corrupt.plan', 'corrupt.pkl'):
+            for command in ('run', 'plan'):
+                code, _, err = self.call(command, self.path(name))
+                self.assertEqual(code, 2)
+                self.assertTrue(err.startswith(f'maellin: {self.path(name)}: '), err)
+                self.assertNotIn('Traceback', err)
+
+    def test_heavy_modules_are_imported_when_needed(self):
+        modules = imported_modules('import maellin.cli')
+        self.assertFalse({'networkx', 'cloudpickle', 'apscheduler', 'asyncio'} & modules)
+        modules = imported_modules('import maellin.workflows')
+        self.assertFalse({'apscheduler', 'asyncio', 'multiprocessing', 'matplotlib', 'pandas'} & modules)
+        self.assertIn('networkx', modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,272 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from maellin.exceptions import ActivityFailedError
+from maellin.workflows import Pipeline
+from maellin.tasks import Task
+
+from helpers import add, diamond, fail, slow_increment, start
+
+
+def subtract(x: int, y: int) -> int:
+    return x - y
+
+
+ORDER = []
+
+
+def record(x: int, label: str) -> int:
+    ORDER.append(label)
+    return x
+
+
+async def slow_fetch(x: int) -> int:
+    await asyncio.sleep(0.2)
+    return x + 1
+
+
+class TestResultStore(unittest.TestCase):
+
+    def test_inputs_follow_depends_on_order(self):
+        for type in ('default', 'multi-threading', 'asyncio'):
+            pipeline = Pipeline(
+                steps=[
+                    Task(start, name='start'),
+                    Task(slow_increment, depends_on=['start'], name='two'),
+                    Task(subtract, depends_on=['start', 'two'], name='forward'),
+                    Task(subtract, depends_on=['two', 'start'], name='backward'),
+                ],
+                type=type
+            )
+            pipeline.run()
+            self.assertEqual(pipeline.get_task_by_name('forward').result, -1)
+            self.assertEqual(pipeline.get_task_by_name('backward').result, 1)
+
+
+class TestReleaseResults(unittest.TestCase):
+
+    def test_intermediate_results_are_released(self):
+        for type in ('default', 'multi-threading', 'asyncio'):
+            pipeline = Pipeline(
+                steps=[
+                    Task(start, name='start'),
+                    Task(slow_increment, depends_on=['start'], name='left', keep_result=True),
+                    Task(slow_increment, depends_on=['start'], name='right'),
+                    Task(add, depends_on=['left', 'right'], name='join'),
+                ],
+                type=type,
+                release_results=True
+            )
+            pipeline.run()
+            self.assertIsNone(pipeline.get_task_by_name('start').result)
+            self.assertIsNone(pipeline.get_task_by_name('right').result)
+            self.assertEqual(pipeline.get_task_by_name('left').result, 2)
+            self.assertEqual(pipeline.steps[-1].result, 4)
+            self.assertGreater(pipeline.peak_result_bytes, 0)
+
+    def test_results_are_kept_by_default(self):
+        pipeline = diamond()
+        pipeline.run()
+        self.assertEqual(pipeline.get_task_by_name('start').result, 1)
+
+
+class TestMultiThreadingExecutor(unittest.TestCase):
+
+    def test_results_match_default(self):
+        default = diamond()
+        default.run()
+        threaded = diamond(type='multi-threading', workers=2)
+        threaded.run()
+        self.assertEqual(default.steps[-1].result, threaded.steps[-1].result)
+        self.assertEqual(threaded.steps[-1].result, 4)
+
+    def test_independent_branches_overlap(self):
+        pipeline = diamond(type='multi-threading', workers=2)
+        start_time = time.perf_counter()
+        pipeline.run()
+        self.assertLess(time.perf_counter() - start_time, 0.35)
+
+    def test_failure_is_raised(self):
+        assert_failure_is_reported(self, 'multi-threading')
+
+
+class TestMultiProcessingExecutor(unittest.TestCase):
+
+    def test_results_match_default(self):
+        pipeline = diamond(type='multi-processing', workers=2)
+        pipeline.run()
+        self.assertEqual(pipeline.steps[-1].result, 4)
+
+    def test_lambdas_are_shipped_with_cloudpickle(self):
+        pipeline = Pipeline(
+            steps=[
+                Task(start, name='start'),
+                Task(lambda x: x * 10, depends_on=['start'], name='scale', skip_validation=True),
+            ],
+            type='multi-processing'
+        )
+        pipeline.run()
+        self.assertEqual(pipeline.steps[-1].result, 10)
+
+    def test_failure_is_raised(self):
+        assert_failure_is_reported(self, 'multi-processing')
+
+
+class TestAsyncioExecutor(unittest.TestCase):
+
+    def fan_out(self, width: int, **kwargs) -> Pipeline:
+        steps = [Task(start, name='start')]
+        steps += [Task(slow_fetch, depends_on=['start'], name=f'fetch_{i}') for i in range(width)]
+        return Pipeline(steps=steps, **kwargs)
+
+    def test_arun_awaits_coroutines_concurrently(self):
+        pipeline = self.fan_out(50)
+        start_time = time.perf_counter()
+        asyncio.run(pipeline.arun())
+        self.assertLess(time.perf_counter() - start_time, 1.0)
+        self.assertEqual([task.result for task in pipeline.steps[1:]], [2] * 50)
+
+    def test_concurrency_limit(self):
+        pipeline = self.fan_out(4, workers=2)
+        start_time = time.perf_counter()
+        asyncio.run(pipeline.arun())
+        self.assertGreaterEqual(time.perf_counter() - start_time, 0.4)
+
+    def test_run_with_sync_tasks(self):
+        pipeline = diamond(type='asyncio')
+        pipeline.run()
+        self.assertEqual(pipeline.steps[-1].result, 4)
+
+    def test_failure_is_raised(self):
+        assert_failure_is_reported(self, 'asyncio')
+
+
+class TestCriticalPathSchedule(unittest.TestCase):
+
+    def wide_and_deep(self, **kwargs) -> Pipeline:
+        steps = [Task(start, name='start')]
+        steps += [Task(record, depends_on=['start'], name=f'wide_{i}', label=f'wide_{i}') for i in range(4)]
+        steps += [Task(record, depends_on=['start'], name='deep_0', label='deep_0')]
+        steps += [Task(record, depends_on=[f'deep_{i}'], name=f'deep_{i + 1}', label=f'deep_{i + 1}') for i in range(3)]
+        return Pipeline(steps=steps, **kwargs)
+
+    def test_critical_paths(self):
+        pipeline = diamond()
+        pipeline.compose()
+        costs = {tsk.tid: cost for tsk, cost in zip(pipeline.steps, [1.0, 5.0, 2.0, 1.0])}
+        paths = pipeline.get_critical_paths(costs)
+        self.assertEqual([paths[tsk.tid] for tsk in pipeline.steps], [7.0, 6.0, 3.0, 1.0])
+
+    def test_estimated_cost(self):
+        self.assertEqual(Task(start).estimate_cost(), 1.0)
+        self.assertEqual(Task(start, cost=3.0).estimate_cost(), 3.0)
+        task = Task(start, cost=3.0)
+        task.run()
+        self.assertLess(task.estimate_cost(), 1.0)
+
+    def test_longest_chain_starts_first(self):
+        for type in ('multi-threading', 'asyncio'):
+            ORDER.clear()
+            self.wide_and_deep(type=type, workers=1).run()
+            self.assertEqual(ORDER[0], 'wide_0')
+
+            ORDER.clear()
+            self.wide_and_deep(type=type, workers=1, schedule='critical-path').run()
+            self.assertEqual(ORDER[0], 'deep_0')
+            self.assertEqual(len(ORDER), 8)
+
+
+class TestRunStats(unittest.TestCase):
+
+    def test_every_task_is_recorded(self):
+        for type in ('default', 'multi-threading', 'multi-processing', 'asyncio'):
+            pipeline = diamond(type=type, workers=2)
+            pipeline.run()
+            stats = pipeline.last_run_stats
+            self.assertEqual(len(stats), 4)
+            left = stats[pipeline.get_task_by_name('left').tid]
+            self.assertEqual(left.status, 'Completed')
+            self.assertGreaterEqual(left.duration, 0.2)
+            self.assertGreaterEqual(left.queue_wait, 0.0)
+            self.assertGreater(left.result_bytes, 0)
+            self.assertIsNotNone(left.worker)
+            if type != 'asyncio':
+                self.assertLess(left.cpu_time, 0.2)
+            self.assertIn(stats.slowest(1)[0].name, ('left', 'right'))
+
+    def test_queue_wait_with_one_worker(self):
+        pipeline = diamond(type='multi-threading', workers=1)
+        pipeline.run()
+        waits = sorted(pipeline.last_run_stats[pipeline.get_task_by_name(name).tid].queue_wait
+                       for name in ('left', 'right'))
+        self.assertGreaterEqual(waits[1], 0.2)
+
+    def test_failed_task_is_recorded(self):
+        for type in ('default', 'multi-threading', 'multi-processing', 'asyncio', 'shared'):
+            pipeline = Pipeline(
+                steps=[Task(start, name='start'), Task(fail, depends_on=['start'], name='fail')], type=type)
+            with self.assertRaises((RuntimeError, ActivityFailedError)):
+                pipeline.run()
+            failed = pipeline.last_run_stats[pipeline.get_task_by_name('fail').tid]
+            self.assertEqual(failed.status, 'Failed', type)
+            self.assertIsNotNone(failed.duration, type)
+            self.assertIsNotNone(failed.worker, type)
+
+    def test_export(self):
+        pipeline = diamond()
+        pipeline.run()
+        frame = pipeline.last_run_stats.to_frame()
+        self.assertEqual(list(frame['name']), ['start', 'left', 'right', 'join'])
+        self.assertIn('queue_wait', frame.columns)
+        document = json.loads(pipeline.last_run_stats.to_json())
+        self.assertEqual(len(document['tasks']), 4)
+        self.assertGreaterEqual(document['duration'], 0.4)
+
+
+class TestTrace(unittest.TestCase):
+
+    def test_run_writes_chrome_trace(self):
+        pipeline = diamond(type='multi-threading', workers=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'run.trace.json')
+            pipeline.run(trace=path)
+            with open(path) as f:
+                events = json.load(f)['traceEvents']
+
+        spans = [event for event in events if event['ph'] == 'X' and event['cat'] == 'task']
+        self.assertEqual(sorted(span['name'] for span in spans), ['join', 'left', 'right', 'start'])
+        branches = [span for span in spans if span['name'] in ('left', 'right')]
+        self.assertNotEqual(branches[0]['tid'], branches[1]['tid'])
+        self.assertGreaterEqual(min(span['dur'] for span in branches), 2e5)
+
+        waits = [event for event in events if event.get('cat') == 'queue']
+        self.assertEqual(len(waits), 8)
+        critical = [event['name'] for event in events if event.get('cat') == 'critical_path']
+        self.assertEqual(critical[0], 'start')
+        self.assertIn(critical[1], ('left', 'right'))
+        self.assertEqual(critical[2], 'join')
+
+
+def assert_failure_is_reported(case: unittest.TestCase, type: str) -> None:
+    pipeline = Pipeline(
+        steps=[
+            Task(start, name='start'),
+            Task(fail, depends_on=['start'], name='fail'),
+            Task(slow_increment, depends_on=['fail'], name='after'),
+            Task(slow_increment, depends_on=['start'], name='independent'),
+        ],
+        type=type
+    )
+    with case.assertRaises(ActivityFailedError):
+        pipeline.run()
+    case.assertEqual(pipeline.get_task_by_name('fail').status, 'Failed')
+    case.assertEqual(pipeline.get_task_by_name('after').status, 'Queued')
+    case.assertEqual(pipeline.get_task_by_name('independent').result, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import io
+import logging
+import unittest
+from logging.handlers import QueueHandler
+
+from maellin.logger import LoggingMixin, disable_queue_logging, enable_queue_logging
+
+
+class Component(LoggingMixin):
+    pass
+
+
+class Subcomponent(Component):
+    pass
+
+
+class TestLoggingMixin(unittest.TestCase):
+
+    def test_logger_is_created_once_per_class(self):
+        self.assertIs(Component().logger, Component().logger)
+        self.assertEqual(Subcomponent().logger.name, f'{__name__}.Subcomponent')
+        self.assertIsNot(Subcomponent().logger, Component().logger)
+
+    def test_queue_logging(self):
+        Component().logger
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        root = logging.getLogger()
+        root.addHandler(handler)
+        self.addCleanup(root.removeHandler, handler)
+
+        enable_queue_logging()
+        try:
+            self.assertTrue(any(isinstance(h, QueueHandler) for h in root.handlers))
+            self.assertNotIn(handler, root.handlers)
+            Component().logger.warning('Queued %s', 'record')
+        finally:
+            disable_queue_logging()
+
+        self.assertIn('Queued record', stream.getvalue())
+        self.assertIn(handler, root.handlers)
+        self.assertFalse(any(isinstance(h, QueueHandler) for h in root.handlers))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from maellin.exceptions import CircularDependencyError
+from maellin.plan import ExecutionPlan
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from helpers import add, start
+
+
+def increment(x: int) -> int:
+    return x + 1
+
+
+class TestExecutionPlan(unittest.TestCase):
+
+    def test_csr_adjacency(self):
+        plan = ExecutionPlan({'a': ['b', 'c', 'b'], 'b': ['d'], 'c': ['d'], 'd': []})
+        self.assertEqual(plan.tids, ('a', 'b', 'c', 'd'))
+        self.assertEqual(list(plan.successors(0)), [1, 2])
+        self.assertEqual(list(plan.predecessors(3)), [1, 2])
+        self.assertEqual(list(plan.in_degree), [0, 1, 1, 2])
+        self.assertEqual(list(plan.levels), [0, 1, 1, 2])
+        self.assertEqual(plan.topological_sort(), ['a', 'b', 'c', 'd'])
+
+    def test_levels_follow_longest_path(self):
+        plan = ExecutionPlan({'d': [], 'a': ['b', 'd'], 'b': ['c'], 'c': ['d']})
+        self.assertEqual(plan.topological_sort(), ['a', 'b', 'c', 'd'])
+        self.assertEqual(plan.levels[plan.index['d']], 3)
+
+    def test_cycles_are_rejected(self):
+        with self.assertRaises(CircularDependencyError):
+            ExecutionPlan({'a': ['b'], 'b': ['a']})
+
+    def test_plan_is_immutable(self):
+        plan = ExecutionPlan({'a': []})
+        with self.assertRaises(AttributeError):
+            plan.order = ()
+
+
+class TestCompile(unittest.TestCase):
+
+    def test_plan_is_cached_until_the_dag_changes(self):
+        pipeline = Pipeline(
+            steps=[
+                Task(start, name='start'),
+                Task(increment, depends_on=['start'], name='left'),
+                Task(increment, depends_on=['start'], name='right'),
+                Task(add, depends_on=['left', 'right'], name='join'),
+            ]
+        )
+        pipeline.compose()
+        plan = pipeline.compile()
+        self.assertIs(pipeline.compile(), plan)
+        self.assertEqual(len(plan), 4)
+        self.assertEqual(pipeline.topological_sort()[-1], pipeline.get_task_by_name('join').tid)
+
+        other = Task(start, name='other')
+        pipeline.add_node_to_dag(other)
+        self.assertIsNot(pipeline.compile(), plan)
+        self.assertEqual(len(pipeline.compile()), 5)
+
+        plan = pipeline.compile()
+        # edges added on the networkx graph directly
+        pipeline.dag.add_edge(pipeline.get_task_by_name('join').tid, other.tid)
+        self.assertIsNot(pipeline.compile(), plan)
+        self.assertEqual(len(pipeline.compile()), 5)
+        self.assertEqual(pipeline.topological_sort()[-1], other.tid)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,394 @@
+import asyncio
+import io
+import os
+import tempfile
+import unittest
+from collections import namedtuple
+from contextlib import nullcontext
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+import pandas as pd
+
+from maellin.clients.postgres import CSV_NULL, AsyncPostgresClient, CopyTask, PostgresClient, rows_to_frame
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+Column = namedtuple('Column', ['name', 'type_code'])
+DESCRIPTION = [Column('id', 23), Column('amount', 701), Column('name', 25), Column('created', 1114)]
+ROWS = [
+    (1, 2.5, 'a', datetime(2022, 1, 1)),
+    (2, None, 'b', datetime(2022, 1, 2)),
+    (None, 1.0, None, datetime(2022, 1, 3)),
+]
+
+
+class RecordedCursor:
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.description = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.description = DESCRIPTION
+        self._pos = 0
+
+    def fetchmany(self, size):
+        rows = self.rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        return rows
+
+
+class RecordedConnection:
+
+    autocommit = False
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursor_kwargs = None
+
+    def cursor(self, name='', **kwargs):
+        self.cursor_kwargs = dict(name=name, **kwargs)
+        return RecordedCursor(self.rows)
+
+
+class RecordedCopy:
+
+    def __init__(self):
+        self.writes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, data):
+        self.writes.append(data)
+
+
+class RecordedCopyCursor(RecordedCursor):
+
+    def __init__(self):
+        super().__init__([])
+        self.statements = []
+        self.copies = []
+
+    def execute(self, query, params=None):
+        self.statements.append(query)
+
+    def copy(self, statement):
+        self.statements.append(statement)
+        self.copies.append(RecordedCopy())
+        return self.copies[-1]
+
+
+class RecordedCopyConnection:
+
+    def __init__(self):
+        self.cursor_ = RecordedCopyCursor()
+
+    def transaction(self):
+        return nullcontext()
+
+    def cursor(self):
+        return self.cursor_
+
+
+class RecordedPool:
+
+    check_connection = staticmethod(lambda conn: None)
+
+    def __init__(self, conninfo, **kwargs):
+        self.conninfo = conninfo
+        self.options = kwargs
+        self.checkouts = 0
+        self.closed = False
+
+    def connection(self):
+        self.checkouts += 1
+        return nullcontext(RecordedCopyConnection())
+
+    def get_stats(self):
+        return {'requests_num': self.checkouts}
+
+    def close(self):
+        self.closed = True
+
+
+class AsyncRecordedPool(RecordedPool):
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class AsyncRecordedCursor(RecordedCursor):
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        super().execute(query, params)
+
+    async def fetchmany(self, size):
+        return super().fetchmany(size)
+
+
+class AsyncRecordedConnection(RecordedConnection):
+
+    def cursor(self, name='', **kwargs):
+        self.cursor_kwargs = dict(name=name, **kwargs)
+        return AsyncRecordedCursor(self.rows)
+
+
+class AsyncRecordedCopy(RecordedCopy):
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def write(self, data):
+        super().write(data)
+
+
+class AsyncRecordedCopyCursor(RecordedCopyCursor):
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        super().execute(query, params)
+
+    def copy(self, statement):
+        self.statements.append(statement)
+        self.copies.append(AsyncRecordedCopy())
+        return self.copies[-1]
+
+
+class AsyncRecordedCopyConnection:
+
+    def __init__(self):
+        self.cursor_ = AsyncRecordedCopyCursor()
+
+    def transaction(self):
+        return self.cursor_
+
+    def cursor(self):
+        return self.cursor_
+
+
+def build_frame() -> pd.DataFrame:
+    return pd.DataFrame({'id': range(25), 'name': [f'name_{i}' for i in range(25)]})
+
+
+class TestCopyFrame(unittest.TestCase):
+
+    def test_copy_frame_writes_csv_chunks(self):
+        conn = RecordedCopyConnection()
+        stats = PostgresClient().copy_frame(build_frame(), 'dw.customer', conn=conn, chunksize=10)
+        self.assertEqual(stats['rows'], 25)
+        self.assertEqual([data.count('\n') for data in conn.cursor_.copies[0].writes], [10, 10, 5])
+
+    def test_copy_frame_accepts_iterators(self):
+        conn = RecordedCopyConnection()
+        frames = iter([build_frame(), build_frame()])
+        stats = PostgresClient().copy_frame(frames, 'dw.customer', conn=conn, staging=True)
+        self.assertEqual(stats['rows'], 50)
+        self.assertEqual(len(conn.cursor_.copies), 2)
+
+    def test_csv_round_trip_keeps_nulls_and_empty_strings(self):
+        frames = [
+            pd.DataFrame({'name': ['', None, 'a'], 'id': [1, 2, 3]}),
+            pd.DataFrame({'name': ['', None, 'a']}),
+            pd.DataFrame({'id': pd.array([1, None, 3], dtype='Int64')}),
+        ]
+        for frame in frames:
+            conn = RecordedCopyConnection()
+            PostgresClient().copy_frame(frame, 'dw.customer', conn=conn)
+            self.assertIn('NULL', conn.cursor_.statements[0].as_string(None))
+            # parsed the way COPY does with NULL '\N', empty fields are empty strings
+            loaded = pd.read_csv(
+                io.StringIO(''.join(conn.cursor_.copies[0].writes)), header=None, names=list(frame.columns),
+                na_values=[CSV_NULL], keep_default_na=False, dtype=dict(frame.dtypes))
+            pd.testing.assert_frame_equal(loaded, frame)
+
+    def test_csv_writes_whole_floats_as_integers(self):
+        frame = pd.DataFrame({'id': [1.0, None, 3.0], 'id2': [1, 2, 3], 'amount': [1.5, None, 2.0]})
+        frame.columns = ['id', 'id', 'amount']
+        conn = RecordedCopyConnection()
+        PostgresClient().copy_frame(frame, 'dw.customer', conn=conn)
+        self.assertEqual(''.join(conn.cursor_.copies[0].writes), '1,1,1.5\n\\N,2,\\N\n3,3,2.0\n')
+        self.assertEqual(str(frame.iloc[:, 0].dtype), 'float64')
+
+    def test_staging_replaces_rows_after_the_copy(self):
+        conn = RecordedCopyConnection()
+        PostgresClient().copy_frame(build_frame(), 'dw.customer', conn=conn, staging=True, replace=True)
+        statements = [statement.as_string(None).split()[0] for statement in conn.cursor_.statements]
+        self.assertEqual(statements, ['CREATE', 'COPY', 'DELETE', 'INSERT'])
+
+    def test_copy_task_validates_dataframe_input(self):
+        pipeline = Pipeline(
+            steps=[
+                Task(build_frame, name='build'),
+                CopyTask('dw.customer', depends_on=['build'], name='load', conn=RecordedCopyConnection()),
+            ]
+        )
+        pipeline.run()
+        self.assertEqual(pipeline.steps[-1].result['rows'], 25)
+
+
+class TestReadFrame(unittest.TestCase):
+
+    def test_rows_to_frame_types(self):
+        df = rows_to_frame(ROWS[:2], DESCRIPTION)
+        self.assertEqual(list(df.columns), ['id', 'amount', 'name', 'created'])
+        self.assertEqual(str(df.id.dtype), 'Int64')
+        self.assertEqual(str(df.amount.dtype), 'float64')
+        self.assertTrue(str(df.created.dtype).startswith('datetime64'))
+
+    def test_rows_to_frame_nulls_and_empty(self):
+        self.assertEqual(rows_to_frame(ROWS, DESCRIPTION).id.isna().sum(), 1)
+        self.assertEqual(list(rows_to_frame([], DESCRIPTION).columns), ['id', 'amount', 'name', 'created'])
+
+    def test_rows_to_frame_keeps_null_booleans(self):
+        description = [Column('active', 16)]
+        self.assertEqual(str(rows_to_frame([(True,), (False,)], description).active.dtype), 'boolean')
+        self.assertEqual(rows_to_frame([(True,), (None,)], description).active.tolist(), [True, pd.NA])
+
+    def test_rows_to_frame_dtypes_do_not_depend_on_nulls(self):
+        description = [Column('id', 23), Column('active', 16), Column('amount', 701)]
+        chunks = [[(1, True, 1.0)], [(None, None, None)], []]
+        dtypes = [rows_to_frame(rows, description).dtypes.tolist() for rows in chunks]
+        self.assertEqual(dtypes[0], dtypes[1])
+        self.assertEqual(dtypes[0], dtypes[2])
+
+    def test_rows_to_frame_keeps_duplicate_names(self):
+        description = [Column('id', 23), Column('id', 25)]
+        df = rows_to_frame([(1, 'a'), (2, 'b')], description)
+        self.assertEqual(list(df.columns), ['id', 'id'])
+        self.assertEqual(df.iloc[:, 0].tolist(), [1, 2])
+        self.assertEqual(df.iloc[:, 1].tolist(), ['a', 'b'])
+
+    def test_read_frame_uses_named_cursor(self):
+        conn = RecordedConnection(ROWS)
+        df = PostgresClient().read_frame('SELECT 1', conn=conn)
+        self.assertEqual(len(df), 3)
+        self.assertTrue(conn.cursor_kwargs['name'])
+
+    def test_read_frame_chunks(self):
+        conn = RecordedConnection(ROWS * 10)
+        sizes = [len(chunk) for chunk in PostgresClient().read_frame('SELECT 1', conn=conn, chunksize=7)]
+        self.assertEqual(sizes, [7, 7, 7, 7, 2])
+
+
+class TestAsyncPostgresClient(unittest.TestCase):
+
+    def test_read_frame(self):
+        conn = AsyncRecordedConnection(ROWS)
+        df = asyncio.run(AsyncPostgresClient().read_frame('SELECT 1', conn=conn))
+        self.assertEqual(len(df), 3)
+        self.assertTrue(conn.cursor_kwargs['name'])
+
+    def test_stream_frames(self):
+        async def sizes():
+            conn = AsyncRecordedConnection(ROWS * 10)
+            frames = AsyncPostgresClient().stream_frames('SELECT 1', conn=conn, chunksize=7)
+            return [len(chunk) async for chunk in frames]
+        self.assertEqual(asyncio.run(sizes()), [7, 7, 7, 7, 2])
+
+    def test_copy_frame_accepts_async_iterators(self):
+        async def frames():
+            for _ in range(2):
+                yield build_frame()
+
+        conn = AsyncRecordedCopyConnection()
+        stats = asyncio.run(AsyncPostgresClient().copy_frame(frames(), 'dw.customer', conn=conn, chunksize=10))
+        self.assertEqual(stats['rows'], 50)
+        self.assertEqual([data.count('\n') for data in conn.cursor_.copies[0].writes], [10, 10, 5])
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.ini')
+        with os.fdopen(fd, 'w') as config:
+            config.write('[dvdrental]\nhost=localhost\ndbname=dvdrental\n')
+        patcher = mock.patch(
+            'maellin.clients.postgres._import_pool', return_value=SimpleNamespace(ConnectionPool=RecordedPool))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(PostgresClient.close_pools)
+        self.addCleanup(os.remove, self.path)
+
+    def test_pool_is_shared_by_section(self):
+        pool = PostgresClient().pool(self.path, 'dvdrental', max_size=4)
+        self.assertIs(PostgresClient().pool(self.path, 'dvdrental'), pool)
+        self.assertIn('dbname=dvdrental', pool.conninfo)
+        self.assertEqual(pool.options['max_size'], 4)
+        self.assertIsNotNone(pool.options['check'])
+
+    def test_checkouts_are_observable(self):
+        client = PostgresClient()
+        for _ in range(3):
+            with client.connection(self.path, 'dvdrental') as conn:
+                self.assertIsInstance(conn, RecordedCopyConnection)
+        self.assertEqual(PostgresClient.pool_stats()[f'{self.path}[dvdrental]']['requests_num'], 3)
+
+    def test_close_pools(self):
+        pool = PostgresClient().pool(self.path, 'dvdrental')
+        PostgresClient.close_pools()
+        self.assertTrue(pool.closed)
+        self.assertEqual(PostgresClient.pool_stats(), {})
+
+
+class TestAsyncConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch(
+            'maellin.clients.postgres._import_pool',
+            return_value=SimpleNamespace(AsyncConnectionPool=AsyncRecordedPool))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pools_are_closed_when_the_loop_shuts_down(self):
+        async def open_pools():
+            client = AsyncPostgresClient(host='localhost', dbname='dvdrental')
+            return [await client.pool(), await client.pool(max_size=4)]
+
+        for _ in range(2):
+            pools = asyncio.run(open_pools())
+            self.assertIs(pools[0], pools[1])
+            self.assertTrue(pools[0].closed)
+        self.assertEqual(len(AsyncPostgresClient._pools), 0)
+
+    def test_close_pools(self):
+        async def close_pools():
+            pool = await AsyncPostgresClient(host='localhost').pool()
+            await AsyncPostgresClient.close_pools()
+            return pool, AsyncPostgresClient.pool_stats()
+
+        pool, stats = asyncio.run(close_pools())
+        self.assertTrue(pool.closed)
+        self.assertEqual(stats, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
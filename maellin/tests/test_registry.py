@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from maellin.exceptions import NotFoundError
+from maellin.registry import DagRegistry
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+
+def extract() -> int:
+    return 1
+
+
+def scale(x: int, factor: int = 1) -> int:
+    return x * factor
+
+
+def workflow(factor: int) -> Pipeline:
+    return Pipeline(steps=[
+        Task(extract, name='extract'),
+        Task(scale, depends_on=['extract'], name='scale', factor=factor)])
+
+
+class TestDagRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.scheduler = BackgroundScheduler()
+        self.scheduler.start(paused=True)
+        self.addCleanup(self.scheduler.shutdown, wait=False)
+        self.registry = DagRegistry(self.tmp.name, scheduler=self.scheduler, max_loaded=2, minutes=5)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def jobs(self):
+        return sorted(job.name for job in self.scheduler.get_jobs())
+
+    def test_sync_tracks_changes(self):
+        workflow(2).dump_plan(self.path('daily.plan'))
+        workflow(3).dump(self.path('hourly.pkl'))
+        self.assertEqual(self.registry.sync(), {'added': ['daily', 'hourly'], 'changed': [], 'removed': []})
+        self.assertEqual(self.jobs(), ['daily', 'hourly'])
+
+        # unchanged and touched files are not reloaded
+        os.utime(self.path('daily.plan'), ns=(0, 0))
+        self.assertEqual(self.registry.sync(), {'added': [], 'changed': [], 'removed': []})
+
+        workflow(4).dump_plan(self.path('daily.plan'))
+        os.remove(self.path('hourly.pkl'))
+        self.assertEqual(self.registry.sync(), {'added': [], 'changed': ['daily'], 'removed': ['hourly']})
+        self.assertEqual(self.jobs(), ['daily'])
+        self.assertEqual(self.registry.loads, 0)
+
+        self.registry.run('daily')
+        self.assertEqual(self.registry.get('daily').get_task_by_name('scale').result, 4)
+
+    def test_plans_win_over_pickles_with_the_same_name(self):
+        workflow(2).dump(self.path('daily.pkl'))
+        workflow(3).dump_plan(self.path('daily.plan'))
+        with self.assertLogs('maellin.registry', level='WARNING') as logs:
+            self.assertEqual(self.registry.sync()['added'], ['daily'])
+        self.assertIn('daily.pkl', logs.output[0])
+        self.assertEqual(self.jobs(), ['daily'])
+        self.registry.run('daily')
+        self.assertEqual(self.registry.get('daily').get_task_by_name('scale').result, 3)
+        with self.assertNoLogs('maellin.registry', level='WARNING'):
+            self.registry.sync()
+
+    def test_loaded_dags_are_bounded(self):
+        for name in ('a', 'b', 'c'):
+            workflow(1).dump_plan(self.path(f'{name}.plan'))
+        self.registry.sync()
+        for name in ('a', 'b', 'a', 'c', 'a'):
+            self.registry.get(name)
+        self.assertEqual(self.registry.loads, 3)
+        self.registry.get('b')
+        self.assertEqual(self.registry.loads, 4)
+        with self.assertRaises(NotFoundError):
+            self.registry.get('missing')
+
+    def test_stop_removes_jobs(self):
+        workflow(1).dump_plan(self.path('daily.plan'))
+        self.registry.start(interval=60)
+        self.assertEqual(len(self.scheduler.get_jobs()), 2)
+        self.registry.stop()
+        self.assertEqual(self.scheduler.get_jobs(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
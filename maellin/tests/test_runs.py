@@ -0,0 +1,95 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from maellin.exceptions import ActivityFailedError
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+COUNTER = count(1)
+FAIL_ON = set()
+
+
+def stamp() -> int:
+    value = next(COUNTER)
+    time.sleep(0.1)
+    return value
+
+
+def slow_double(x: int) -> int:
+    time.sleep(0.1)
+    if x in FAIL_ON:
+        raise RuntimeError('boom')
+    return x * 2
+
+
+def stamped(type: str = 'default', **kwargs) -> Pipeline:
+    return Pipeline(
+        steps=[
+            Task(stamp, name='stamp'),
+            Task(slow_double, depends_on=['stamp'], name='double'),
+        ],
+        type=type,
+        **kwargs
+    )
+
+
+class TestRunContext(unittest.TestCase):
+
+    def tearDown(self):
+        FAIL_ON.clear()
+
+    def test_run_returns_its_context(self):
+        pipeline = stamped()
+        run = pipeline.run()
+        self.assertEqual(run.status_of('double'), 'Completed')
+        self.assertEqual(run.result('double'), run.result('stamp') * 2)
+        self.assertEqual(pipeline.get_task_by_name('double').result, run.result('double'))
+        self.assertNotEqual(pipeline.run().run_id, run.run_id)
+
+    def test_overlapping_runs_keep_their_own_results(self):
+        for type in ('default', 'multi-threading', 'asyncio', 'shared'):
+            pipeline = stamped(type=type)
+            pipeline.compose()
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                runs = list(pool.map(lambda _: pipeline.run(), range(4)))
+            stamps = [run.result('stamp') for run in runs]
+            self.assertEqual(len(set(stamps)), 4)
+            self.assertEqual([run.result('double') for run in runs], [value * 2 for value in stamps])
+            self.assertEqual(len({run.run_id for run in runs}), 4)
+
+    def test_failure_is_scoped_to_its_run(self):
+        pipeline = stamped(type='multi-threading')
+        pipeline.compose()
+        first = next(COUNTER) + 1
+        FAIL_ON.add(first)
+
+        def run():
+            try:
+                return pipeline.run()
+            except ActivityFailedError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            runs = list(pool.map(lambda _: run(), range(2)))
+        completed = [run for run in runs if run is not None]
+        self.assertEqual(len(completed), 1)
+        self.assertEqual(completed[0].status_of('double'), 'Completed')
+        self.assertNotEqual(completed[0].result('stamp'), first)
+
+    def test_tasks_are_updated_when_the_run_ends(self):
+        pipeline = stamped(type='multi-threading')
+        pipeline.compose()
+        task = pipeline.get_task_by_name('double')
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(pipeline.run)
+            time.sleep(0.05)
+            self.assertEqual(task.status, 'Not Started')
+            run = future.result()
+        self.assertEqual(task.status, 'Completed')
+        self.assertEqual(task.result, run.result('double'))
+
+
+if __name__ == '__main__':
+    unittest.main()
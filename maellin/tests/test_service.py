@@ -0,0 +1,121 @@
+import time
+import unittest
+from concurrent.futures import wait
+from threading import Event, Lock
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from maellin.exceptions import CompatibilityException
+from maellin.executors.service import ExecutionService
+
+from helpers import diamond
+
+
+class Probe:
+    """Counts the calls that run at the same time"""
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.running = 0
+        self.peak = 0
+        self.order = []
+
+    def __call__(self, label: str, delay: float = 0.05) -> str:
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.order.append(label)
+        time.sleep(delay)
+        with self.lock:
+            self.running -= 1
+        return label
+
+
+class TestExecutionService(unittest.TestCase):
+
+    def test_global_limit(self):
+        service = ExecutionService(max_workers=3)
+        probe = Probe()
+        futures = [service.submit(key % 4, probe, str(key)) for key in range(12)]
+        wait(futures)
+        self.assertEqual(probe.peak, 3)
+        self.assertEqual(sorted(f.result() for f in futures), sorted(str(key) for key in range(12)))
+        self.assertEqual(service.stats()['active'], 0)
+
+    def test_pipeline_limit(self):
+        service = ExecutionService(max_workers=8)
+        probe = Probe()
+        client = service.client('pipe', limit=2)
+        wait([client.submit(probe, str(i)) for i in range(6)])
+        self.assertEqual(probe.peak, 2)
+
+    def test_pipelines_share_workers_fairly(self):
+        service = ExecutionService(max_workers=1)
+        gate = Event()
+        blockers = [service.submit('blocker', gate.wait)]
+        probe = Probe()
+        # the first pipeline queues its whole burst before the second one
+        futures = [service.submit('first', probe, f'first-{i}', 0) for i in range(4)]
+        futures += [service.submit('second', probe, f'second-{i}', 0) for i in range(4)]
+        gate.set()
+        wait(blockers + futures)
+        self.assertEqual([label.split('-')[0] for label in probe.order], ['first', 'second'] * 4)
+
+    def test_errors_release_the_worker(self):
+        service = ExecutionService(max_workers=1)
+        failed = service.submit('pipe', int, 'not a number')
+        self.assertRaises(ValueError, failed.result)
+        self.assertEqual(service.submit('pipe', int, '3').result(), 3)
+        service.close('pipe')
+        self.assertEqual(service.stats()['pipelines'], {})
+
+
+class TestSharedExecutor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        service = ExecutionService.instance()
+        cls.max_workers = service.max_workers
+        service.configure(max_workers=4)
+
+    @classmethod
+    def tearDownClass(cls):
+        ExecutionService.instance().configure(max_workers=cls.max_workers)
+
+    def test_results_match_default(self):
+        default = diamond()
+        default.run()
+        shared = diamond(type='shared', workers=2)
+        start_time = time.perf_counter()
+        shared.run()
+        self.assertLess(time.perf_counter() - start_time, 0.35)
+        self.assertEqual(shared.steps[-1].result, default.steps[-1].result)
+
+    def test_run_overrides_executor(self):
+        pipeline = diamond()
+        pipeline.run(executor='shared')
+        self.assertEqual(pipeline.steps[-1].result, 4)
+        self.assertEqual(pipeline.type, 'default')
+        self.assertNotIn(pipeline.pid, ExecutionService.instance().stats()['pipelines'])
+
+    def test_pinned_types_are_not_overridden(self):
+        for type in ('asyncio', 'multi-processing'):
+            self.assertRaises(CompatibilityException, diamond(type=type).run, executor='shared')
+
+    def test_submit_keeps_pipeline_type(self):
+        pipeline = diamond(type='multi-threading')
+        pipeline.sched = BackgroundScheduler()
+        pipeline.sched.start(paused=True)
+        self.addCleanup(pipeline.sched.shutdown, wait=False)
+        pipeline.submit('diamond')
+        self.assertEqual(pipeline.sched.get_jobs()[0].kwargs, {'executor': None})
+
+    def test_shared_pipeline_can_be_dumped(self):
+        pipeline = diamond(type='shared')
+        pipeline.run()
+        # nothing reachable from the DAG holds the locks of the service
+        self.assertIsInstance(pipeline.dumps(), bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import threading
+import time
+import unittest
+from typing import Iterator, List
+
+from maellin.exceptions import CompatibilityException, StreamConsumedError
+from maellin.queues import Stream
+from maellin.workflows import Pipeline
+from maellin.tasks import Task
+
+PRODUCED = []
+
+
+def read_batches(n: int) -> Iterator[List[int]]:
+    for i in range(n):
+        PRODUCED.append(i)
+        yield [i] * 10
+
+
+def double(batches: Iterator[List[int]]) -> Iterator[List[int]]:
+    for batch in batches:
+        yield [x * 2 for x in batch]
+
+
+def total(batches: Iterator[List[int]]) -> int:
+    result = 0
+    for batch in batches:
+        time.sleep(0.001)
+        result += sum(batch)
+    return result
+
+
+def not_a_stream(batches: List[int]) -> int:
+    return sum(batches)
+
+
+def broken(n: int) -> Iterator[List[int]]:
+    yield [1]
+    raise RuntimeError('source failed')
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        PRODUCED.clear()
+
+    def test_pipelined_chain(self):
+        for type in ('default', 'multi-threading', 'asyncio'):
+            pipeline = Pipeline(
+                steps=[
+                    Task(read_batches, name='read', n=100, buffer_size=2),
+                    Task(double, depends_on=['read'], name='double', buffer_size=2),
+                    Task(total, depends_on=['double'], name='sink'),
+                ],
+                type=type
+            )
+            pipeline.run()
+            self.assertEqual(pipeline.steps[-1].result, sum(range(100)) * 20)
+
+    def test_backpressure(self):
+        stream = Stream(read_batches(1000), maxsize=4)
+        time.sleep(0.1)
+        # the producer is blocked by the bounded queue
+        self.assertLessEqual(len(PRODUCED), 6)
+        self.assertEqual(sum(len(batch) for batch in stream), 10000)
+
+    def test_errors_reach_the_consumer(self):
+        pipeline = Pipeline(
+            steps=[
+                Task(broken, name='read', n=1),
+                Task(total, depends_on=['read'], name='sink'),
+            ]
+        )
+        with self.assertRaises(RuntimeError):
+            pipeline.run()
+
+    def test_single_consumer(self):
+        stream = Stream(read_batches(3))
+        list(stream)
+        with self.assertRaises(StreamConsumedError):
+            iter(stream)
+
+    def test_closing_stops_the_producer(self):
+        before = threading.active_count()
+        stream = Stream(read_batches(1000), maxsize=1)
+        next(iter(stream))
+        stream.close()
+        time.sleep(0.3)
+        self.assertEqual(threading.active_count(), before)
+
+    def test_dump_after_a_streaming_run(self):
+        pipeline = Pipeline(
+            steps=[
+                Task(read_batches, name='read', n=3),
+                Task(total, depends_on=['read'], name='sink'),
+            ]
+        )
+        pipeline.run()
+        self.assertIsNone(pipeline.get_task_by_name('read').result)
+        self.assertIsInstance(pipeline.dumps(), bytes)
+
+    def test_resume_after_a_streaming_run(self):
+        for type in ('default', 'multi-threading', 'asyncio'):
+            pipeline = Pipeline(
+                steps=[
+                    Task(read_batches, name='read', n=3),
+                    Task(double, depends_on=['read'], name='double'),
+                    Task(total, depends_on=['double'], name='sink'),
+                ],
+                type=type
+            )
+            pipeline.run()
+            self.assertEqual(pipeline.get_stale_tasks('sink'), {tsk.tid for tsk in pipeline.steps})
+            pipeline.run(from_task='sink')
+            self.assertEqual(pipeline.get_task_by_name('sink').result, sum(range(3)) * 20)
+            pipeline.get_task_by_name('sink').update_status('Failed')
+            pipeline.run(resume=True)
+            self.assertEqual(pipeline.get_task_by_name('sink').result, sum(range(3)) * 20)
+
+    def test_validation_of_stream_types(self):
+        with self.assertRaises(CompatibilityException):
+            Pipeline(
+                steps=[
+                    Task(read_batches, name='read', n=1),
+                    Task(not_a_stream, depends_on=['read'], name='sink'),
+                ]
+            ).compose()
+
+
+if __name__ == '__main__':
+    unittest.main()
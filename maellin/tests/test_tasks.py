@@ -0,0 +1,101 @@
+import gc
+import os
+import tempfile
+import unittest
+
+from maellin.exceptions import CompatibilityException, MissingTypeHintException
+from maellin.tasks import _SIGNATURES, Task, signature_types
+from maellin.workflows import Pipeline
+
+
+def extract() -> int:
+    return 1
+
+
+def scale(x: int, factor: int = 2) -> int:
+    return x * factor
+
+
+def describe(x: str) -> str:
+    return x
+
+
+class TestSignatureCache(unittest.TestCase):
+
+    def test_tasks_share_introspection(self):
+        first = Task(scale, factor=3)
+        second = Task(scale, factor=4)
+        self.assertIs(signature_types(first.func), signature_types(second.func))
+        self.assertEqual(first.__input__(), [int, int])
+        self.assertEqual(first.__output__(), int)
+
+    def test_cache_is_weak(self):
+        def temporary(x: int) -> int:
+            return x
+
+        Task(temporary).validate(Task(extract))
+        self.assertIn(temporary, _SIGNATURES)
+        count = len(_SIGNATURES)
+        del temporary
+        gc.collect()
+        self.assertEqual(len(_SIGNATURES), count - 1)
+
+    def test_validation(self):
+        self.assertTrue(Task(scale).validate(Task(extract)))
+        with self.assertRaises(CompatibilityException):
+            Task(describe).validate(Task(extract))
+        with self.assertRaises(MissingTypeHintException):
+            Task(scale).validate(Task(lambda: 1))
+
+
+def busy(x: int) -> int:
+    return sum(i * i for i in range(1000)) + x
+
+
+class TestProfile(unittest.TestCase):
+
+    def test_disabled_by_default(self):
+        task = Task(extract)
+        task.run()
+        self.assertIsNone(task.profile_stats)
+
+    def test_profiles_are_aggregated(self):
+        task = Task(busy, profile=True)
+        task.run(1)
+        calls = task.profile_stats.total_calls
+        task.run(1)
+        self.assertEqual(task.profile_stats.total_calls, calls * 2)
+
+    def test_pipeline_setting(self):
+        for type in ('default', 'multi-processing'):
+            pipeline = Pipeline(
+                steps=[Task(extract, name='extract', profile=False), Task(busy, depends_on=['extract'], name='busy')],
+                type=type,
+                profile=True)
+            pipeline.run()
+            self.assertIsNone(pipeline.get_task_by_name('extract').profile_stats)
+            self.assertIsNotNone(pipeline.get_task_by_name('busy').profile_stats)
+            self.assertIn('(busy)', pipeline.profile_report(n=5))
+            with tempfile.TemporaryDirectory() as tmp:
+                paths = pipeline.dump_profiles(tmp)
+                self.assertEqual([os.path.basename(path) for path in paths], ['busy.pstats'])
+                self.assertTrue(os.path.getsize(paths[0]) > 0)
+
+    def test_pipeline_setting_is_resolved_per_run(self):
+        for type in ('default', 'multi-threading', 'multi-processing', 'asyncio'):
+            busy_task = Task(busy, depends_on=['extract'], name='busy')
+            pipeline = Pipeline(steps=[Task(extract, name='extract'), busy_task], type=type)
+            pipeline.run()
+            self.assertIsNone(busy_task.profile_stats)
+            pipeline.profile = True
+            pipeline.run()
+            calls = busy_task.profile_stats.total_calls
+            pipeline.profile = False
+            pipeline.run()
+            self.assertEqual(busy_task.profile_stats.total_calls, calls)
+            # the Task still inherits the setting of the Pipeline it runs in
+            self.assertIsNone(busy_task.profile)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import os
+import tempfile
+import unittest
+
+from maellin.exceptions import DuplicateNameError, NotFoundError, PlanFormatError
+from maellin.serialization import read_header
+from maellin.workflows import Pipeline
+from maellin.tasks import Task
+
+CALLS = []
+FAILING = set()
+
+
+def extract() -> int:
+    CALLS.append('extract')
+    return 10
+
+
+def transform(x: int) -> int:
+    CALLS.append('transform')
+    if 'transform' in FAILING:
+        raise RuntimeError('transform failed')
+    return x * 2
+
+
+def other(x: int) -> int:
+    CALLS.append('other')
+    return x + 1
+
+
+def load(x: int, y: int) -> int:
+    CALLS.append('load')
+    return x + y
+
+
+def scenario(**kwargs) -> Pipeline:
+    return Pipeline(
+        steps=[
+            Task(extract, name='extract'),
+            Task(transform, depends_on=['extract'], name='transform'),
+            Task(other, depends_on=['extract'], name='other'),
+            Task(load, depends_on=['transform', 'other'], name='load'),
+        ],
+        **kwargs
+    )
+
+
+class TestIncrementalRun(unittest.TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+        FAILING.clear()
+
+    def test_resume_after_failure(self):
+        for type in ('default', 'multi-threading'):
+            CALLS.clear()
+            FAILING.add('transform')
+            pipeline = scenario(type=type)
+            with self.assertRaises(Exception):
+                pipeline.run()
+
+            FAILING.clear()
+            CALLS.clear()
+            pipeline.run(resume=True)
+            self.assertNotIn('extract', CALLS)
+            self.assertEqual(CALLS[-1], 'load')
+            self.assertEqual(pipeline.steps[-1].result, 31)
+
+    def test_resume_without_previous_run_runs_everything(self):
+        pipeline = scenario()
+        pipeline.run(resume=True)
+        self.assertEqual(sorted(CALLS), ['extract', 'load', 'other', 'transform'])
+
+    def test_from_task_reuses_kept_results(self):
+        pipeline = scenario(release_results=True)
+        pipeline.run()
+        CALLS.clear()
+        pipeline.run(from_task='load')
+        self.assertEqual(sorted(CALLS), ['extract', 'load', 'other', 'transform'])
+        pipeline.get_task_by_name('other').keep_result = True
+        pipeline.get_task_by_name('transform').keep_result = True
+        pipeline.run()
+        CALLS.clear()
+        pipeline.run(from_task='load')
+        self.assertEqual(CALLS, ['load'])
+
+    def test_from_task(self):
+        pipeline = scenario()
+        pipeline.run()
+        CALLS.clear()
+        pipeline.run(from_task='other')
+        self.assertEqual(CALLS, ['other', 'load'])
+        self.assertEqual(pipeline.steps[-1].result, 31)
+
+
+class TestTaskIndex(unittest.TestCase):
+
+    def test_lookup_by_name_and_tid(self):
+        pipeline = scenario()
+        pipeline.compose()
+        task = pipeline.get_task_by_name('transform')
+        self.assertIs(pipeline.get_task_by_tid(task.tid), task)
+        with self.assertRaises(NotFoundError):
+            pipeline.get_task_by_name('missing')
+
+    def test_duplicate_names_are_rejected(self):
+        pipeline = Pipeline(
+            steps=[
+                Task(extract, name='extract'),
+                Task(transform, depends_on=['extract'], name='extract'),
+            ]
+        )
+        with self.assertRaises(DuplicateNameError):
+            pipeline.compose()
+
+    def test_merged_pipelines_are_indexed(self):
+        inner = scenario()
+        outer = Pipeline(steps=[inner, Task(other, depends_on=['load'], name='report')])
+        outer.compose()
+        self.assertIs(outer.get_task_by_name('extract'), inner.get_task_by_name('extract'))
+        self.assertIs(outer.get_task_by_name('report').depends_on[0], inner.get_task_by_name('load'))
+
+    def test_load_rebuilds_indexes(self):
+        pipeline = scenario()
+        pipeline.compose()
+        fd, filename = tempfile.mkstemp(suffix='.pkl')
+        os.close(fd)
+        self.addCleanup(os.remove, filename)
+        pipeline.dump(filename)
+
+        loaded = Pipeline().load(filename)
+        self.assertEqual(loaded.get_task_by_name('load').tid, pipeline.get_task_by_name('load').tid)
+
+
+class TestPlanSerialization(unittest.TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_round_trip_without_results(self):
+        pipeline = scenario(type='multi-threading', workers=2)
+        pipeline.run()
+        loaded = Pipeline().loads_plan(pipeline.dumps_plan())
+
+        self.assertEqual((loaded.type, loaded.workers), ('multi-threading', 2))
+        self.assertEqual(list(loaded.dag.nodes), list(pipeline.dag.nodes))
+        self.assertEqual(sorted(loaded.dag.edges(keys=True)), sorted(pipeline.dag.edges(keys=True)))
+        task = loaded.get_task_by_name('load')
+        self.assertIsNone(task.result)
+        self.assertEqual(task.status, 'Not Started')
+        self.assertEqual([dep.name for dep in task.depends_on], ['transform', 'other'])
+        self.assertIs(task.depends_on[0], loaded.get_task_by_name('transform'))
+
+        loaded.run()
+        self.assertEqual(task.result, 31)
+
+    def test_header_and_compression(self):
+        pipeline = scenario()
+        data = pipeline.dumps_plan(compression='zlib')
+        header = read_header(data)
+        self.assertEqual((header.version, header.compression), (1, 'zlib'))
+        loaded = Pipeline().loads_plan(data)
+        self.assertEqual(loaded.get_task_by_name('load').tid, pipeline.get_task_by_name('load').tid)
+        with self.assertRaises(ValueError):
+            pipeline.dumps_plan(compression='brotli')
+
+    def test_invalid_plans_are_rejected(self):
+        data = scenario().dumps_plan()
+        with self.assertRaises(PlanFormatError):
+            Pipeline().loads_plan(data[:-1])
+        with self.assertRaises(PlanFormatError):
+            Pipeline().loads_plan(data[:-1] + bytes([data[-1] ^ 1]))
+        with self.assertRaises(PlanFormatError):
+            Pipeline().loads_plan(scenario().dumps())
+
+    def test_dumps_round_trip(self):
+        pipeline = scenario()
+        pipeline.compose()
+        loaded = Pipeline().loads(pipeline.dumps())
+        self.assertEqual(loaded.get_task_by_name('load').tid, pipeline.get_task_by_name('load').tid)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,7 @@
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import sys
 from typing import Any, Tuple, Callable
 from functools import partial, update_wrapper
 from uuid import NAMESPACE_OID, uuid4, uuid5
@@ -63,3 +64,27 @@ def wrapped_partial(func, *args, **kwargs) -> Callable:
     partial_func = partial(func, *args, **kwargs)
     update_wrapper(partial_func, func)
     return partial_func
+
+
+def get_size(obj: Any) -> int:
+    """Estimates the memory held by a task result in bytes. DataFrames and Series
+    report their deep memory usage, arrays their buffer size and everything else
+    falls back to sys.getsizeof
+
+    Args:
+        obj (Any): Any python object
+
+    Returns:
+        int: size of the object in bytes
+    """
+    if obj is None:
+        return 0
+    if hasattr(obj, 'memory_usage'):
+        try:
+            usage = obj.memory_usage(deep=True)
+            return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+        except TypeError:
+            pass
+    if hasattr(obj, 'nbytes'):
+        return int(obj.nbytes)
+    return sys.getsizeof(obj)
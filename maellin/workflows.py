@@ -13,18 +13,25 @@
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Any, List, Literal, Tuple
+import os
+from typing import Any, Dict, Iterator, List, Literal, Set, Tuple, Union
 
 import cloudpickle as cpickle
 
-from maellin.exceptions import DependencyError, NotFoundError
-from maellin.executors.default import DefaultExecutor
+from maellin.cache import TaskCache
+from maellin.exceptions import CompatibilityException, DependencyError, DuplicateNameError, NotFoundError
+from maellin.executors.factory import ExecutorFactory
+from maellin.executors.trace import TraceRecorder
 from maellin.graphs import DAG
 from maellin.logger import LoggingMixin
 from maellin.queues import QueueFactory
-from maellin.scheduler import DefaultScheduler
+from maellin.runs import RunContext
+from maellin.serialization import dumps_plan, loads_plan
 from maellin.tasks import Task, create_task
 
+# Pipeline types whose runs cannot be moved to another executor
+PINNED_TYPES = ('asyncio', 'multi-processing')
+
 
 class Pipeline(DAG, LoggingMixin):
     """A Directed Acyclic MultiGraph based Pipeline for Data Processing. """
@@ -34,16 +41,42 @@ class Pipeline(DAG, LoggingMixin):
     def __init__(
             self,
             steps: List[Task] = [],
-            type: Literal['default', 'asyncio', 'multi-threading', 'multi-processing'] = 'default'):
+            type: Literal['default', 'asyncio', 'multi-threading', 'multi-processing', 'shared'] = 'default',
+            workers: int = None,
+            release_results: bool = False,
+            cache: TaskCache = None,
+            schedule: Literal['fifo', 'critical-path'] = 'fifo',
+            profile: bool = False):
 
         Pipeline.pipeline_id += 1
         super().__init__()
         self.pid = Pipeline.pipeline_id
         self.steps = [step if isinstance(step, Pipeline) else create_task(step) for step in steps]
+        self._step_tids = {step.tid for step in self.steps if not isinstance(step, Pipeline)}
+        self._tasks_by_name: Dict[str, Task] = {}
+        self._tasks_by_tid: Dict[str, Task] = {}
         self.type = type
+        self.workers = workers
+        self.release_results = release_results
+        self.cache = cache
+        self.schedule = schedule
+        self.profile = profile
+        self.peak_result_bytes = 0
+        self.last_run_stats = None
+        self._released = set()
         self._log = self.logger
-        self.queue = QueueFactory.factory(type=type)
-        self.sched = DefaultScheduler()
+        self.queue = QueueFactory.factory(type=self._queue_type())
+        self._sched = None
+
+    def _queue_type(self) -> str:
+        """Returns the queue type used to hold Tasks in this process. Tasks for a
+        process pool are collected locally and shipped to workers with cloudpickle,
+        so the results land on the Tasks of this Pipeline. The asyncio and shared
+        executors schedule Tasks themselves and read them from a regular queue as well.
+        """
+        if self.type in ('multi-processing', 'asyncio', 'shared'):
+            return 'default'
+        return self.type
 
     def _merge_dags(self, pipeline: "Pipeline") -> None:
         """Allow a Pipeline object to receive an other Pipeline object \
@@ -53,6 +86,38 @@ class Pipeline(DAG, LoggingMixin):
         G = pipeline.dag
         self.dag = self.merge(G, self.dag)
         self.repair_attributes(G, self.dag, 'tasks')
+        for task in pipeline._tasks_by_tid.values():
+            self._index_task(task)
+
+    def _index_task(self, task: Task) -> None:
+        """Adds a Task to the name and tid indexes of the Pipeline
+
+        Raises:
+            DuplicateNameError: if a different Task with the same name was already added
+        """
+        if task.name is not None:
+            other = self._tasks_by_name.setdefault(task.name, task)
+            if other.tid != task.tid:
+                raise DuplicateNameError(f'Task name {task.name} is used by more than one Task, names must be unique')
+        self._tasks_by_tid[task.tid] = task
+
+    def _reindex(self) -> None:
+        """Rebuilds the name and tid indexes from the Tasks in the DAG"""
+        self._tasks_by_name = {}
+        self._tasks_by_tid = {}
+        for tsk_attrs in self.get_all_attributes(name='tasks'):
+            if tsk_attrs is not None:
+                for tsk in tsk_attrs.values():
+                    self._index_task(tsk)
+
+    def add_node_to_dag(self, task: Task = None, properties: Dict = None) -> None:
+        """Adds a new Node to the DAG and indexes its Task by name and tid, see DAG.add_node_to_dag
+
+        Raises:
+            DuplicateNameError: if a different Task with the same name was already added
+        """
+        self._index_task(task)
+        super().add_node_to_dag(task, properties)
 
     def _proc_pipeline_dep(self, idx, task, dep):
         """Process Dependencies that contain another Pipeline
@@ -78,11 +143,12 @@ class Pipeline(DAG, LoggingMixin):
 
     def _proc_named_dep(self, idx: int, task: Task, dep: str, input_pipe: "Pipeline"):
         """Process Dependencies that contain a reference to another task"""
-        # this is very ugly and needs to be refactored
-        try:
-            dep_task = self.get_task_by_name(name=dep)
-            dag = self.dag
-        except BaseException:
+        # Lookup dependent task from the current pipeline or the calling pipeline
+        dep_task = self._tasks_by_name.get(dep)
+        dag = self.dag
+        if dep_task is None:
+            if input_pipe is None:
+                raise NotFoundError(f"{dep} was not found in the DAG")
             dep_task = input_pipe.get_task_by_name(name=dep)
             dag = input_pipe.dag
 
@@ -91,7 +157,7 @@ class Pipeline(DAG, LoggingMixin):
         # Validate task is compatible with the dependency
         if not task.skip_validation:
             task.validate(dep_task)
-            self._log.info('Validation Check Complete for %s & %s' % (task.name, dep_task.name))
+            self._log.info('Validation Check Complete for %s & %s', task.name, dep_task.name)
 
         # Lookup dependent task from the current pipeline or the called pipeline
         if dag.nodes[dep_task.tid].get('tasks', None) is not None:
@@ -115,9 +181,8 @@ class Pipeline(DAG, LoggingMixin):
             pipe = input_pipe
         if pipe.dag.nodes[dep.tid].get('tasks', None) is not None:
             for k in pipe.dag.nodes[dep.tid]['tasks'].keys():
-                for tsk in pipe.steps:
-                    if k == tsk.tid:
-                        task.related.append(k)
+                if k in pipe._step_tids:
+                    task.related.append(k)
         else:
             raise DependencyError(f'{dep} was not found in {self.__name__}, check pipeline steps.')
 
@@ -156,12 +221,11 @@ class Pipeline(DAG, LoggingMixin):
             cpickle.dump(obj=self.dag, file=f, protocol=protocol)
         return self
 
-    def dumps(self, protocol: str = None):
+    def dumps(self, protocol: str = None) -> bytes:
         """Serializes a DAG using cloudpickle"""
         import maellin
         cpickle.register_pickle_by_value(module=maellin)
-        pkl_dag = str(cpickle.dumps(obj=self.dag, protocol=protocol)).encode('utf-8')
-        return pkl_dag
+        return cpickle.dumps(obj=self.dag, protocol=protocol)
 
     def load(self, filename: str):
         """loads a DAG to a pipeline instance
@@ -179,26 +243,67 @@ class Pipeline(DAG, LoggingMixin):
         with open(filename, 'rb') as f:
             dag = cpickle.load(f, encoding='bytes')
             self.dag = dag
+        self._reindex()
         return self
 
-    def loads(self, filename: str):
-        """loads a DAG to a pipeline instance
+    def loads(self, data: bytes):
+        """loads a DAG serialized with dumps to a pipeline instance
 
         Args:
-            filename (str): filename of the pickled DAG
+            data (bytes): the pickled DAG
 
         Usage:
-        >>> filename = 'my_dag.pkl' # filename to pickled dag file
+        >>> data = pipe.dumps() # serialize the DAG
         >>> new_pipe = Pipeline() # create new pipeline instance
-        >>> new_pipe.load(filename) # load the dag to the pipeline instance
+        >>> new_pipe.loads(data) # load the dag to the pipeline instance
         >>> new_pipe.run() # run the pipeline
         """
+        self.dag = cpickle.loads(data)
+        self._reindex()
+        return self
 
-        with open(filename, 'rb') as f:
-            dag = cpickle.loads(f)
-            self.dag = dag
+    def dump_plan(self, filename: str, compression: str = None):
+        """Saves the execution plan of the Pipeline: its settings, the structure of the DAG
+        and every Task with its callable and kwargs. Unlike dump, results and other run
+        state are not stored. The file starts with a versioned header and a checksum
+        that are validated before the plan is unpickled.
+
+        Args:
+            filename (str): name of file to write the plan to
+            compression (str, optional): "zlib", "zstd" or "lz4", zstd and lz4 require
+                the zstandard and lz4 packages. Defaults to None.
+
+        Usage:
+        >>> pipe = Pipeline(steps=my_steps) # create new pipeline instance with steps
+        >>> pipe.dump_plan('my_dag.plan', compression='zstd') # save the plan
+        >>> Pipeline().load_plan('my_dag.plan').run() # load and run it
+        """
+        with open(filename, 'wb') as f:
+            f.write(self.dumps_plan(compression))
         return self
 
+    def dumps_plan(self, compression: str = None) -> bytes:
+        """Serializes the execution plan of the Pipeline, see dump_plan"""
+        if self.is_empty():
+            self.compose()
+        return dumps_plan(self, compression)
+
+    def load_plan(self, filename: str):
+        """Loads an execution plan saved with dump_plan, replacing the DAG and settings
+
+        Args:
+            filename (str): filename of the plan
+
+        Raises:
+            PlanFormatError: if the file is not a valid plan
+        """
+        with open(filename, 'rb') as f:
+            return self.loads_plan(f.read())
+
+    def loads_plan(self, data: bytes):
+        """Loads an execution plan serialized with dumps_plan, see load_plan"""
+        return loads_plan(self, data)
+
     def print_plan(self):
         """Pretty Prints the DAG in Queue Processing Order"""
 
@@ -220,18 +325,34 @@ class Pipeline(DAG, LoggingMixin):
         Returns:
             Task: The task that matches the name parameter.
         """
-        for tsk_attrs in self.get_all_attributes(name='tasks'):
-            if tsk_attrs is not None:
-                for tsk in tsk_attrs.values():
-                    if tsk.name == name:
-                        return tsk
+        try:
+            return self._tasks_by_name[name]
+        except KeyError:
+            raise NotFoundError(f"{name} was not found in the DAG") from None
 
-        raise NotFoundError(f"{name} was not found in the DAG")
+    def get_task_by_tid(self, tid: str) -> Task:
+        """Retrieves an Task from the DAG using its id
+
+        Args:
+            tid (str): The unique id of the Task
+
+        Raises:
+            NotFoundError: Complains if the task could not be found
+
+        Returns:
+            Task: The task that matches the tid parameter.
+        """
+        try:
+            return self._tasks_by_tid[tid]
+        except KeyError:
+            raise NotFoundError(f"{tid} was not found in the DAG") from None
 
     def compose(self, input_pipe: "Pipeline" = None) -> None:
         """
         Compose the DAG from steps provided to the pipeline
         """
+        self._step_tids = {task.tid for task in self.steps if not isinstance(task, Pipeline)}
+
         # For each task found in steps
         for task in self.steps:
             # Process the task with a special call if it is a Pipeline Instance
@@ -264,42 +385,311 @@ class Pipeline(DAG, LoggingMixin):
         # Validates DAG was constructed properly
         self._validate_dag()
 
-    def collect(self) -> None:
-        """Enqueues all Tasks from the constructed DAG in topological sort order
+    def _sorted_tasks(self, tids: Set[str] = None) -> Iterator[Task]:
+        """Yields the Tasks of the constructed DAG in topological sort order
+
+        Args:
+            tids (Set[str], optional): only yield Tasks with these ids. Defaults to None.
         """
         # Compile steps into the DAG if not already compiled
         if self.is_empty():
             self.compose()
 
-        self.queue = QueueFactory.factory(self.type)
-        # Begin Enqueuing all Tasks in the DAG
         nodes = self.get_all_nodes()
         # Get Topological sort of Task Nodes by Id
         for task_node_id in self.topological_sort():
+            if tids is not None and task_node_id not in tids:
+                continue
             # Lookup each task in a node
-            n_attrs = nodes[task_node_id]
-            # Enqueue Tasks & update status
-            for v in n_attrs['tasks'].values():
-                self.queue.put(v)
-                v.update_status('Queued')
-
-    def run(self) -> Any:
-        """Allows for Local Execution of a Pipeline Instance. Good for Debugging
-        for advanced features and concurrency support use submit"""
-        self.result_queue = QueueFactory.factory(self.type)
-        # If Queue is empty, populate it
-        if self.queue.empty():
-            self.collect()
-
-        # Setup Default Executor
-        executor = DefaultExecutor(
-            task_queue=self.queue,
-            result_queue=self.result_queue)
+            for v in nodes[task_node_id]['tasks'].values():
+                yield v
+
+    def collect(self, tids: Set[str] = None) -> None:
+        """Enqueues all Tasks from the constructed DAG in topological sort order.
+        Runs collect their Tasks in a queue of their own, see RunContext.
+
+        Args:
+            tids (Set[str], optional): only enqueue Tasks with these ids. Defaults to None.
+        """
+        self.queue = QueueFactory.factory(self._queue_type())
+        for v in self._sorted_tasks(tids):
+            self.queue.put(v)
+            v.update_status('Queued')
+
+    def get_priorities(self) -> Dict[str, float]:
+        """Computes the priority used to dispatch ready Tasks. With the "critical-path"
+        schedule a Task is prioritized by the estimated cost of the longest chain of
+        Tasks that can only start after it, see Task.estimate_cost. Ready Tasks are
+        dispatched in the order they became ready with the "fifo" schedule.
+
+        Returns:
+            Dict[str, float]: the priority of each Task by id, empty for "fifo"
+        """
+        if self.schedule == 'fifo':
+            return {}
+        elif self.schedule == 'critical-path':
+            costs = {}
+            for tsk_attrs in self.get_all_attributes(name='tasks'):
+                if tsk_attrs is not None:
+                    for tid, tsk in tsk_attrs.items():
+                        costs[tid] = tsk.estimate_cost()
+            return self.get_critical_paths(costs)
+        else:
+            raise ValueError(self.schedule)
+
+    def get_stale_tasks(self, from_task: Union[str, Task] = None) -> Set[str]:
+        """Computes the Tasks that need to run again to bring the Pipeline up to date.
+        A Task is stale if it did not complete, if it is downstream of a stale Task or
+        if a stale Task needs a result that was released after the previous run or a Stream.
+
+        Args:
+            from_task (str | Task, optional): a Task, or its name, to rerun
+                together with everything downstream of it. Defaults to None.
+
+        Returns:
+            Set[str]: the ids of the stale Tasks
+        """
+        if self.is_empty():
+            self.compose()
+
+        stale = set()
+        for tsk_attrs in self.get_all_attributes(name='tasks'):
+            if tsk_attrs is not None:
+                for tid, tsk in tsk_attrs.items():
+                    if tsk.status != 'Completed':
+                        stale.add(tid)
+
+        if from_task is not None:
+            if isinstance(from_task, str):
+                from_task = self.get_task_by_name(from_task)
+            stale.add(from_task.tid)
+
+        # Everything downstream of a stale Task is stale as well
+        for tid in list(stale):
+            stale |= self.get_descendants(tid)
+
+        # Released results and Streams, which are consumed once, needed by stale Tasks
+        # have to be computed again
+        def is_gone(tid: str) -> bool:
+            return tid in self._released or self._tasks_by_tid[tid].is_generator()
+
+        needed = {p for tid in stale for p in self.get_predecessors(tid) if is_gone(p)} - stale
+        while needed:
+            stale |= needed
+            needed = {p for tid in needed for p in self.get_predecessors(tid) if is_gone(p)} - stale
+        return stale
+
+    def _prepare(self, resume: bool, from_task: Union[str, Task]) -> RunContext:
+        """Creates the context of a run and enqueues the Tasks it runs. The results
+        of completed Tasks reused by the run are added to its result store.
+
+        Returns:
+            RunContext: the state of the new run
+        """
+        context = RunContext(
+            queue_type=self._queue_type(), release_results=self.release_results, cache=self.cache,
+            profile=self.profile)
+        if not resume and from_task is None:
+            for tsk in self._sorted_tasks():
+                context.enqueue(tsk)
+            return context
+
+        stale = self.get_stale_tasks(from_task)
+        for tsk in self._sorted_tasks(stale):
+            context.enqueue(tsk)
+        reused = {p for tid in stale for p in self.get_predecessors(tid)} - stale
+        self._log.info('Resuming Execution of %s Tasks, reusing %s Results', len(stale), len(reused))
+        for tid in reused:
+            for tsk in self.dag.nodes[tid]['tasks'].values():
+                context.add(tsk, status='Completed')
+                context.results.put(tsk, tsk.result)
+        return context
+
+    def check_executor(self, executor: str = None) -> None:
+        """Checks that the Pipeline can run on an executor type other than its own
+
+        Raises:
+            CompatibilityException: if the executor of an 'asyncio' or 'multi-processing'
+                Pipeline is overridden
+        """
+        if executor is not None and executor != self.type and self.type in PINNED_TYPES:
+            # coroutine Tasks need an event loop and process Tasks may hold the GIL
+            raise CompatibilityException(
+                f'{self.type} Pipelines run on the {self.type} executor, cannot run on {executor}')
+
+    def run(
+            self,
+            resume: bool = False,
+            from_task: Union[str, Task] = None,
+            trace: str = None,
+            executor: str = None) -> RunContext:
+        """Allows for Local Execution of a Pipeline Instance. The executor is chosen
+        by the Pipeline type, use type='multi-threading' or 'multi-processing' to run
+        independent branches of the DAG concurrently on up to `workers` threads or processes.
+        Use type='shared' to run the Tasks on the worker pool shared by every Pipeline of
+        the process, see ExecutionService.
+        Use schedule='critical-path' to start the longest chains of Tasks first when there
+        are more ready Tasks than workers.
+
+        Every run keeps the status and result of its Tasks in a RunContext of its own,
+        so the same Pipeline can run several times at once, e.g. scheduled with
+        max_instances > 1. The Tasks are updated when a run ends.
+
+        Args:
+            resume (bool, optional): only run Tasks that did not complete in a previous run
+                and everything downstream of them. Defaults to False.
+            from_task (str | Task, optional): rerun a Task, or the Task with this name,
+                and everything downstream of it. Defaults to None.
+            trace (str, optional): writes a Chrome trace of the run to this file, open
+                it in Perfetto to see which worker ran which Task when. Defaults to None.
+            executor (str, optional): executor type used for this run instead of the
+                Pipeline type, 'asyncio' and 'multi-processing' Pipelines cannot be run
+                on another executor. Defaults to None.
+
+        Returns:
+            RunContext: the run id, statuses and results of the run
+
+        Raises:
+            CompatibilityException: if the executor of an 'asyncio' or 'multi-processing'
+                Pipeline is overridden
+
+        Usage:
+        >>> pipe.run() # fails half way through
+        >>> pipe.run(resume=True) # reruns the failed tasks and their dependents
+        >>> pipe.run(from_task='transf_film') # reruns transf_film and its dependents
+        >>> pipe.last_run_stats.slowest(5) # the Tasks that took the longest in the last run
+        >>> pipe.run(trace='run.trace.json') # open in ui.perfetto.dev
+        """
+        self.check_executor(executor)
+        context = self._prepare(resume, from_task)
+
+        # Setup the Executor matching the Pipeline type
+        executor = ExecutorFactory.factory(
+            type=executor or self.type,
+            task_queue=context.task_queue,
+            result_queue=context.result_queue,
+            dag=self,
+            workers=self.workers,
+            release_results=self.release_results,
+            priorities=self.get_priorities(),
+            context=context)
 
         # Start execution of Tasks
-        self._log.info('Starting Execution')
-        executor.start()
-        executor.shutdown()
+        self._log.info('Starting Execution of Run %s', context.run_id)
+        try:
+            executor.start()
+        finally:
+            self._report_results(executor, trace)
+            executor.shutdown()
+        return context
+
+    async def arun(self, resume: bool = False, from_task: Union[str, Task] = None, trace: str = None) -> RunContext:
+        """Executes the Pipeline on the running event loop. Coroutine Tasks are awaited
+        concurrently with at most `workers` Tasks in flight, synchronous Tasks are
+        offloaded to threads. Accepts the same arguments as run.
+
+        Usage:
+        >>> pipe = Pipeline(steps=my_steps, workers=20) # create new pipeline instance with steps
+        >>> await pipe.arun() # run the pipeline inside of a coroutine
+        """
+        from maellin.executors.asynchronous import AsyncioExecutor
+
+        context = self._prepare(resume, from_task)
+
+        executor = AsyncioExecutor(
+            task_queue=context.task_queue,
+            result_queue=context.result_queue,
+            dag=self,
+            workers=self.workers,
+            release_results=self.release_results,
+            priorities=self.get_priorities(),
+            context=context)
+
+        # Start execution of Tasks
+        self._log.info('Starting Execution of Run %s', context.run_id)
+        try:
+            await executor.astart()
+        finally:
+            self._report_results(executor, trace)
+            executor.shutdown()
+        return context
+
+    def _report_results(self, executor, trace: str = None) -> None:
+        """Publishes the outcome of the run to its Tasks, records the peak memory held by
+        task results during the last run, which results were released and the metrics of
+        every Task in last_run_stats. Writes the trace of the run when a file is given."""
+        executor.context.publish()
+        executor.stats.close()
+        self.last_run_stats = executor.stats
+        if trace is not None:
+            TraceRecorder(f'Pipeline {self.pid}').dump(executor.stats, trace, plan=self.compile())
+        self.peak_result_bytes = executor.results.peak_bytes
+        self._released = (self._released - {tsk.tid for tsk in executor.results}) | executor.results.released
+        self._log.info('Peak Retained Result Bytes %s', self.peak_result_bytes)
+
+    def _profiled_tasks(self) -> List[Task]:
+        return [tsk for tsk in self._tasks_by_tid.values() if getattr(tsk, 'profile_stats', None) is not None]
+
+    def profile_report(self, n: int = 20, sort: str = 'cumulative') -> str:
+        """Merges the profiles of all profiled Tasks and reports the top functions.
+        Use Task(profile=True) to profile a single Task or Pipeline(profile=True)
+        to profile every Task that does not opt out with profile=False.
+
+        Args:
+            n (int, optional): number of functions to report. Defaults to 20.
+            sort (str, optional): pstats sort key. Defaults to 'cumulative'.
+
+        Returns:
+            str: the pstats report, empty when no Task was profiled
+
+        Usage:
+        >>> pipe = Pipeline(steps=my_steps, profile=True)
+        >>> pipe.run()
+        >>> print(pipe.profile_report(n=10, sort='tottime'))
+        """
+        import io
+        import pstats
+
+        tasks = self._profiled_tasks()
+        if not tasks:
+            return ''
+        report = io.StringIO()
+        merged = pstats.Stats(stream=report)
+        for tsk in tasks:
+            merged.add(tsk.profile_stats)
+        merged.sort_stats(sort).print_stats(n)
+        return report.getvalue()
+
+    def dump_profiles(self, directory: str) -> List[str]:
+        """Writes the profile of every profiled Task to a <task name>.pstats file,
+        load them with pstats.Stats or a viewer such as snakeviz
+
+        Args:
+            directory (str): directory to write the files to, created when missing
+
+        Returns:
+            List[str]: paths of the files written
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for tsk in self._profiled_tasks():
+            path = os.path.join(directory, f'{tsk.name or tsk.tid}.pstats')
+            tsk.profile_stats.dump_stats(path)
+            paths.append(path)
+        return paths
+
+    @property
+    def sched(self):
+        """Scheduler that runs submitted DAGs, created on first use so apscheduler
+        is only imported by Pipelines that are scheduled"""
+        if self._sched is None:
+            from maellin.scheduler import DefaultScheduler
+            self._sched = DefaultScheduler()
+        return self._sched
+
+    @sched.setter
+    def sched(self, scheduler) -> None:
+        self._sched = scheduler
 
     def submit(
             self,
@@ -307,14 +697,20 @@ class Pipeline(DAG, LoggingMixin):
             trigger='interval',
             minutes=1,
             max_instances=1,
-            replace_existing=True) -> str:
-        """Submits DAG to the Scheduler"""
+            replace_existing=True,
+            executor: str = None) -> str:
+        """Submits DAG to the Scheduler. Scheduled runs use the executor of the Pipeline
+        type, pass executor='shared' to run the Tasks on the worker pool shared by all
+        Pipelines of the process so concurrent runs do not oversubscribe the machine."""
+
+        from apscheduler.schedulers.base import STATE_STOPPED
 
-        if self.sched.state == 0:
+        if self.sched.state == STATE_STOPPED:
             self.sched.start()
 
         self.sched.add_job(
             func=self.run,
+            kwargs={'executor': executor},
             name=name,
             trigger=trigger,
             replace_existing=replace_existing,
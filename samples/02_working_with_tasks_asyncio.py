@@ -2,7 +2,11 @@ import time
 import asyncio
 
 from maellin.tasks import Task
-from maellin.queues import QueueFactory
+from maellin.workflows import Pipeline
+
+
+def setup() -> None:
+    print('I am setup and I run before everything else...')
 
 
 async def foo():
@@ -15,47 +19,21 @@ async def bar():
     await asyncio.sleep(0.1)
 
 
-async def async_worker(queue):
-
-    while not queue.empty():
-        start_time = time.time()
-        _tsk = await queue.get()
-        print(f'Worker pulled \'{_tsk.func.__name__}\' from the Queue...')
-
-        print('Running Task...')
-        await _tsk.run()
-
-        queue.task_done()
-        print('Task Completed in %2f seconds' % (time.time() - start_time))
-
-
 async def main():
     start_time = time.time()
-    # Instantiate some Tasks for use to enqueue
-    tsk_1 = Task(foo)
-    tsk_2 = Task(bar)
-
-    # Instantiate a queue using our Queue Factory
-    q = QueueFactory.factory('asyncio')
 
+    # Coroutine functions can be used as Tasks just like regular functions.
+    # Every fetch depends on the setup Task so they are all part of one DAG.
+    steps = [Task(setup, name='setup')]
     for i in range(100):
-        q.put_nowait(tsk_1)
-        q.put_nowait(tsk_2)
-
-    # q.put_nowait(tsk_1)
-    # q.put_nowait(tsk_2)
-
-    # create an asyncio task that creates two workers to process the queue concurrently.
-    async_tasks = []
-    for i in range(20):
-        task = asyncio.create_task(async_worker(q))
-        async_tasks.append(task)
+        steps.append(Task(foo, depends_on=['setup'], name=f'foo_{i}'))
+        steps.append(Task(bar, depends_on=['setup'], name=f'bar_{i}'))
 
-    await q.join()
+    # The asyncio executor awaits ready Tasks concurrently on the running event loop,
+    # workers limits how many Tasks are in flight at once.
+    pipeline = Pipeline(steps=steps, type='asyncio', workers=20)
+    await pipeline.arun()
 
-    # Cancel our worker tasks when the queue is empty.
-    for task in async_tasks:
-        task.cancel()
     print('Asynchronous Pipeline Processed in %2f seconds' % (time.time() - start_time))
 
 if __name__ == '__main__':
@@ -0,0 +1,88 @@
+"""Measures the startup of the maellin command with -X importtime.
+The eager row imports what maellin.workflows used to pull in, the
+CLI only imports the modules a command needs. Exits with status 1
+when a command goes over its import budget.
+
+Usage: python tools/benchmarks/bench_cli_startup.py [repeats]
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from harness import run
+
+# milliseconds of cumulative import time including the ~15 ms of interpreter
+# startup, run needs networkx for the DAG which alone takes ~100 ms
+BUDGETS_MS = {
+    'maellin --version': 60,
+    'maellin plan': 100,
+    'maellin run': 250,
+}
+EAGER = (
+    'import maellin.workflows, maellin.scheduler, maellin.executors.asynchronous, '
+    'maellin.executors.processes, logging.handlers')
+
+
+def extract() -> int:
+    return 1
+
+
+def transform(x: int) -> int:
+    return x + 1
+
+
+def import_time(args) -> float:
+    """Runs python -X importtime and sums the cumulative time of the top level imports in ms"""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args], capture_output=True, text=True, check=True)
+    total = 0
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not name[1:].startswith(' '):
+            total += int(cumulative)
+    return total / 1e3
+
+
+def wall_time(args) -> float:
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable, *args], capture_output=True, check=True)
+    return (time.perf_counter() - start_time) * 1e3
+
+
+def main(repeats: int = 5) -> bool:
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'etl.plan')
+        steps = [Task(extract, name='extract')]
+        steps += [Task(transform, depends_on=['extract'], name=f'transform_{i}') for i in range(8)]
+        Pipeline(steps=steps).dump_plan(path)
+
+        commands = {
+            'eager imports': ['-c', EAGER],
+            'maellin --version': ['-m', 'maellin', '--version'],
+            'maellin plan': ['-m', 'maellin', 'plan', path],
+            'maellin run': ['-m', 'maellin', 'run', path, '--log-level', 'WARNING'],
+        }
+        within_budget = True
+        print(f'{"command":<18} {"imports":>9} {"wall":>9} {"budget":>8}')
+        for label, args in commands.items():
+            imports = min(import_time(args) for _ in range(repeats))
+            wall = min(wall_time(args) for _ in range(repeats))
+            budget = BUDGETS_MS.get(label)
+            status = '' if budget is None else f'{budget:5d} ms' + (' OVER' if imports > budget else '')
+            within_budget &= budget is None or imports <= budget
+            print(f'{label:<18} {imports:6.1f} ms {wall:6.1f} ms {status:>8}')
+    return within_budget
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(main) else 1)
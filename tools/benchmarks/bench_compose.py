@@ -0,0 +1,91 @@
+"""Measures composing a Pipeline into a DAG and collecting its Tasks.
+The legacy composer copies the node list of the graph on every
+inserted node and scans all steps for every dependency, making
+compose quadratic. The current composer checks membership on the
+graph and collects Tasks in the order of the compiled plan.
+The legacy composer is only timed up to 5000 Tasks.
+
+Usage: python tools/benchmarks/bench_compose.py [n_tasks]
+"""
+
+import logging
+import time
+
+from networkx import topological_sort
+
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from harness import run
+
+
+def start() -> int:
+    return 0
+
+
+def increment(x: int) -> int:
+    return x + 1
+
+
+class LegacyPipeline(Pipeline):
+    """Pipeline using the original linear scans while composing"""
+
+    def add_node_to_dag(self, task, properties=None):
+        if task.tid in list(self.dag.nodes):
+            existing = dict(self.dag.nodes(data='tasks')).get(task.tid, None)
+            if existing is not None:
+                existing.update({task.tid: task})
+                return
+        self.dag.add_nodes_from([(task.tid, {"id": task.tid, "tasks": {task.tid: task}, "properties": properties})])
+
+    def _proc_task_dep(self, task, dep, input_pipe):
+        pipe = self
+        if dep.tid not in self.dag:
+            pipe = input_pipe
+        for k in pipe.dag.nodes[dep.tid]['tasks'].keys():
+            for tsk in pipe.steps:
+                if k == tsk.tid:
+                    task.related.append(k)
+        return (task, dep)
+
+    def topological_sort(self):
+        return list(topological_sort(G=self.dag))
+
+
+def build_steps(n_tasks: int):
+    """A chain of n_tasks / 2 Tasks, each with a leaf Task hanging off it"""
+    steps = [Task(start, name='task_0', skip_validation=True)]
+    chain = steps[0]
+    while len(steps) < n_tasks:
+        chain = Task(increment, depends_on=[chain], name=f'task_{len(steps)}', skip_validation=True)
+        steps.append(chain)
+        steps.append(Task(increment, depends_on=[chain], name=f'task_{len(steps)}', skip_validation=True))
+    return steps
+
+
+def time_pipeline(pipeline_cls, n_tasks: int):
+    pipeline = pipeline_cls(steps=build_steps(n_tasks))
+    start_time = time.perf_counter()
+    pipeline.compose()
+    composed = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    pipeline.collect()
+    collected = time.perf_counter() - start_time
+    assert pipeline.queue.qsize() == len(pipeline.steps)
+    return composed, collected
+
+
+def main(n_tasks: int = 10000):
+    logging.disable(logging.INFO)
+
+    print(f'{"tasks":>8} | {"legacy compose":>15} {"legacy collect":>15} | {"compose":>10} {"collect":>10}')
+    for size in sorted({1000, 2500, 5000, n_tasks}):
+        legacy = time_pipeline(LegacyPipeline, size) if size <= 5000 else None
+        current = time_pipeline(Pipeline, size)
+        legacy_cols = f'{legacy[0]:13.3f} s {legacy[1]:13.3f} s' if legacy else f'{"-":>15} {"-":>15}'
+        print(f'{size:>8} | {legacy_cols} | {current[0]:8.3f} s {current[1]:8.3f} s')
+
+
+if __name__ == '__main__':
+    run(main)
@@ -0,0 +1,65 @@
+"""Runs backfill partitions of one Pipeline. Before runs were scoped
+to a RunContext they had to run one after the other, now they can
+overlap on the scheduler's threads and keep their own results.
+
+Usage: python tools/benchmarks/bench_concurrent_runs.py [n] [width]
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from harness import run
+
+
+def extract() -> int:
+    # stands in for a query waiting on the database
+    time.sleep(0.02)
+    return 1
+
+
+def transform(x: int) -> int:
+    time.sleep(0.01)
+    return x + 1
+
+
+def build_pipeline(width: int) -> Pipeline:
+    steps = [Task(extract, name='extract')]
+    steps += [Task(transform, depends_on=['extract'], name=f'transform_{i}') for i in range(width)]
+    pipeline = Pipeline(steps=steps, type='multi-threading', workers=4)
+    pipeline.compose()
+    return pipeline
+
+
+def timed(func) -> float:
+    start_time = time.perf_counter()
+    func()
+    return time.perf_counter() - start_time
+
+
+def main(n_runs: int = 16, width: int = 8):
+    logging.disable(logging.INFO)
+    pipeline = build_pipeline(width)
+
+    def sequential():
+        for _ in range(n_runs):
+            pipeline.run()
+
+    def overlapping():
+        with ThreadPoolExecutor(max_workers=n_runs) as pool:
+            runs = list(pool.map(lambda _: pipeline.run(), range(n_runs)))
+        assert all(run.result(f'transform_{width - 1}') == 2 for run in runs)
+
+    before = timed(sequential)
+    after = timed(overlapping)
+    print(f'{n_runs} runs of a pipeline with {width} tasks')
+    print(f'  one after the other : {before:8.3f} s')
+    print(f'  overlapping         : {after:8.3f} s')
+    print(f'  speedup             : {before / after:8.1f} x')
+
+
+if __name__ == '__main__':
+    run(main)
@@ -0,0 +1,90 @@
+"""Compares the makespan of FIFO and critical-path scheduling of ready
+Tasks on a thread pool with fewer workers than ready Tasks. Tasks
+sleep for a fixed time so the makespan only depends on the order
+in which ready Tasks are dispatched.
+
+  wide+deep : many short Tasks listed before one long chain
+  layered   : random layered DAG with random Task durations
+
+Critical-path runs are measured with cost hints, without hints
+(every Task costs the same) and with the durations of a previous
+run.
+
+Usage: python tools/benchmarks/bench_critical_path.py [workers]
+"""
+
+import logging
+import random
+import time
+from typing import Callable, List
+
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from harness import run
+
+
+def work(*inputs: int, seconds: float) -> int:
+    time.sleep(seconds)
+    return 0
+
+
+def wide_and_deep(width: int = 40, depth: int = 10, seconds: float = 0.02, hints: bool = True) -> List[Task]:
+    def task(name: str, depends_on: List[str], cost: float) -> Task:
+        return Task(work, depends_on=depends_on, name=name, skip_validation=True,
+                    cost=cost if hints else None, seconds=cost)
+
+    steps = [task('root', None, seconds)]
+    steps += [task(f'wide_{i}', ['root'], seconds) for i in range(width)]
+    steps += [task('deep_0', ['root'], seconds)]
+    steps += [task(f'deep_{i + 1}', [f'deep_{i}'], seconds) for i in range(depth - 1)]
+    return steps
+
+
+def layered(layers: int = 8, width: int = 12, seed: int = 7, hints: bool = True) -> List[Task]:
+    rnd = random.Random(seed)
+    steps = [Task(work, name='root', skip_validation=True, seconds=0.01)]
+    previous = ['root']
+    for layer in range(layers):
+        current = []
+        for i in range(rnd.randint(1, width)):
+            name = f'task_{layer}_{i}'
+            seconds = round(rnd.expovariate(1 / 0.02), 3)
+            depends_on = rnd.sample(previous, k=min(len(previous), rnd.randint(1, 2)))
+            steps.append(Task(work, depends_on=depends_on, name=name, skip_validation=True,
+                              cost=seconds if hints else None, seconds=seconds))
+            current.append(name)
+        previous = current
+    return steps
+
+
+def makespan(build: Callable[..., List[Task]], workers: int, schedule: str, hints: bool = True,
+             history: bool = False) -> float:
+    pipeline = Pipeline(steps=build(hints=hints), type='multi-threading', workers=workers, schedule=schedule)
+    if history:
+        # a first run records the duration of every Task
+        pipeline.run()
+    start_time = time.perf_counter()
+    pipeline.run()
+    return time.perf_counter() - start_time
+
+
+def main(workers: int = 4):
+    logging.disable(logging.INFO)
+
+    for label, build in (('wide+deep', wide_and_deep), ('layered', layered)):
+        lower_bound = sum(tsk.func.keywords['seconds'] for tsk in build()) / workers
+        fifo = makespan(build, workers, 'fifo')
+        hinted = makespan(build, workers, 'critical-path')
+        unhinted = makespan(build, workers, 'critical-path', hints=False)
+        history = makespan(build, workers, 'critical-path', hints=False, history=True)
+
+        print(f'{label} on {workers} workers (total work / workers = {lower_bound:.3f} s)')
+        print(f'  fifo                        : {fifo:8.3f} s')
+        print(f'  critical-path, cost hints   : {hinted:8.3f} s ({fifo / hinted:5.2f} x)')
+        print(f'  critical-path, no hints     : {unhinted:8.3f} s ({fifo / unhinted:5.2f} x)')
+        print(f'  critical-path, last run     : {history:8.3f} s ({fifo / history:5.2f} x)')
+
+
+if __name__ == '__main__':
+    run(main)
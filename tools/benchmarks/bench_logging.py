@@ -0,0 +1,106 @@
+"""Measures the per-task cost of logging. The legacy LoggingMixin
+calls logging.basicConfig and getLogger on every access and the
+message is formatted before the level is checked. The current
+mixin creates the logger once per class and passes arguments
+lazily. With queue logging the calling thread only enqueues the
+record and a listener thread writes it.
+
+Records are written to a stream that sleeps on every write to
+mimic a slow terminal.
+
+Usage: python tools/benchmarks/bench_logging.py [n_tasks]
+"""
+
+import io
+import logging
+import sys
+import time
+
+from maellin.logger import FORMAT, LoggingMixin, disable_queue_logging, enable_queue_logging
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from harness import run
+
+
+class SlowStream(io.StringIO):
+
+    def write(self, s):
+        time.sleep(0.00002)
+        return len(s)
+
+
+def legacy_logger(self):
+    logging.basicConfig(stream=sys.stdout, level='INFO', format=FORMAT)
+    return logging.getLogger('.'.join([self.__class__.__module__, self.__class__.__name__]))
+
+
+class Worker(LoggingMixin):
+    pass
+
+
+def per_call(n_calls: int, legacy: bool) -> float:
+    worker = Worker()
+    start_time = time.perf_counter()
+    for i in range(n_calls):
+        if legacy:
+            worker.logger.info('Running Task %s on Worker %s ' % (i, 1))
+        else:
+            worker.logger.info('Running Task %s on Worker %s', i, 1)
+    return (time.perf_counter() - start_time) / n_calls
+
+
+def start() -> int:
+    return 0
+
+
+def increment(x: int) -> int:
+    return x + 1
+
+
+def per_task(n_tasks: int) -> float:
+    steps = [Task(start, name='task_0', skip_validation=True)]
+    for i in range(1, n_tasks):
+        steps.append(Task(increment, depends_on=[steps[-1]], name=f'task_{i}', skip_validation=True))
+    pipeline = Pipeline(steps=steps)
+    pipeline.compose()
+    pipeline.collect()
+    start_time = time.perf_counter()
+    pipeline.run()
+    return (time.perf_counter() - start_time) / n_tasks
+
+
+def measure(label: str, legacy: bool, queue: bool, level: int, n_tasks: int) -> None:
+    current = LoggingMixin.logger
+    if legacy:
+        LoggingMixin.logger = property(legacy_logger)
+    logging.getLogger().setLevel(level)
+    if queue:
+        enable_queue_logging()
+    try:
+        call = per_call(n_tasks, legacy)
+        task = per_task(n_tasks)
+    finally:
+        if queue:
+            disable_queue_logging()
+        LoggingMixin.logger = current
+    print(f'  {label:<28}: {call * 1e6:8.2f} us/call {task * 1e6:8.1f} us/task')
+
+
+def main(n_tasks: int = 2000):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(SlowStream())
+    handler.setFormatter(logging.Formatter(FORMAT))
+    root.addHandler(handler)
+
+    for level in (logging.INFO, logging.WARNING):
+        print(f'level {logging.getLevelName(level)}, {n_tasks} calls / tasks')
+        measure('legacy', legacy=True, queue=False, level=level, n_tasks=n_tasks)
+        measure('logger per class', legacy=False, queue=False, level=level, n_tasks=n_tasks)
+        measure('logger per class + queue', legacy=False, queue=True, level=level, n_tasks=n_tasks)
+
+
+if __name__ == '__main__':
+    run(main)
@@ -0,0 +1,127 @@
+"""Compares saving a 60 task workflow shaped like the DVD rental
+sample after it has run. Pipeline.dump cloudpickles the whole DAG
+with every Task result and embeds the maellin package by value,
+Pipeline.dump_plan stores the structure, callables and kwargs with
+a versioned header and checksum. zstd and lz4 are measured when the
+zstandard and lz4 packages are installed.
+
+Usage: python tools/benchmarks/bench_plan_serialization.py [rows]
+"""
+
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from harness import run
+
+TABLES = (
+    'customer', 'staff', 'rental', 'store', 'address', 'city', 'country', 'film',
+    'language', 'inventory', 'payment', 'category', 'actor', 'film_actor', 'film_category', 'film_text',
+    'sales_by_store')
+DIMENSIONS = ('customer', 'staff', 'dates', 'store', 'film', 'fact_rental')
+
+
+def create_cursor(path: str, section: str) -> str:
+    return f'{path}[{section}]'
+
+
+def create_schema(cursor: str, schema_name: str) -> str:
+    return schema_name
+
+
+def create_table(schema: str, table_name: str, primary_key: str = None) -> str:
+    return f'{schema}.{table_name}'
+
+
+def read_table(cursor: str, table_name: str, rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(len(table_name))
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'value': rng.random(rows),
+        'label': rng.integers(0, 1000, rows).astype(str)})
+
+
+def transform(df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(value=df['value'] * 2)
+
+
+def sink_data(cursor: str, df: pd.DataFrame, target: str) -> int:
+    return len(df)
+
+
+def tear_down(cursor: str, *counts: int) -> None:
+    return None
+
+
+def build_pipeline(rows: int) -> Pipeline:
+    steps = [
+        Task(create_cursor, name='create_cursor', path='.config/.postgres', section='postgresql'),
+        Task(create_schema, depends_on=['create_cursor'], name='create_schema', schema_name='dw'),
+    ]
+    steps += [
+        Task(create_table, depends_on=['create_schema'], name=f'create_dim_{dim}', table_name=dim,
+             primary_key=f'sk_{dim}')
+        for dim in DIMENSIONS]
+    for table in TABLES:
+        steps += [
+            Task(read_table, depends_on=['create_cursor'], name=f'extract_{table}', table_name=table, rows=rows),
+            Task(transform, depends_on=[f'extract_{table}'], name=f'transf_{table}'),
+            Task(sink_data, depends_on=['create_cursor', f'transf_{table}'], name=f'load_{table}',
+                 target=f'dw.{table}', skip_validation=True),
+        ]
+    steps.append(Task(tear_down, depends_on=['create_cursor'] + [f'load_{table}' for table in TABLES],
+                      name='tear_down', skip_validation=True))
+    return Pipeline(steps=steps)
+
+
+def codecs():
+    available = [None, 'zlib']
+    for codec, module in (('zstd', 'zstandard'), ('lz4', 'lz4')):
+        try:
+            __import__(module)
+            available.append(codec)
+        except ImportError:
+            pass
+    return available
+
+
+def timed(func, *args, **kwargs) -> float:
+    start_time = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start_time
+
+
+def main(rows: int = 20000):
+    logging.disable(logging.INFO)
+    pipeline = build_pipeline(rows)
+    pipeline.run()
+    n_tasks = len(pipeline.dag.nodes)
+
+    print(f'{n_tasks} tasks, {rows} rows per extract, results of {pipeline.peak_result_bytes / 1e6:.1f} MB')
+    print(f'{"format":<18} {"size":>12} {"dump":>10} {"load":>10}')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'workflow.pkl')
+        dumped = timed(pipeline.dump, path)
+        loaded = timed(Pipeline().load, path)
+        print(f'{"dump (legacy)":<18} {os.path.getsize(path):>10} B {dumped * 1e3:>7.1f} ms {loaded * 1e3:>7.1f} ms')
+        data = pipeline.dumps()
+        print(f'{"dumps (legacy str)":<18} {len(str(data).encode("utf-8")):>10} B')
+        print(f'{"dumps":<18} {len(data):>10} B')
+
+        for codec in codecs():
+            path = os.path.join(tmp, f'workflow.{codec}.plan')
+            dumped = min(timed(pipeline.dump_plan, path, compression=codec) for _ in range(5))
+            loaded = min(timed(Pipeline().load_plan, path) for _ in range(5))
+            label = f'dump_plan {codec or "none"}'
+            print(f'{label:<18} {os.path.getsize(path):>10} B {dumped * 1e3:>7.1f} ms {loaded * 1e3:>7.1f} ms')
+
+
+if __name__ == '__main__':
+    run(main)
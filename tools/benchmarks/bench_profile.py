@@ -0,0 +1,58 @@
+"""Measures the cost of the per-task profiler hook. With profiling
+disabled Task._run only checks a flag before calling the function,
+the legacy Task calls the function directly. With profiling
+enabled every call runs under cProfile and the stats are merged
+into the Task.
+
+Usage: python tools/benchmarks/bench_profile.py [n_calls]
+"""
+
+import logging
+import time
+
+from maellin.tasks import Task
+
+from harness import run
+
+
+def increment(x: int) -> int:
+    return x + 1
+
+
+def work(x: int) -> int:
+    return sum(i * i for i in range(2000)) + x
+
+
+class LegacyTask(Task):
+    """Task without the profiler hook"""
+
+    def _run(self, *args, **kwargs):
+        try:
+            if self.cache is not None:
+                return self.cache.call(self.func, *args, **kwargs)
+            return self.func(*args, **kwargs)
+        except Exception as error:
+            raise error
+
+
+def per_call(task: Task, n_calls: int) -> float:
+    start_time = time.perf_counter()
+    for i in range(n_calls):
+        task.run(i)
+    return (time.perf_counter() - start_time) / n_calls
+
+
+def main(n_calls: int = 200000):
+    logging.disable(logging.INFO)
+
+    for func in (increment, work):
+        calls = n_calls if func is increment else n_calls // 100
+        legacy = min(per_call(LegacyTask(func), calls) for _ in range(5))
+        disabled = min(per_call(Task(func), calls) for _ in range(5))
+        enabled = per_call(Task(func, profile=True), calls)
+        print(f'{func.__name__:<10}: legacy {legacy * 1e6:8.3f} us/run, disabled {disabled * 1e6:8.3f} us/run, '
+              f'profiled {enabled * 1e6:8.3f} us/run')
+
+
+if __name__ == '__main__':
+    run(main)
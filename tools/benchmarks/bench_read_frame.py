@@ -0,0 +1,121 @@
+"""Compares building a DataFrame from cursor.fetchall() against
+PostgresClient.read_frame() on a recorded cursor fixture shaped
+like the DVD rental "rental" table, so no database is required.
+Reports wall clock time and peak traced memory of each approach.
+
+Usage: python tools/benchmarks/bench_read_frame.py [n_rows]
+"""
+
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from maellin.clients.postgres import PostgresClient
+
+from harness import run
+
+Column = namedtuple('Column', ['name', 'type_code'])
+
+# rental_id int4, rental_date timestamp, inventory_id int4, customer_id int2, staff_id int2, return_date timestamp
+DESCRIPTION = [
+    Column('rental_id', 23),
+    Column('rental_date', 1114),
+    Column('inventory_id', 23),
+    Column('customer_id', 21),
+    Column('staff_id', 21),
+    Column('last_update', 1114),
+]
+
+
+def record_rows(n_rows: int) -> list:
+    start = datetime(2005, 5, 24)
+    return [
+        (i, start + timedelta(minutes=i), i % 4581, i % 599, i % 2 + 1, start + timedelta(days=1, minutes=i))
+        for i in range(n_rows)
+    ]
+
+
+class RecordedCursor:
+    """Replays recorded rows through the psycopg cursor API used by the client"""
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.description = None
+        self.itersize = 100
+        self._pos = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.description = DESCRIPTION
+        self._pos = 0
+        return self
+
+    def fetchmany(self, size: int) -> list:
+        # psycopg creates new tuples for every fetched row
+        rows = [tuple(row) for row in self.rows[self._pos:self._pos + size]]
+        self._pos += len(rows)
+        return rows
+
+    def fetchall(self) -> list:
+        return self.fetchmany(len(self.rows))
+
+
+class RecordedConnection:
+
+    autocommit = True
+
+    def __init__(self, rows: list):
+        self.rows = rows
+
+    def cursor(self, name: str = '', **kwargs) -> RecordedCursor:
+        return RecordedCursor(self.rows)
+
+
+def fetchall_frame(conn: RecordedConnection) -> int:
+    """The pattern used by the samples: fetchall into a list of tuples"""
+    res = conn.cursor().execute('SELECT * FROM rental')
+    data = res.fetchall()
+    df = pd.DataFrame(data, columns=[col[0] for col in res.description])
+    return len(df)
+
+
+def read_frame(conn: RecordedConnection) -> int:
+    return len(PostgresClient().read_frame('SELECT * FROM rental', conn=conn))
+
+
+def read_chunks(conn: RecordedConnection) -> int:
+    return sum(len(df) for df in PostgresClient().read_frame('SELECT * FROM rental', conn=conn, chunksize=50000))
+
+
+def measure(func, conn) -> tuple:
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    n_rows = func(conn)
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return n_rows, elapsed, peak
+
+
+def main(n_rows: int = 500000):
+    conn = RecordedConnection(record_rows(n_rows))
+    print(f'{n_rows} recorded rows')
+    for label, func in (
+            ('fetchall + DataFrame', fetchall_frame),
+            ('read_frame', read_frame),
+            ('read_frame chunksize=50000', read_chunks)):
+        rows, elapsed, peak = measure(func, conn)
+        assert rows == n_rows
+        print(f'  {label:28s}: {elapsed:7.3f} s, peak {peak / 2 ** 20:8.1f} MiB')
+
+
+if __name__ == '__main__':
+    run(main)
@@ -0,0 +1,79 @@
+"""Measures one poll of a directory of stored DAGs. The legacy poll
+from samples/01_scheduling_workflows.py loads every pickle on
+every poll, the DagRegistry only stats the files and reads the
+ones whose mtime or size changed.
+
+Usage: python tools/benchmarks/bench_registry.py [n_dags] [n_tasks]
+"""
+
+import logging
+import os
+import tempfile
+import time
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from maellin.registry import DagRegistry
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from harness import run
+
+
+def start() -> int:
+    return 0
+
+
+def increment(x: int) -> int:
+    return x + 1
+
+
+def build_pipeline(n_tasks: int) -> Pipeline:
+    steps = [Task(start, name='task_0')]
+    for i in range(1, n_tasks):
+        steps.append(Task(increment, depends_on=[f'task_{i - 1}'], name=f'task_{i}'))
+    return Pipeline(steps=steps)
+
+
+def legacy_poll(path: str) -> None:
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                Pipeline().load(filename=entry.path)
+
+
+def timed(func, *args) -> float:
+    start_time = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start_time
+
+
+def main(n_dags: int = 300, n_tasks: int = 20):
+    logging.disable(logging.INFO)
+    pipeline = build_pipeline(n_tasks)
+    pipeline.compose()
+
+    for extension in ('pkl', 'plan'):
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(n_dags):
+                path = os.path.join(tmp, f'dag_{i}.{extension}')
+                pipeline.dump(path) if extension == 'pkl' else pipeline.dump_plan(path)
+
+            scheduler = BackgroundScheduler()
+            scheduler.start(paused=True)
+            registry = DagRegistry(tmp, scheduler=scheduler)
+            first = timed(registry.sync)
+            unchanged = min(timed(registry.sync) for _ in range(5))
+            os.utime(os.path.join(tmp, 'dag_0.' + extension), ns=(0, 0))
+            touched = timed(registry.sync)
+            scheduler.shutdown(wait=False)
+
+            if extension == 'pkl':
+                legacy = min(timed(legacy_poll, tmp) for _ in range(3))
+                print(f'{n_dags} DAGs of {n_tasks} tasks, legacy poll loading every pickle: {legacy * 1e3:8.1f} ms')
+            print(f'registry .{extension:<4}: first sync {first * 1e3:7.1f} ms, '
+                  f'unchanged poll {unchanged * 1e3:6.2f} ms, one touched file {touched * 1e3:6.2f} ms')
+
+
+if __name__ == '__main__':
+    run(main)
@@ -0,0 +1,93 @@
+"""Measures the executor overhead of looking up dependency inputs on
+a long chain of tiny Tasks. The legacy worker scans a copy of the
+result queue for every dependency, the current worker looks the
+results up in the executor's ResultStore by tid.
+
+Usage: python tools/benchmarks/bench_result_lookup.py [n_tasks]
+"""
+
+import logging
+import time
+
+from maellin.executors.default import DefaultExecutor, DefaultWorker
+from maellin.queues import QueueFactory
+from maellin.tasks import Task
+from maellin.utils import get_task_result
+from maellin.workflows import Pipeline
+
+from harness import run
+
+
+def start() -> int:
+    return 0
+
+
+def increment(x: int) -> int:
+    return x + 1
+
+
+class LegacyWorker(DefaultWorker):
+    """Worker using the original O(tasks x deps) result queue scan"""
+
+    def run(self):
+        while not self.task_queue.empty():
+            _task = self.task_queue.get()
+            _task.update_status('Running')
+            if _task.depends_on:
+                inputs = ()
+                for dep_task in list(dict.fromkeys(_task.depends_on).keys()):
+                    for completed_task in list(self.result_queue.queue):
+                        if dep_task.tid == completed_task.tid:
+                            inputs = inputs + get_task_result(completed_task)
+            else:
+                inputs = tuple()
+            _task.run(*inputs)
+            _task.update_status('Completed')
+            self.result_queue.put(_task)
+            self.task_queue.task_done()
+
+
+class LegacyExecutor(DefaultExecutor):
+
+    def start(self):
+        self.worker = LegacyWorker(self.task_queue, self.result_queue)
+        return self.worker.run()
+
+
+def build_chain(n_tasks: int) -> Pipeline:
+    steps = [Task(start, name='task_0', skip_validation=True)]
+    for i in range(1, n_tasks):
+        steps.append(Task(increment, depends_on=[steps[-1]], name=f'task_{i}', skip_validation=True))
+    pipeline = Pipeline(steps=steps)
+    pipeline.compose()
+    return pipeline
+
+
+def time_executor(pipeline: Pipeline, executor_cls) -> float:
+    pipeline.collect()
+    pipeline.result_queue = QueueFactory.factory()
+    executor = executor_cls(task_queue=pipeline.queue, result_queue=pipeline.result_queue)
+    start_time = time.perf_counter()
+    executor.start()
+    elapsed = time.perf_counter() - start_time
+    executor.context.publish()
+    assert pipeline.steps[-1].result == len(pipeline.steps) - 1
+    executor.shutdown()
+    return elapsed
+
+
+def main(n_tasks: int = 5000):
+    logging.disable(logging.INFO)
+    pipeline = build_chain(n_tasks)
+
+    before = time_executor(pipeline, LegacyExecutor)
+    after = time_executor(pipeline, DefaultExecutor)
+
+    print(f'chain of {n_tasks} tasks')
+    print(f'  result queue scan : {before:8.3f} s ({before / n_tasks * 1e6:8.1f} us/task)')
+    print(f'  result store      : {after:8.3f} s ({after / n_tasks * 1e6:8.1f} us/task)')
+    print(f'  speedup           : {before / after:8.1f} x')
+
+
+if __name__ == '__main__':
+    run(main)
@@ -0,0 +1,67 @@
+"""Measures the overhead of recording per-task metrics. Every Task is
+sampled before and after it runs (wall clock, thread cpu time and
+peak RSS) and its result size is recorded. The baseline replaces
+the samples with a constant to isolate the cost of the clocks.
+Also prints the slowest Tasks of a run from Pipeline.last_run_stats.
+
+Usage: python tools/benchmarks/bench_run_stats.py [n_tasks]
+"""
+
+import logging
+import time
+
+import maellin.executors.default as default
+import maellin.executors.threaded as threaded
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from harness import run
+
+
+def start() -> int:
+    return 0
+
+
+def increment(x: int) -> int:
+    return x + 1
+
+
+def build_pipeline(n_tasks: int, type: str) -> Pipeline:
+    steps = [Task(start, name='task_0', skip_validation=True)]
+    for i in range(1, n_tasks):
+        steps.append(Task(increment, depends_on=[steps[-1]], name=f'task_{i}', skip_validation=True))
+    pipeline = Pipeline(steps=steps, type=type)
+    pipeline.compose()
+    pipeline.collect()
+    return pipeline
+
+
+def per_task(n_tasks: int, type: str) -> float:
+    pipeline = build_pipeline(n_tasks, type)
+    start_time = time.perf_counter()
+    pipeline.run()
+    return (time.perf_counter() - start_time) / n_tasks
+
+
+def main(n_tasks: int = 5000):
+    logging.disable(logging.INFO)
+
+    for type, module in (('default', default), ('multi-threading', threaded)):
+        sample = module.sample
+        module.sample = lambda cpu=True: (0.0, None, None)
+        try:
+            baseline = per_task(n_tasks, type)
+        finally:
+            module.sample = sample
+        sampled = per_task(n_tasks, type)
+        print(f'{type:<16}: {baseline * 1e6:7.2f} us/task without samples, '
+              f'{sampled * 1e6:7.2f} us/task sampled ({(sampled - baseline) * 1e6:+.2f} us)')
+
+    pipeline = build_pipeline(50, 'default')
+    pipeline.run()
+    frame = pipeline.last_run_stats.to_frame()[['name', 'duration', 'queue_wait', 'cpu_time', 'result_bytes']]
+    print(frame.sort_values('duration', ascending=False).head().to_string(index=False))
+
+
+if __name__ == '__main__':
+    run(main)
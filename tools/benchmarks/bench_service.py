@@ -0,0 +1,71 @@
+"""Simulates a burst of scheduled pipelines starting at the same time.
+With 'multi-threading' every run opens its own pool so the number
+of running Tasks grows with the number of pipelines, with 'shared'
+all runs draw from the ExecutionService and stay within its limit.
+
+Usage: python tools/benchmarks/bench_service.py [n] [width] [cap]
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from maellin.executors.service import ExecutionService
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from harness import run
+
+RUNNING = 0
+PEAK = 0
+LOCK = threading.Lock()
+
+
+def start() -> int:
+    return 0
+
+
+def work(x: int) -> int:
+    global RUNNING, PEAK
+    with LOCK:
+        RUNNING += 1
+        PEAK = max(PEAK, RUNNING)
+    total = sum(i * i for i in range(200_000))
+    with LOCK:
+        RUNNING -= 1
+    return x + total % 2
+
+
+def build_pipeline(width: int, type: str) -> Pipeline:
+    steps = [Task(start, name='start')]
+    steps += [Task(work, depends_on=['start'], name=f'work_{i}') for i in range(width)]
+    return Pipeline(steps=steps, type=type, workers=4)
+
+
+def burst(pipelines) -> float:
+    # one thread per pipeline, like the scheduler firing every job at once
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(pipelines)) as pool:
+        list(pool.map(lambda pipe: pipe.run(), pipelines))
+    return time.perf_counter() - start_time
+
+
+def main(n_pipelines: int = 50, width: int = 8, max_workers: int = None):
+    global PEAK
+    logging.disable(logging.INFO)
+    service = ExecutionService.instance()
+    if max_workers:
+        service.configure(max_workers)
+    print(f'{n_pipelines} pipelines of {width} tasks bursting, service limit {service.max_workers} workers')
+    for type in ('multi-threading', 'shared'):
+        pipelines = [build_pipeline(width, type) for _ in range(n_pipelines)]
+        for pipe in pipelines:
+            pipe.compose()
+        PEAK = 0
+        elapsed = burst(pipelines)
+        print(f'{type:<16}: {elapsed * 1e3:8.1f} ms, peak running tasks {PEAK:4d}')
+
+
+if __name__ == '__main__':
+    run(main)
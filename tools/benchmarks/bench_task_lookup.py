@@ -0,0 +1,79 @@
+"""Measures looking up Tasks by name and composing a Pipeline whose
+Tasks reference their dependencies by name. The legacy Pipeline
+scans the Tasks of every node in the DAG for each lookup, the
+current Pipeline keeps name and tid indexes.
+
+Usage: python tools/benchmarks/bench_task_lookup.py [n_tasks]
+"""
+
+import logging
+import time
+
+from maellin.exceptions import NotFoundError
+from maellin.tasks import Task
+from maellin.workflows import Pipeline
+
+from harness import run
+
+
+def start() -> int:
+    return 0
+
+
+def increment(x: int) -> int:
+    return x + 1
+
+
+class LegacyPipeline(Pipeline):
+    """Pipeline using the original scan over all nodes of the DAG"""
+
+    def get_task_by_name(self, name: str) -> Task:
+        for tsk_attrs in self.get_all_attributes(name='tasks'):
+            if tsk_attrs is not None:
+                for tsk in tsk_attrs.values():
+                    if tsk.name == name:
+                        return tsk
+        raise NotFoundError(f"{name} was not found in the DAG")
+
+    def _proc_named_dep(self, idx, task, dep, input_pipe):
+        dep_task = self.get_task_by_name(name=dep)
+        task.depends_on[idx] = dep_task
+        for k in self.dag.nodes[dep_task.tid]['tasks'].keys():
+            task.related.append(k)
+        return (task, dep_task)
+
+
+def build_steps(n_tasks: int):
+    steps = [Task(start, name='task_0', skip_validation=True)]
+    for i in range(1, n_tasks):
+        steps.append(Task(increment, depends_on=[f'task_{i - 1}'], name=f'task_{i}', skip_validation=True))
+    return steps
+
+
+def time_pipeline(pipeline_cls, n_tasks: int, n_lookups: int):
+    pipeline = pipeline_cls(steps=build_steps(n_tasks))
+    start_time = time.perf_counter()
+    pipeline.compose()
+    composed = time.perf_counter() - start_time
+
+    names = [f'task_{i * 7919 % n_tasks}' for i in range(n_lookups)]
+    start_time = time.perf_counter()
+    for name in names:
+        pipeline.get_task_by_name(name)
+    looked_up = (time.perf_counter() - start_time) / n_lookups
+    return composed, looked_up
+
+
+def main(n_tasks: int = 5000, n_lookups: int = 1000):
+    logging.disable(logging.INFO)
+
+    print(f'{"tasks":>8} | {"legacy compose":>15} {"legacy lookup":>15} | {"compose":>10} {"lookup":>10}')
+    for size in sorted({1000, 2500, n_tasks}):
+        legacy = time_pipeline(LegacyPipeline, size, n_lookups)
+        current = time_pipeline(Pipeline, size, n_lookups)
+        print(f'{size:>8} | {legacy[0]:13.3f} s {legacy[1] * 1e6:12.1f} us | '
+              f'{current[0]:8.3f} s {current[1] * 1e6:7.1f} us')
+
+
+if __name__ == '__main__':
+    run(main)
@@ -0,0 +1,84 @@
+"""Profiles composing a generated Pipeline where every Task wraps the
+same function and is validated against its dependency. The legacy
+Task runs inspect.signature and reads the annotations of both
+Tasks on every validation, the current Task reads the annotations
+from a cache keyed by the underlying function.
+
+Usage: python tools/benchmarks/bench_validation.py [n_tasks]
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+from inspect import signature
+from typing import Any
+
+from maellin.exceptions import CompatibilityException
+from maellin.tasks import Task, is_compatible
+from maellin.workflows import Pipeline
+
+from harness import run
+
+
+def start() -> int:
+    return 0
+
+
+def increment(x: int) -> int:
+    return x + 1
+
+
+class LegacyTask(Task):
+    """Task using the original introspection on every validation"""
+
+    def __input__(self):
+        return [x.annotation for x in signature(self.func).parameters.values()]
+
+    def __output__(self):
+        return self.func.__annotations__['return']
+
+    def validate(self, other):
+        _val = any(is_compatible(other.__output__(), arg) for arg in self.__input__() + [None])
+        if other.__output__() is Any:
+            raise CompatibilityException('Any')
+        if _val is not True:
+            raise CompatibilityException('incompatible')
+        return True
+
+
+def build_pipeline(task_cls, n_tasks: int) -> Pipeline:
+    steps = [task_cls(start, name='task_0')]
+    for i in range(1, n_tasks):
+        steps.append(task_cls(increment, depends_on=[steps[-1]], name=f'task_{i}'))
+    return Pipeline(steps=steps)
+
+
+def profile_compose(task_cls, n_tasks: int):
+    pipeline = build_pipeline(task_cls, n_tasks)
+    profiler = cProfile.Profile()
+    start_time = time.perf_counter()
+    profiler.enable()
+    pipeline.compose()
+    profiler.disable()
+    elapsed = time.perf_counter() - start_time
+
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(
+        r'\((validate|signature|signature_types|__input__|__output__)\)')
+    return elapsed, report.getvalue()
+
+
+def main(n_tasks: int = 5000):
+    logging.disable(logging.INFO)
+
+    for label, task_cls in (('legacy', LegacyTask), ('cached', Task)):
+        elapsed, report = profile_compose(task_cls, n_tasks)
+        print(f'{label}: compose {n_tasks} validated tasks in {elapsed:.3f} s (profiled)')
+        print('\n'.join(line for line in report.splitlines() if '.py:' in line))
+        print()
+
+
+if __name__ == '__main__':
+    run(main)
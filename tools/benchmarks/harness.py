@@ -0,0 +1,17 @@
+"""Helpers shared by the benchmark scripts."""
+
+import sys
+from typing import Any, Callable
+
+
+def run(main: Callable[..., Any]) -> Any:
+    """Calls the main function of a benchmark with the integer arguments given on
+    the command line, e.g. python tools/benchmarks/bench_compose.py 10000
+
+    Args:
+        main (Callable[..., Any]): main function of the benchmark
+
+    Returns:
+        Any: the value returned by main
+    """
+    return main(*[int(arg) for arg in sys.argv[1:]])